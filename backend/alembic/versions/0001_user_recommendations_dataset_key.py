@@ -0,0 +1,66 @@
+"""Key user_recommendations by dataset
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+Stored recommendations are derived data (see recommendation_store), so an
+existing table without the dataset column is dropped and recreated rather
+than copied; `python manage.py materialize-recommendations` refills it.
+Databases created by `init-db` already have the new layout and are left alone.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table: str):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def _create_table(with_dataset: bool) -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        user_id_type = sa.String()
+    else:
+        user_id_type = postgresql.UUID(as_uuid=True)
+    columns = [
+        sa.Column("user_id", user_id_type, sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("meal_type", sa.String(), primary_key=True),
+    ]
+    if with_dataset:
+        columns.append(sa.Column("dataset", sa.String(), primary_key=True, server_default="default"))
+    columns += [
+        sa.Column("dataset_version", sa.String(), nullable=False),
+        sa.Column("profile_hash", sa.String(), nullable=False),
+        sa.Column("recommendations", sa.JSON(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ]
+    op.create_table("user_recommendations", *columns)
+
+
+def upgrade() -> None:
+    columns = _columns("user_recommendations")
+    if columns is not None and "dataset" in columns:
+        return
+    if columns is not None:
+        op.drop_table("user_recommendations")
+    _create_table(with_dataset=True)
+
+
+def downgrade() -> None:
+    columns = _columns("user_recommendations")
+    if columns is not None:
+        op.drop_table("user_recommendations")
+    _create_table(with_dataset=False)
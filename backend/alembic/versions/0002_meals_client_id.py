@@ -0,0 +1,37 @@
+"""Add meals.client_id for idempotent batch logging
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+Offline clients tag each meal with a client_id (POST /meal-plans/meals/batch);
+the unique constraint on (user_id, client_id) is what makes replays
+idempotent. Existing meals keep a NULL client_id, which never conflicts.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "client_id" in {column["name"] for column in inspector.get_columns("meals")}:
+        return  # Created by init-db with the current layout
+    # Batch mode recreates the table on SQLite, which cannot add constraints in place
+    with op.batch_alter_table("meals") as batch_op:
+        batch_op.add_column(sa.Column("client_id", sa.String(), nullable=True))
+        batch_op.create_unique_constraint("uq_meals_user_client_id", ["user_id", "client_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("meals") as batch_op:
+        batch_op.drop_constraint("uq_meals_user_client_id", type_="unique")
+        batch_op.drop_column("client_id")
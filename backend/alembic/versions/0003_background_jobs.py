@@ -0,0 +1,44 @@
+"""Add background_jobs for job state shared by worker processes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+Used when JOB_STORE is "database" (the default under gunicorn with several
+workers); see app/services/job_queue.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("background_jobs"):
+        return  # Created by init-db
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("owner", sa.String()),
+        sa.Column("dedupe_key", sa.String()),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("result", sa.JSON()),
+        sa.Column("error", sa.String()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_background_jobs_owner", "background_jobs", ["owner"])
+    op.create_index("ix_background_jobs_dedupe_key", "background_jobs", ["dedupe_key"])
+
+
+def downgrade() -> None:
+    op.drop_table("background_jobs")
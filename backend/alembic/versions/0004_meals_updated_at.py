@@ -0,0 +1,33 @@
+"""Add meals.updated_at for the meal-plans ETag
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+The application sets the column on insert and update; existing meals are
+backfilled from created_at.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "updated_at" in {column["name"] for column in inspector.get_columns("meals")}:
+        return  # Created by init-db with the current layout
+    op.add_column("meals", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE meals SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("meals") as batch_op:
+        batch_op.drop_column("updated_at")
@@ -3,60 +3,35 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-import os
-from dotenv import load_dotenv
 
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token, LoginRequest
-
-load_dotenv()
+from app.services.password_service import password_service, PasswordServiceBusy
+from app.services.user_cache import user_cache
+from app.services.token_cache import token_cache
 
 router = APIRouter()
 
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+SECRET_KEY = settings.secret_key
+ALGORITHM = settings.algorithm
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
-# Configure bcrypt with explicit backend to avoid detection issues
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__ident="2b",  # Use bcrypt 2b format
-    bcrypt__rounds=12,   # Number of rounds
-)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 def verify_password(plain_password, hashed_password):
-    try:
-        # Try bcrypt first
-        return pwd_context.verify(plain_password, hashed_password)
-    except Exception:
-        # Fallback to SHA256 if bcrypt fails (for development)
-        try:
-            import hashlib
-            expected_hash = hashlib.sha256(plain_password.encode()).hexdigest()
-            return expected_hash == hashed_password
-        except Exception as e:
-            print(f"Password verification error: {e}")
-            return False
+    return password_service.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    try:
-        # Ensure password is a string
-        if isinstance(password, bytes):
-            password = password.decode('utf-8')
-        # Ensure password doesn't exceed bcrypt's 72-byte limit
-        password_bytes = password.encode('utf-8')
-        if len(password_bytes) > 72:
-            password = password_bytes[:72].decode('utf-8', errors='ignore')
-        return pwd_context.hash(password)
-    except Exception as e:
-        print(f"Password hashing error: {e}")
-        # Fallback to simple hash if bcrypt fails (not secure, but for development)
-        import hashlib
-        return hashlib.sha256(password.encode()).hexdigest()
+    return password_service.hash(password)
+
+def _password_service_unavailable():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -74,17 +49,31 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    # Tokens are reused for their whole lifetime; skip re-verifying known ones
+    user_id = token_cache.get(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            user_id: str = payload.get("sub")
+            if user_id is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        token_cache.put(token, user_id, payload.get("exp"))
     
-    user = db.query(User).filter(User.id == user_id).first()
+    # Serve the user from the per-process snapshot cache when possible
+    user = user_cache.get(user_id, db)
     if user is None:
-        raise credentials_exception
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise credentials_exception
+        user_cache.put(user_id, user)
+    
+    if user.is_active is False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user",
+        )
     return user
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
@@ -97,8 +86,11 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    # Create new user (bcrypt runs in the password pool, off the event loop)
+    try:
+        hashed_password = await password_service.hash_async(user_data.password)
+    except PasswordServiceBusy:
+        raise _password_service_unavailable()
     db_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -131,13 +123,26 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == login_data.email).first()
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await password_service.verify_and_update_async(
+                login_data.password, user.hashed_password
+            )
+        except PasswordServiceBusy:
+            raise _password_service_unavailable()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Transparently upgrade hashes created with an older cost or scheme
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user.id)}, expires_delta=access_token_expires
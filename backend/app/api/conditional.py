@@ -0,0 +1,59 @@
+"""
+Helpers for ETag-based conditional GETs.
+Endpoints compute a cheap validator (row versions, aggregate timestamps or a
+hash of a small snapshot) before doing any expensive work, and answer
+`If-None-Match` hits with 304 without building or serializing the body.
+"""
+import hashlib
+from typing import Optional
+from fastapi import Request, Response, status
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts, weak: bool = False) -> str:
+    """
+    ETag from any reprs-stable values. Strong unless `weak` is set, which is
+    for bodies that are only semantically equivalent between responses
+    (e.g. ones carrying fresh ids or timestamps).
+    """
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 requires for GET."""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    target = _opaque(etag)
+    return any(_opaque(tag) == target for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def user_snapshot(user) -> tuple:
+    """Profile column values of a user (password hash excluded), for validators."""
+    return tuple(
+        getattr(user, column.key)
+        for column in user.__table__.columns
+        if column.key != "hashed_password"
+    )
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Optional
+from app import profiling
+from app.api.responses import FastJSONResponse
+
+router = APIRouter()
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)):
+    if not profiling.is_authorized(x_profile_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profiling_token)])
+async def get_profile_report(profile_id: str):
+    """
+    Return a stored request profile: top functions, call tree and SQL statements.
+    Profiles are kept in memory by the worker that served the request.
+    """
+    report = profiling.profile_store.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FastJSONResponse(report)
@@ -1,98 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List
-from app.database import get_db
+import asyncio
+import bisect
+from app.database import get_db, SessionLocal
 from app.models.user import User
 from app.models.meal_plan import MealPlan
 from app.models.meal import Meal, FoodItem
-from app.schemas.meal_plan import MealPlanCreate, MealPlanResponse
-from app.schemas.meal import MealResponse, FoodItemResponse, NutritionInfoSchema, MealCreate
+from app.schemas.meal_plan import MealPlanCreate, MealPlanResponse, MealPlanJobResponse
+from app.schemas.meal import (
+    MealResponse, FoodItemResponse, NutritionInfoSchema, MealCreate,
+    MealBatchCreate, MealBatchResponse, MealBatchResult,
+)
 from app.api.auth import get_current_user
-from app.services.recommendation_service import RecommendationService
+from app.api.responses import FastJSONResponse, json_dumps
+from app.api.conditional import make_etag, etag_matches, not_modified, set_etag
+from app.data.dataset_registry import UnknownDataset, dataset_registry
+from app.services.meal_plan_service import MealPlanService
+from app.services.job_queue import job_runner, JobQueueFull
+from app.services import nutrition_rollup
 
 router = APIRouter()
 
+GENERATE_MEAL_PLAN_JOB = "generate_meal_plan"
+
 def _meal_to_response(meal: Meal) -> MealResponse:
-    """Convert Meal model to MealResponse schema"""
-    from app.models.meal import NutritionInfo
-    
+    """
+    Convert Meal model to MealResponse schema.
+    The rows come from our own database, so models are constructed without validation.
+    """
     # Convert food items
-    foods = []
-    for food_item in meal.food_items:
-        nutrition = None
-        if food_item.nutrition_info:
-            nutrition = NutritionInfoSchema(**food_item.nutrition_info)
-        
-        foods.append(FoodItemResponse(
+    foods = [
+        FoodItemResponse.model_construct(
             id=food_item.id,
             name=food_item.name,
             quantity=food_item.quantity,
             unit=food_item.unit,
-            nutrition=nutrition,
-        ))
-    
-    # Convert meal nutrition
-    meal_nutrition = None
-    if meal.nutrition_info:
-        meal_nutrition = NutritionInfoSchema(**meal.nutrition_info)
+            nutrition=NutritionInfoSchema.from_db(food_item.nutrition_info),
+        )
+        for food_item in meal.food_items
+    ]
     
-    return MealResponse(
+    return MealResponse.model_construct(
         id=meal.id,
         name=meal.name,
         description=meal.description,
         meal_type=meal.meal_type,
         date=meal.date,
         foods=foods,
-        nutrition=meal_nutrition,
+        nutrition=NutritionInfoSchema.from_db(meal.nutrition_info),
+    )
+
+def _meal_plan_to_response(plan: MealPlan, meals: List[Meal]) -> MealPlanResponse:
+    """Convert MealPlan model and its meals to MealPlanResponse schema"""
+    return MealPlanResponse.model_construct(
+        id=plan.id,
+        user_id=plan.user_id,
+        start_date=plan.start_date,
+        end_date=plan.end_date,
+        meals=[_meal_to_response(m) for m in meals],
+        daily_nutrition=NutritionInfoSchema.from_db(plan.daily_nutrition_target),
+        goal=plan.goal,
+        created_at=plan.created_at,
     )
 
 @router.get("", response_model=List[MealPlanResponse])
 async def get_meal_plans(
+    request: Request,
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    query = db.query(MealPlan).filter(MealPlan.user_id == current_user.id)
-    
+    # Counts plus latest created/updated timestamps identify the current state
+    # (deletions change the count); two aggregate queries instead of loading every plan
+    plan_version = db.query(
+        func.count(MealPlan.id), func.max(MealPlan.created_at), func.max(MealPlan.updated_at)
+    ).filter(MealPlan.user_id == current_user.id).one()
+    meal_version = db.query(
+        func.count(Meal.id), func.max(Meal.created_at), func.max(Meal.updated_at)
+    ).filter(Meal.user_id == current_user.id).one()
+    etag = make_etag("meal-plans", str(current_user.id), start_date, end_date, tuple(plan_version), tuple(meal_version))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    plan_filters = [MealPlan.user_id == current_user.id]
     if start_date:
-        query = query.filter(MealPlan.start_date >= start_date)
+        plan_filters.append(MealPlan.start_date >= start_date)
     if end_date:
-        query = query.filter(MealPlan.end_date <= end_date)
-    
-    meal_plans = query.all()
+        plan_filters.append(MealPlan.end_date <= end_date)
+    
+    meal_plans = db.query(MealPlan).filter(*plan_filters).all()
+    
+    # Load the meals of all plans (and their food items) in two queries
+    # instead of one query per plan plus one per meal; only meals inside some
+    # plan's range, not every meal in gaps between plans
+    meals = []
+    if meal_plans:
+        covered = db.query(MealPlan.id).filter(
+            *plan_filters,
+            MealPlan.start_date <= Meal.date,
+            MealPlan.end_date >= Meal.date
+        ).exists()
+        meals = db.query(Meal).options(selectinload(Meal.food_items)).filter(
+            Meal.user_id == current_user.id,
+            Meal.date >= min(plan.start_date for plan in meal_plans),
+            Meal.date <= max(plan.end_date for plan in meal_plans),
+            covered
+        ).order_by(Meal.date).all()
+    meal_dates = [meal.date for meal in meals]
     
     # Convert to response format
     result = []
     for plan in meal_plans:
-        # Get meals for this plan
-        meals = db.query(Meal).filter(
-            Meal.user_id == current_user.id,
-            Meal.date >= plan.start_date,
-            Meal.date <= plan.end_date
-        ).all()
-        
-        # Convert meals to response format
-        meal_responses = [_meal_to_response(m) for m in meals]
-        
-        # Convert daily nutrition
-        daily_nutrition = None
-        if plan.daily_nutrition_target:
-            daily_nutrition = NutritionInfoSchema(**plan.daily_nutrition_target)
-        
-        result.append(MealPlanResponse(
-            id=plan.id,
-            user_id=plan.user_id,
-            start_date=plan.start_date,
-            end_date=plan.end_date,
-            meals=meal_responses,
-            daily_nutrition=daily_nutrition,
-            goal=plan.goal,
-            created_at=plan.created_at,
-        ))
+        first = bisect.bisect_left(meal_dates, plan.start_date)
+        last = bisect.bisect_right(meal_dates, plan.end_date)
+        result.append(_meal_plan_to_response(plan, meals[first:last]))
     
-    return result
+    return set_etag(FastJSONResponse(result), etag)
 
 @router.post("", response_model=MealPlanResponse, status_code=status.HTTP_201_CREATED)
 async def create_meal_plan(
@@ -111,32 +140,47 @@ async def create_meal_plan(
     db.commit()
     db.refresh(db_meal_plan)
     
-    daily_nutrition = None
-    if db_meal_plan.daily_nutrition_target:
-        daily_nutrition = NutritionInfoSchema(**db_meal_plan.daily_nutrition_target)
-    
-    return MealPlanResponse(
-        id=db_meal_plan.id,
-        user_id=db_meal_plan.user_id,
-        start_date=db_meal_plan.start_date,
-        end_date=db_meal_plan.end_date,
-        meals=[],
-        daily_nutrition=daily_nutrition,
-        goal=db_meal_plan.goal,
-        created_at=db_meal_plan.created_at,
-    )
+    return FastJSONResponse(_meal_plan_to_response(db_meal_plan, []), status_code=status.HTTP_201_CREATED)
 
-@router.post("/generate", response_model=MealPlanResponse, status_code=status.HTTP_201_CREATED)
+def _run_generate_job(payload: dict) -> MealPlanResponse:
+    """Background job handler: generate a meal plan in its own DB session."""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == payload["user_id"]).first()
+        if user is None:
+            raise ValueError("User no longer exists")
+        loader = dataset_registry.get(payload.get("dataset") or dataset_registry.select(user))
+        plan, meals = asyncio.run(MealPlanService(loader).generate(
+            db,
+            user,
+            start_date=datetime.fromisoformat(payload["start_date"]),
+            end_date=datetime.fromisoformat(payload["end_date"]),
+            goal=payload["goal"],
+        ))
+        return _meal_plan_to_response(plan, meals)
+    finally:
+        db.close()
+
+job_runner.register(GENERATE_MEAL_PLAN_JOB, _run_generate_job)
+
+@router.post("/generate", response_model=MealPlanResponse, status_code=status.HTTP_201_CREATED,
+             responses={202: {"model": MealPlanJobResponse, "description": "Generation queued (background=true)"}})
 async def generate_meal_plan(
+    request: Request,
     start_date: datetime = Query(..., description="Start date for meal plan"),
     end_date: datetime = Query(..., description="End date for meal plan"),
     goal: Optional[str] = Query(None, description="Health goal: weight_loss, muscle_gain, maintenance, diabetes_management"),
+    background: bool = Query(False, description="Queue generation and return 202 with a job id instead of waiting"),
+    stream: bool = Query(False, description="Stream the plan as NDJSON: a header line, then one line per generated day"),
+    dataset: Optional[str] = Query(None, description="Recommendation dataset; defaults by locale, cuisine preference, then the default dataset"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Automatically generate a complete meal plan with meals for each day.
     Uses AI recommendations based on user profile, preferences, and goals.
+    With background=true the plan is generated by a worker; poll /meal-plans/jobs/{job_id}.
+    With stream=true each day is committed and sent as soon as it is generated.
     """
     # Validate date range
     if end_date <= start_date:
@@ -153,139 +197,91 @@ async def generate_meal_plan(
             detail="Meal plan cannot exceed 30 days"
         )
     
-    # Calculate user's daily nutrition targets
-    tdee = current_user.calculate_tdee() or 2000  # Default to 2000 if not calculated
-    goal = goal or current_user.health_goal or "maintenance"
-    
-    # Adjust calories based on goal
-    calorie_adjustments = {
-        "weight_loss": 0.85,  # 15% deficit
-        "muscle_gain": 1.15,  # 15% surplus
-        "maintenance": 1.0,
-        "diabetes_management": 0.95,  # Slight deficit
-    }
-    daily_calories = tdee * calorie_adjustments.get(goal, 1.0)
-    
-    # Calculate macronutrient targets (based on goal)
-    if goal == "muscle_gain":
-        protein_ratio = 0.30  # 30% protein
-        carb_ratio = 0.40     # 40% carbs
-        fat_ratio = 0.30      # 30% fat
-    elif goal == "weight_loss":
-        protein_ratio = 0.35  # Higher protein for satiety
-        carb_ratio = 0.35
-        fat_ratio = 0.30
-    else:  # maintenance or diabetes_management
-        protein_ratio = 0.25
-        carb_ratio = 0.45
-        fat_ratio = 0.30
-    
-    daily_protein = (daily_calories * protein_ratio) / 4  # 4 cal per gram
-    daily_carbs = (daily_calories * carb_ratio) / 4
-    daily_fat = (daily_calories * fat_ratio) / 9  # 9 cal per gram
-    
-    # Create meal plan
-    db_meal_plan = MealPlan(
-        user_id=current_user.id,
-        start_date=start_date,
-        end_date=end_date,
-        goal=goal,
-        daily_nutrition_target={
-            "calories": daily_calories,
-            "protein": daily_protein,
-            "carbohydrates": daily_carbs,
-            "fat": daily_fat,
-            "fiber": 25.0,  # Recommended daily fiber
+    try:
+        dataset_name = dataset_registry.select(current_user, dataset, request.headers.get("accept-language"))
+    except UnknownDataset as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if background:
+        owner = str(current_user.id)
+        payload = {
+            "user_id": owner,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "goal": goal,
+            "dataset": dataset_name,
         }
-    )
-    
-    db.add(db_meal_plan)
-    db.commit()
-    db.refresh(db_meal_plan)
-    
-    # Generate meals for each day
-    recommendation_service = RecommendationService()
-    meal_types = ["breakfast", "lunch", "dinner", "snack"]
-    
-    # Meal calorie distribution
-    meal_calorie_distribution = {
-        "breakfast": 0.25,
-        "lunch": 0.35,
-        "dinner": 0.30,
-        "snack": 0.10,
-    }
-    
-    created_meals = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        for meal_type in meal_types:
-            target_calories = daily_calories * meal_calorie_distribution[meal_type]
-            
-            # Get recommendations
-            recommendations = await recommendation_service.generate_recommendations(
-                user=current_user,
-                meal_type=meal_type,
-                date=current_date
+        # Retries of the same request reuse the pending job instead of duplicating work
+        dedupe_key = f"{GENERATE_MEAL_PLAN_JOB}:{owner}:{payload['start_date']}:{payload['end_date']}:{goal}:{dataset_name}"
+        try:
+            job = job_runner.submit(GENERATE_MEAL_PLAN_JOB, payload, owner=owner, dedupe_key=dedupe_key)
+        except JobQueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Meal plan generation queue is full, please retry later",
+                headers={"Retry-After": "5"},
             )
-            
-            if recommendations:
-                # Use the first recommendation
-                recommended_meal = recommendations[0]
-                
-                # Create meal
-                meal_nutrition = recommended_meal.nutrition
-                db_meal = Meal(
-                    user_id=current_user.id,
-                    name=recommended_meal.name,
-                    description=recommended_meal.description or f"Generated {meal_type}",
-                    meal_type=meal_type,
-                    date=current_date,
-                    nutrition_info=meal_nutrition.dict() if meal_nutrition else None,
-                )
-                
-                db.add(db_meal)
-                db.flush()  # Get meal ID
-                
-                # Create food items
-                for food_item in recommended_meal.foods:
-                    food_nutrition = food_item.nutrition
-                    db_food_item = FoodItem(
-                        meal_id=db_meal.id,
-                        name=food_item.name,
-                        quantity=food_item.quantity,
-                        unit=food_item.unit,
-                        nutrition_info=food_nutrition.dict() if food_nutrition else None,
-                    )
-                    db.add(db_food_item)
-                
-                created_meals.append(db_meal)
-        
-        # Move to next day
-        current_date += timedelta(days=1)
-    
-    db.commit()
-    
-    # Refresh all meals to get IDs
-    for meal in created_meals:
-        db.refresh(meal)
+        return FastJSONResponse(
+            job.to_dict(),
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Location": f"/api/v1/meal-plans/jobs/{job.id}"},
+        )
     
-    # Convert meals to response format
-    meal_responses = [_meal_to_response(m) for m in created_meals]
+    meal_plan_service = MealPlanService(dataset_registry.get(dataset_name))
     
-    # Get daily nutrition
-    daily_nutrition = NutritionInfoSchema(**db_meal_plan.daily_nutrition_target)
+    if stream:
+        plan = meal_plan_service.create_plan(db, current_user, start_date, end_date, goal)
+        return StreamingResponse(
+            _stream_meal_plan(meal_plan_service, db, current_user, plan),
+            status_code=status.HTTP_201_CREATED,
+            media_type="application/x-ndjson",
+        )
     
-    return MealPlanResponse(
-        id=db_meal_plan.id,
-        user_id=db_meal_plan.user_id,
-        start_date=db_meal_plan.start_date,
-        end_date=db_meal_plan.end_date,
-        meals=meal_responses,
-        daily_nutrition=daily_nutrition,
-        goal=db_meal_plan.goal,
-        created_at=db_meal_plan.created_at,
-    )
+    plan, meals = await meal_plan_service.generate(db, current_user, start_date, end_date, goal)
+    return FastJSONResponse(_meal_plan_to_response(plan, meals), status_code=status.HTTP_201_CREATED)
+
+def _ndjson_line(data: dict) -> bytes:
+    return json_dumps(data) + b"\n"
+
+async def _stream_meal_plan(meal_plan_service: MealPlanService, db: Session, user: User, plan: MealPlan):
+    """
+    Yield NDJSON lines for a plan being generated:
+    {"type": "plan", ...} first, then {"type": "day", "date": ..., "meals": [...]}
+    per day and a final {"type": "end", ...} (or {"type": "error", ...}).
+    """
+    header = _meal_plan_to_response(plan, [])
+    header_fields = {key: getattr(header, key) for key in MealPlanResponse.model_fields if key != "meals"}
+    yield _ndjson_line({"type": "plan", **header_fields})
+    
+    days = 0
+    meal_count = 0
+    try:
+        async for date, meals in meal_plan_service.iter_days(db, user, plan):
+            days += 1
+            meal_count += len(meals)
+            yield _ndjson_line({"type": "day", "date": date, "meals": [_meal_to_response(m) for m in meals]})
+    except Exception as e:
+        # Headers are already sent; report the failure in-band
+        db.rollback()
+        print(f"Meal plan streaming error: {e}")
+        yield _ndjson_line({"type": "error", "detail": "Meal plan generation failed", "days": days})
+        return
+    
+    yield _ndjson_line({"type": "end", "days": days, "meal_count": meal_count})
+
+@router.get("/jobs/{job_id}", response_model=MealPlanJobResponse)
+async def get_generate_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """Get the status of a background meal plan generation, with the plan once it succeeded."""
+    job = job_runner.get(job_id)
+    if job is None or job.owner != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return FastJSONResponse(job.to_dict())
 
 @router.post("/meals", response_model=MealResponse, status_code=status.HTTP_201_CREATED)
 async def create_meal(
@@ -325,7 +321,7 @@ async def create_meal(
         description=meal_data.description,
         meal_type=meal_data.meal_type,
         date=meal_data.date,
-        nutrition_info=meal_data.nutrition.dict() if meal_data.nutrition else None,
+        nutrition_info=meal_data.nutrition.model_dump() if meal_data.nutrition else None,
     )
     db.add(db_meal)
     db.flush()  # Get meal ID
@@ -338,12 +334,140 @@ async def create_meal(
             name=food_item.name,
             quantity=food_item.quantity,
             unit=food_item.unit,
-            nutrition_info=food_nutrition.dict() if food_nutrition else None,
+            nutrition_info=food_nutrition.model_dump() if food_nutrition else None,
         )
         db.add(db_food_item)
     
+    # Keep the daily rollup in the same transaction as the meal
+    nutrition_rollup.add_meals(db, current_user.id, [
+        (db_meal.date, nutrition_rollup.meal_totals(
+            db_meal.nutrition_info,
+            [food.nutrition.model_dump() if food.nutrition else None for food in meal_data.foods],
+        ))
+    ])
+    
     db.commit()
     db.refresh(db_meal)
     
-    return _meal_to_response(db_meal)
+    return FastJSONResponse(_meal_to_response(db_meal), status_code=status.HTTP_201_CREATED)
 
+
+@router.post("/meals/batch", response_model=MealBatchResponse)
+async def create_meals_batch(
+    batch: MealBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Log many meals at once (offline sync), in one transaction.
+    Each meal carries a client-generated client_id: meals whose client_id was
+    already logged are not created again and are returned with status "existing",
+    so a sync can be replayed safely. Days without a covering meal plan get one,
+    as with POST /meals.
+    """
+    # Each conflict means a concurrent replay of the same sync inserted some of
+    # these client_ids first; they are "existing" on the next attempt, so every
+    # retry has fewer meals to insert and the loop ends
+    for attempt in range(len(batch.meals) + 1):
+        try:
+            results = _log_meals(db, current_user, batch)
+            break
+        except IntegrityError:
+            db.rollback()
+            if attempt == len(batch.meals):
+                raise
+    return FastJSONResponse(MealBatchResponse.model_construct(results=results))
+
+def _utc(moment: datetime) -> datetime:
+    """Aware UTC datetime; naive values (from clients or SQLite) are taken as UTC."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+def _covers(start: datetime, end: datetime, moment: datetime) -> bool:
+    """start <= moment <= end, compared in UTC whether or not each value carries an offset."""
+    return _utc(start) <= _utc(moment) <= _utc(end)
+
+def _log_meals(db: Session, user: User, batch: MealBatchCreate) -> List[MealBatchResult]:
+    """Insert the batch's new meals (and any missing day plans) and commit; results in request order."""
+    client_ids = {item.client_id for item in batch.meals}
+    meals_by_client_id = {
+        meal.client_id: meal
+        for meal in db.query(Meal).options(selectinload(Meal.food_items)).filter(
+            Meal.user_id == user.id,
+            Meal.client_id.in_(client_ids)
+        )
+    } if client_ids else {}
+    existing = set(meals_by_client_id)
+    new_items = []
+    for item in batch.meals:
+        if item.client_id not in meals_by_client_id:
+            meals_by_client_id[item.client_id] = None  # Later repeats in the batch are "existing"
+            new_items.append(item)
+    
+    if new_items:
+        # Every plan overlapping the batch's date range, in one query. Clients may mix
+        # naive and offset dates and SQLite keeps only wall-clock values, so the range
+        # is widened by a day (more than any UTC offset) and _covers decides in UTC
+        dates = [_utc(item.date) for item in new_items]
+        plans = db.query(MealPlan.start_date, MealPlan.end_date).filter(
+            MealPlan.user_id == user.id,
+            MealPlan.start_date <= max(dates) + timedelta(days=1),
+            MealPlan.end_date >= min(dates) - timedelta(days=1)
+        ).all()
+        
+        for item in new_items:
+            if not any(_covers(start, end, item.date) for start, end in plans):
+                # Create a meal plan for the day, as POST /meals does
+                day_start = item.date.replace(hour=0, minute=0, second=0, microsecond=0)
+                day_end = item.date.replace(hour=23, minute=59, second=59, microsecond=999999)
+                db.add(MealPlan(user_id=user.id, start_date=day_start, end_date=day_end, goal=user.health_goal))
+                plans.append((day_start, day_end))
+            
+            db_meal = Meal(
+                user_id=user.id,
+                client_id=item.client_id,
+                name=item.name,
+                description=item.description,
+                meal_type=item.meal_type,
+                date=item.date,
+                nutrition_info=item.nutrition.model_dump() if item.nutrition else None,
+                food_items=[
+                    FoodItem(
+                        name=food_item.name,
+                        quantity=food_item.quantity,
+                        unit=food_item.unit,
+                        nutrition_info=food_item.nutrition.model_dump() if food_item.nutrition else None,
+                    )
+                    for food_item in item.foods
+                ],
+            )
+            db.add(db_meal)
+            meals_by_client_id[item.client_id] = db_meal
+        
+        # Keep the daily rollup in the same transaction as the meals
+        nutrition_rollup.add_meals(db, user.id, [
+            (item.date, nutrition_rollup.meal_totals(
+                item.nutrition.model_dump() if item.nutrition else None,
+                [food.nutrition.model_dump() if food.nutrition else None for food in item.foods],
+            ))
+            for item in new_items
+        ])
+        # One flush inserts all plans, meals and food items (batched per table);
+        # responses are built before commit so nothing has to be reloaded
+        db.flush()
+    
+    seen = set()
+    results = []
+    for item in batch.meals:
+        created = item.client_id not in existing and item.client_id not in seen
+        seen.add(item.client_id)
+        results.append(MealBatchResult.model_construct(
+            client_id=item.client_id,
+            status="created" if created else "existing",
+            meal=_meal_to_response(meals_by_client_id[item.client_id]),
+        ))
+    
+    if new_items:
+        db.commit()
+    return results
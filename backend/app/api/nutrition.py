@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
+from datetime import date, datetime, time, timedelta
 from typing import List
 from pydantic import BaseModel
 from app.database import get_db
 from app.models.user import User
-from app.schemas.meal import FoodItemCreate, NutritionInfoSchema
+from app.models.meal_plan import MealPlan
+from app.schemas.meal import FoodItemCreate, NutritionInfoSchema, DailyNutritionResponse
 from app.api.auth import get_current_user
 from app.services.nutrition_service import NutritionService
+from app.services import nutrition_rollup
 
 router = APIRouter()
 
@@ -52,3 +55,49 @@ async def analyze_nutrition(
     
     return NutritionInfoSchema(**total_nutrition)
 
+
+@router.get("/daily", response_model=List[DailyNutritionResponse])
+async def get_daily_nutrition(
+    start_date: date = Query(..., description="First day (inclusive)"),
+    end_date: date = Query(..., description="Last day (inclusive)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Per-day nutrition totals for a date range, with the daily target of the
+    meal plan covering each day. Days without logged meals are omitted.
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must not be before start date"
+        )
+    
+    rollups = nutrition_rollup.get_range(db, current_user.id, start_date, end_date)
+    if not rollups:
+        return []
+    
+    # One query for every plan overlapping the range; newer plans win
+    plans = db.query(MealPlan).filter(
+        MealPlan.user_id == current_user.id,
+        MealPlan.start_date < datetime.combine(end_date + timedelta(days=1), time.min),
+        MealPlan.end_date >= datetime.combine(start_date, time.min),
+        MealPlan.daily_nutrition_target.isnot(None),
+    ).order_by(MealPlan.created_at.desc()).all()
+    
+    result = []
+    for rollup in rollups:
+        target = None
+        for plan in plans:
+            if plan.start_date.date() <= rollup.day <= plan.end_date.date():
+                target = NutritionInfoSchema(**plan.daily_nutrition_target)
+                break
+        
+        result.append(DailyNutritionResponse(
+            day=rollup.day,
+            totals=NutritionInfoSchema(**{key: getattr(rollup, key) for key in nutrition_rollup.NUTRIENTS}),
+            target=target,
+            meal_count=rollup.meal_count,
+        ))
+    
+    return result
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional, List
@@ -6,21 +6,43 @@ from app.database import get_db
 from app.models.user import User
 from app.schemas.meal import MealResponse
 from app.api.auth import get_current_user
+from app.api.responses import FastJSONResponse
+from app.api.conditional import make_etag, etag_matches, not_modified, set_etag, user_snapshot
+from app.data.dataset_registry import UnknownDataset, dataset_registry
+from app.services import recommendation_store
 from app.services.recommendation_service import RecommendationService
 
 router = APIRouter()
 
 @router.get("", response_model=List[MealResponse])
 async def get_recommendations(
+    request: Request,
     meal_type: str = Query(..., description="Type of meal: breakfast, lunch, dinner, snack"),
     date: Optional[datetime] = Query(None),
+    dataset: Optional[str] = Query(None, description="Recommendation dataset; defaults by locale, cuisine preference, then the default dataset"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get AI-powered meal recommendations based on user profile.
     """
-    recommendation_service = RecommendationService()
+    # Recommendations only change with the profile or the dataset
+    try:
+        dataset_name = dataset_registry.select(current_user, dataset, request.headers.get("accept-language"))
+    except UnknownDataset as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    version = dataset_registry.version(dataset_name)
+    # Weak: every response carries fresh ids and the current date (see recommendation_store.stamp)
+    etag = make_etag("recommendations", meal_type, user_snapshot(current_user), version, weak=True)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Served from the nightly materialized table while it is current
+    stored = recommendation_store.get(db, current_user, meal_type, version, dataset_name)
+    if stored is not None:
+        return set_etag(FastJSONResponse(stored), etag)
+    
+    recommendation_service = RecommendationService(dataset_registry.get(dataset_name))
     
     recommendations = await recommendation_service.generate_recommendations(
         user=current_user,
@@ -28,5 +50,8 @@ async def get_recommendations(
         date=date or datetime.now()
     )
     
-    return recommendations
+    payload = recommendation_store.save(db, current_user, meal_type, recommendations, version, dataset_name)
+    db.commit()
+    
+    return set_etag(FastJSONResponse(payload), etag)
 
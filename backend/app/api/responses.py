@@ -0,0 +1,36 @@
+import json
+from typing import Any
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _encode_model(obj: Any):
+    # Models (including ones built with model_construct) are emitted from their
+    # field values as-is, without re-validation; pydantic keeps extras elsewhere
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def json_dumps(content: Any) -> bytes:
+    """Serialize content the same way FastJSONResponse renders it."""
+    if orjson is None:
+        return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, default=_encode_model)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson (datetime, UUID and pydantic models included).
+    Return it directly from an endpoint to bypass response_model re-validation.
+    Falls back to the standard encoder when orjson is not installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
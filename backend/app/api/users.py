@@ -1,29 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
 from app.api.auth import get_current_user
+from app.services.user_cache import user_cache
+from app.api.conditional import make_etag, etag_matches, not_modified, set_etag, user_snapshot
 
 router = APIRouter()
 
 @router.get("/profile", response_model=UserResponse)
-async def get_profile(current_user: User = Depends(get_current_user)):
+async def get_profile(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    etag = make_etag("profile", user_snapshot(current_user))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return current_user
 
 @router.put("/profile", response_model=UserResponse)
 async def update_profile(
     user_update: UserUpdate,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    update_data = user_update.dict(exclude_unset=True)
+    update_data = user_update.model_dump(exclude_unset=True)
     
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
     db.commit()
+    user_cache.invalidate(current_user.id)
     db.refresh(current_user)
     
+    set_etag(response, make_etag("profile", user_snapshot(current_user)))
     return current_user
 
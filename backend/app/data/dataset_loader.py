@@ -3,33 +3,414 @@ Dataset loader for meal plan recommendations.
 Loads and processes the comprehensive diet recommendations dataset CSV file.
 """
 import csv
+import math
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, List, Dict, Optional, Sequence, Tuple
+import numpy as np
+from app.config import settings
 from app.models.user import User
+from app.data.preference_matcher import PreferenceMatcher, allergen_terms
+
+# Columns of the comprehensive dataset used for matching; nothing else is kept
+NUMERIC_COLUMNS = ("Age", "BMI", "Daily_Caloric_Intake")
+CATEGORICAL_COLUMNS = (
+    "Gender", "Disease_Type", "Physical_Activity_Level", "Dietary_Restrictions",
+    "Allergies", "Preferred_Cuisine", "Diet_Recommendation",
+)
+
+MEAL_CALORIE_RATIOS = {
+    "breakfast": 0.25,
+    "lunch": 0.35,
+    "dinner": 0.30,
+    "snack": 0.10,
+}
+
+# Base meal names by cuisine and meal type
+CUISINE_MEALS = {
+    "Indian": {
+        "breakfast": ["Poha", "Upma", "Dosa", "Idli", "Paratha", "Poha with vegetables", "Vegetable upma"],
+        "lunch": ["Dal rice", "Vegetable curry with roti", "Rajma rice", "Chana masala", "Palak paneer", "Mixed vegetable curry"],
+        "dinner": ["Dal tadka with rice", "Vegetable biryani", "Paneer curry", "Lentil soup", "Vegetable pulao"],
+        "snack": ["Fruit", "Nuts", "Yogurt", "Roasted chickpeas", "Vegetable salad"]
+    },
+    "Chinese": {
+        "breakfast": ["Steamed buns", "Congee", "Scrambled eggs", "Vegetable soup", "Rice porridge"],
+        "lunch": ["Stir-fried vegetables", "Tofu curry", "Vegetable noodles", "Steamed rice with vegetables", "Hot and sour soup"],
+        "dinner": ["Vegetable fried rice", "Steamed vegetables", "Tofu stir-fry", "Mixed vegetable curry", "Clear soup"],
+        "snack": ["Fruit", "Steamed dumplings", "Vegetable spring rolls", "Nuts"]
+    },
+    "Mexican": {
+        "breakfast": ["Scrambled eggs", "Avocado toast", "Breakfast burrito", "Fruit bowl", "Oatmeal"],
+        "lunch": ["Bean burrito", "Vegetable fajitas", "Rice and beans", "Guacamole with vegetables", "Vegetable quesadilla"],
+        "dinner": ["Vegetable tacos", "Bean soup", "Rice bowl", "Vegetable enchiladas", "Grilled vegetables"],
+        "snack": ["Fruit", "Nuts", "Vegetable sticks", "Hummus"]
+    },
+    "Italian": {
+        "breakfast": ["Oatmeal", "Fruit bowl", "Yogurt", "Whole grain toast", "Scrambled eggs"],
+        "lunch": ["Pasta with vegetables", "Minestrone soup", "Caprese salad", "Risotto", "Vegetable pizza"],
+        "dinner": ["Pasta primavera", "Vegetable lasagna", "Grilled vegetables", "Risotto", "Vegetable soup"],
+        "snack": ["Fruit", "Nuts", "Olives", "Cheese"]
+    }
+}
+
+
+def estimate_macro_ratios(diet_recommendation: Optional[str], tags: Iterable[str]) -> Tuple[float, float, float, float]:
+    """
+    Protein, carbohydrate and fat shares of a meal's calories, plus its fiber
+    in grams, estimated from its diet recommendation and tags.
+    """
+    # Default ratios
+    protein_ratio = 0.25
+    carb_ratio = 0.45
+    fat_ratio = 0.30
+    
+    # Adjust based on diet recommendation first
+    if diet_recommendation:
+        if diet_recommendation == "Low_Carb":
+            protein_ratio = 0.40
+            carb_ratio = 0.20
+            fat_ratio = 0.40
+        elif diet_recommendation == "Low_Sodium":
+            protein_ratio = 0.30
+            carb_ratio = 0.45
+            fat_ratio = 0.25
+        elif diet_recommendation == "Balanced":
+            protein_ratio = 0.25
+            carb_ratio = 0.45
+            fat_ratio = 0.30
+    
+    # Adjust based on tags
+    tags_lower = [tag.lower() for tag in tags]
+    
+    if "high-protein" in tags_lower or "protein" in tags_lower:
+        protein_ratio = 0.35
+        carb_ratio = 0.35
+        fat_ratio = 0.30
+    elif "low-carb" in tags_lower or "low_carb" in tags_lower:
+        protein_ratio = 0.40
+        carb_ratio = 0.20
+        fat_ratio = 0.40
+    elif "low-fat" in tags_lower:
+        protein_ratio = 0.30
+        carb_ratio = 0.55
+        fat_ratio = 0.15
+    elif "high-calorie" in tags_lower:
+        protein_ratio = 0.25
+        carb_ratio = 0.50
+        fat_ratio = 0.25
+    
+    # Estimate fiber (typically 5-15g per meal)
+    fiber = 8.0 if "fiber-rich" in tags_lower or "fiber" in tags_lower else 5.0
+    return protein_ratio, carb_ratio, fat_ratio, fiber
+
+def resolve_dataset_path() -> Tuple[Optional[Path], Optional[str]]:
+    """Return (path, type) of the dataset to use: comprehensive first, then simple."""
+    backend_dir = Path(__file__).parent.parent.parent
+    comprehensive_path = backend_dir / "ml" / "diet_recommendations_dataset.csv"
+    simple_path = Path(__file__).parent / "meal_plan_dataset.csv"
+    
+    if comprehensive_path.exists():
+        return comprehensive_path, "comprehensive"
+    elif simple_path.exists():
+        return simple_path, "simple"
+    return None, None
+
+def detect_dataset_type(path: Path) -> str:
+    """"simple" for the Age_Group/Goal rule table layout, else "comprehensive" (from the CSV header)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    return "simple" if "Age_Group" in header else "comprehensive"
+
+def file_version(path: Optional[Path], dataset_type: Optional[str]) -> str:
+    """Cheap version string of a dataset file (type, name, size and mtime), without loading it."""
+    if path is None or not path.exists():
+        return "none"
+    stat = path.stat()
+    return f"{dataset_type}:{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def dataset_version() -> str:
+    """Version string of the default dataset as loaded (see file_version); no filesystem access once loaded."""
+    return get_dataset_loader().version
+
+# Scored categorical columns of ComprehensiveDataset (see _category_points)
+CATEGORY_SCORES = ("disease", "activity", "restrictions", "cuisine", "gender")
+# Rough peak working set per user x row cell while batch scoring
+BATCH_BYTES_PER_CELL = 48
+# Categorical points of rows containing one of the user's allergens; sinks any total below zero
+ALLERGEN_PENALTY = -1000
+
+
+AGE_STEPS = (5, 10, 15)  # Age matching (within 10 years gets points)
+BMI_STEPS = (1, 2, 3)  # BMI matching (within 2 points gets points)
+
+
+def _proximity_points(diff: np.ndarray, known: np.ndarray, steps: Tuple[float, float, float]) -> np.ndarray:
+    """10, 5 or 2 points for differences within each of `steps`; NaN differences get none."""
+    near, mid, far = steps
+    return np.select([known & (diff <= near), known & (diff <= mid), known & (diff <= far)], [10, 5, 2], 0)
+
+
+def _top_keys(keys: np.ndarray, k: int) -> np.ndarray:
+    """The k largest keys of each row (unordered)."""
+    if keys.shape[1] <= k:
+        return keys
+    return np.partition(keys, keys.shape[1] - k, axis=1)[:, -k:]
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_key: Optional[Tuple[int, int]] = None  # (pid, workers) the pool was created for
+_pool_lock = threading.Lock()
+
+
+def scoring_workers() -> int:
+    """Threads scoring one query's shards (SCORING_WORKERS, defaulting to the CPU count)."""
+    return max(1, settings.scoring_workers or os.cpu_count() or 1)
+
+
+def _scoring_pool() -> ThreadPoolExecutor:
+    """Process-wide scoring thread pool, created on first use in each (forked) process."""
+    global _pool, _pool_key
+    key = (os.getpid(), scoring_workers())
+    if _pool_key != key:
+        with _pool_lock:
+            if _pool_key != key:
+                _pool = ThreadPoolExecutor(max_workers=key[1], thread_name_prefix="scoring")
+                _pool_key = key
+    return _pool
+
+
+def _shard_bounds(size: int) -> List[Tuple[int, int]]:
+    """Row ranges to score in parallel: one per worker, or the whole dataset below PARALLEL_SCORING_MIN_ROWS."""
+    workers = scoring_workers()
+    if workers <= 1 or size < settings.parallel_scoring_min_rows:
+        return [(0, size)]
+    step = -(-size // workers)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+_shared_loader: Optional["MealPlanDatasetLoader"] = None
+_shared_lock = threading.Lock()
+
+
+def get_dataset_loader() -> "MealPlanDatasetLoader":
+    """
+    Process-wide loader, parsed once and reused by every request.
+    When served by gunicorn (see gunicorn.conf.py) it is loaded in the parent
+    before workers fork, so they all share one copy. The file is not checked
+    again: a new dataset file takes effect when the server (the gunicorn
+    master) is restarted, so workers never load private copies.
+    """
+    global _shared_loader
+    if _shared_loader is None:
+        with _shared_lock:
+            if _shared_loader is None:
+                _shared_loader = MealPlanDatasetLoader()
+    return _shared_loader
+
+
+def _parse_float(value: str) -> float:
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return math.nan
+    return number if math.isfinite(number) else math.nan
+
+
+class CategoricalColumn:
+    """String column stored as small integer codes into a tuple of its distinct values."""
+
+    __slots__ = ("codes", "categories")
+
+    def __init__(self, values: List[str]):
+        index: Dict[str, int] = {}
+        codes = [index.setdefault(value, len(index)) for value in values]
+        self.categories = tuple(index)
+        self.codes = np.array(codes, dtype=np.min_scalar_type(max(len(index) - 1, 0)))
+
+    def points(self, predicate: Callable[[str], int]) -> np.ndarray:
+        """`predicate` evaluated once per distinct value; index it with `codes` to get per-row values."""
+        return np.array([predicate(value) for value in self.categories], dtype=np.int64)
+
+    def __getitem__(self, row: int) -> str:
+        return self.categories[self.codes[row]]
+
+
+def _combine_codes(columns: List[CategoricalColumn]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Code each row by its combination of values in `columns`. Returns the
+    per-row combination codes and one example row for each combination.
+    """
+    key = np.zeros(len(columns[0].codes), dtype=np.int64)
+    first_rows = np.zeros(min(len(key), 1), dtype=np.int64)
+    for column in columns:
+        # Re-densify after each column so the key cannot overflow
+        _, first_rows, key = np.unique(key * len(column.categories) + column.codes, return_index=True, return_inverse=True)
+    return key.astype(np.min_scalar_type(max(len(first_rows) - 1, 0))), first_rows
+
+
+class ComprehensiveDataset:
+    """
+    Column-oriented copy of the comprehensive dataset: NumPy arrays for numbers
+    and coded categories for strings. Matching reads these buffers without
+    creating or touching per-row Python objects, which keeps the data compact
+    and lets forked workers share its pages copy-on-write.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, str]]):
+        raw: Dict[str, List[str]] = {column: [] for column in NUMERIC_COLUMNS + CATEGORICAL_COLUMNS}
+        for row in rows:
+            for column, values in raw.items():
+                values.append(row.get(column) or "")
+
+        self.size = len(raw["Age"])
+        # Ages are whole years in the source data; truncate like int(float(value))
+        self.age = np.trunc(np.array([_parse_float(v) for v in raw["Age"]], dtype=np.float64))
+        self.bmi = np.array([_parse_float(v) for v in raw["BMI"]], dtype=np.float64)
+        self.daily_calories = np.array([_parse_float(v) for v in raw["Daily_Caloric_Intake"]], dtype=np.float64)
+        self.gender = CategoricalColumn(raw["Gender"])
+        self.disease = CategoricalColumn(raw["Disease_Type"])
+        self.activity = CategoricalColumn(raw["Physical_Activity_Level"])
+        self.restrictions = CategoricalColumn(raw["Dietary_Restrictions"])
+        self.allergies = CategoricalColumn(raw["Allergies"])
+        self.cuisine = CategoricalColumn(raw["Preferred_Cuisine"])
+        self.diet = CategoricalColumn(raw["Diet_Recommendation"])
+        # Normalized allergen terms of each distinct Allergies value
+        self.allergen_sets = tuple(allergen_terms(value) for value in self.allergies.categories)
+
+        # Rows with the same diet, disease, restrictions and cuisine share one
+        # MealProfile (names, tags, nutrition estimate); `profile` maps each row
+        # to its combination and `profile_rows` holds one example row of each
+        self.profile, self.profile_rows = _combine_codes([self.diet, self.disease, self.restrictions, self.cuisine])
+        
+        # For batch scoring: rows alike in every scored categorical column and
+        # in allergies form a class, so each user's categorical points are
+        # computed once per class; ages are coded the same way
+        self.row_class, self.class_rows = _combine_codes(
+            [getattr(self, column) for column in CATEGORY_SCORES] + [self.allergies]
+        )
+        self.age_values, age_code = np.unique(self.age, return_inverse=True)
+        self.age_code = age_code.astype(np.min_scalar_type(max(len(self.age_values) - 1, 0)))
+        self.known_bmi = np.where(self.bmi != 0, self.bmi, np.nan)  # 0 never matches, like NaN
+
+    def __len__(self) -> int:
+        return self.size
+
+
+# Columns of the simple dataset that a user's profile must match exactly
+SIMPLE_KEY_COLUMNS = ("Age_Group", "Goal", "BMI_Range", "Activity_Level")
+# Simple-dataset column holding each meal type's name, in order of preference
+SIMPLE_MEAL_COLUMNS = {
+    "breakfast": ("Breakfast",),
+    "lunch": ("Lunch",),
+    "dinner": ("Lunch", "Breakfast"),
+    "snack": ("Lunch", "Breakfast"),
+}
+# Approximate memory per MealProfile and per simple-dataset row (see memory_bytes)
+PROFILE_BYTES = 2048
+SIMPLE_ROW_BYTES = 48
+# The simple dataset grades activity as Low/Medium/High
+SIMPLE_ACTIVITY_LEVELS = {"Sedentary": "Low", "Moderate": "Medium", "Active": "High"}
+
+
+class SimpleDataset:
+    """
+    Hash index over the simple rule table: (age group, goal, BMI range,
+    activity) -> per-meal-type match entries, parsed once at load time.
+    Lookups are one dict access and return the stored list as-is.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, str]]):
+        self.size = 0
+        self.index: Dict[Tuple[str, ...], Dict[str, List[Dict]]] = {}
+        # Rule tables repeat the same meals across many keys; share their entries
+        entries: Dict[Tuple[str, int, str], Dict] = {}
+        for row in rows:
+            self.size += 1
+            key = tuple(row.get(column) for column in SIMPLE_KEY_COLUMNS)
+            by_meal_type = self.index.setdefault(key, {meal_type: [] for meal_type in SIMPLE_MEAL_COLUMNS})
+            raw_tags = row.get("Tags") or ""
+            calories = _parse_float(row.get("Calories", 500))
+            calories = 500 if math.isnan(calories) else int(calories)
+            for meal_type, columns in SIMPLE_MEAL_COLUMNS.items():
+                name = next((row.get(column) for column in columns if row.get(column)), None)
+                if not name:
+                    continue
+                entry = entries.get((name, calories, raw_tags))
+                if entry is None:
+                    tags = tuple(raw_tags.split(", ")) if raw_tags else ()
+                    entry = entries[(name, calories, raw_tags)] = {
+                        "name": name,
+                        "calories": calories,
+                        "tags": tags,
+                        "macro_ratios": estimate_macro_ratios(None, tags),
+                    }
+                by_meal_type[meal_type].append(entry)
+
+    def matches(self, key: Tuple[str, ...], meal_type: str) -> List[Dict]:
+        """Entries for a profile key and meal type (shared; callers must not modify them)."""
+        by_meal_type = self.index.get(key)
+        if by_meal_type is None:
+            return []
+        return by_meal_type.get(meal_type, [])
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class MealProfile:
+    """Values derived once per distinct (diet, disease, restrictions, cuisine) combination."""
+
+    __slots__ = ("diet_recommendation", "disease_type", "restrictions", "cuisine", "names", "tags", "macro_ratios")
+
+    def __init__(self, diet_recommendation: str, disease_type: str, restrictions: str, cuisine: str,
+                 names: Optional[Dict[str, str]], tags: Tuple[str, ...]):
+        self.diet_recommendation = diet_recommendation
+        self.disease_type = disease_type
+        self.restrictions = restrictions
+        self.cuisine = cuisine
+        self.names = names  # Per meal type; None when the row has no cuisine (depends on the user's)
+        self.tags = tags
+        self.macro_ratios = estimate_macro_ratios(diet_recommendation, tags)
+
 
 class MealPlanDatasetLoader:
     """Load and query meal plan dataset based on user attributes."""
     
-    def __init__(self):
-        # Try comprehensive dataset first, fallback to simple dataset
-        backend_dir = Path(__file__).parent.parent.parent
-        comprehensive_path = backend_dir / "ml" / "diet_recommendations_dataset.csv"
-        simple_path = Path(__file__).parent / "meal_plan_dataset.csv"
-        
-        if comprehensive_path.exists():
-            self.dataset_path = comprehensive_path
-            self.dataset_type = "comprehensive"
-        elif simple_path.exists():
-            self.dataset_path = simple_path
-            self.dataset_type = "simple"
+    def __init__(self, dataset_path: Optional[Path] = None, dataset_type: str = "comprehensive"):
+        if dataset_path is None:
+            # Try comprehensive dataset first, fallback to simple dataset
+            self.dataset_path, self.dataset_type = resolve_dataset_path()
         else:
-            self.dataset_path = None
-            self.dataset_type = None
+            self.dataset_path, self.dataset_type = Path(dataset_path), dataset_type
+        # Version of the file as loaded (see file_version), read once here
+        self.version = file_version(self.dataset_path, self.dataset_type)
         
-        self.dataset = []
+        self.simple: Optional[SimpleDataset] = None
+        self.comprehensive: Optional[ComprehensiveDataset] = None
+        self.profiles: List[MealProfile] = []
         self._load_dataset()
     
+    def __len__(self) -> int:
+        if self.comprehensive is not None:
+            return len(self.comprehensive)
+        if self.simple is not None:
+            return len(self.simple)
+        return 0
+    
+    def memory_bytes(self) -> int:
+        """Rough size of the loaded data, for the dataset registry's memory budget."""
+        if self.comprehensive is not None:
+            data = self.comprehensive
+            arrays = [value for value in vars(data).values() if isinstance(value, np.ndarray)]
+            arrays += [value.codes for value in vars(data).values() if isinstance(value, CategoricalColumn)]
+            return sum(array.nbytes for array in arrays) + PROFILE_BYTES * len(self.profiles)
+        if self.simple is not None:
+            return SIMPLE_ROW_BYTES * len(self.simple)
+        return 0
+    
     def _load_dataset(self):
         """Load dataset from CSV file."""
         if not self.dataset_path or not self.dataset_path.exists():
@@ -39,12 +420,33 @@ class MealPlanDatasetLoader:
         try:
             with open(self.dataset_path, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
-                for row in reader:
-                    self.dataset.append(row)
-            print(f"Loaded {len(self.dataset)} entries from {self.dataset_type} dataset")
+                if self.dataset_type == "comprehensive":
+                    self.comprehensive = ComprehensiveDataset(reader)
+                    self.profiles = [self._build_profile(row) for row in self.comprehensive.profile_rows.tolist()]
+                else:
+                    self.simple = SimpleDataset(reader)
+            print(f"Loaded {len(self)} entries from {self.dataset_type} dataset")
         except Exception as e:
             print(f"Error loading dataset: {e}")
-            self.dataset = []
+            self.simple = None
+            self.comprehensive = None
+            self.profiles = []
+    
+    def _build_profile(self, row: int) -> MealProfile:
+        """Derive the name per meal type, tags and nutrition estimate shared by rows like `row`."""
+        data = self.comprehensive
+        diet_recommendation = data.diet[row] or "Balanced"
+        disease_type = data.disease[row]
+        restrictions = data.restrictions[row]
+        cuisine = data.cuisine[row]
+        names = None
+        if cuisine:
+            names = {
+                meal_type: self._generate_meal_name(meal_type, diet_recommendation, cuisine, disease_type)
+                for meal_type in MEAL_CALORIE_RATIOS
+            }
+        tags = tuple(self._generate_tags(diet_recommendation, disease_type, restrictions))
+        return MealProfile(diet_recommendation, disease_type, restrictions, cuisine, names, tags)
     
     def _calculate_bmi(self, user: User) -> Optional[float]:
         """Calculate BMI from user height and weight."""
@@ -105,15 +507,6 @@ class MealPlanDatasetLoader:
             return ",".join(restrictions)
         return "None"
     
-    def _get_allergies(self, user: User) -> str:
-        """Get allergies from user profile."""
-        if user.allergies:
-            # Convert list to comma-separated string or return as is
-            if isinstance(user.allergies, list):
-                return ",".join(user.allergies)
-            return str(user.allergies)
-        return "None"
-    
     def _get_preferred_cuisine(self, user: User) -> str:
         """Get preferred cuisine from user profile."""
         if user.food_preferences:
@@ -144,7 +537,7 @@ class MealPlanDatasetLoader:
         Returns:
             List of matching meal entries from dataset
         """
-        if not self.dataset:
+        if not len(self):
             return []
         
         # Use comprehensive dataset matching
@@ -154,158 +547,235 @@ class MealPlanDatasetLoader:
             # Fallback to simple dataset matching
             return self._find_matches_simple(user, meal_type)
     
-    def _find_matches_comprehensive(self, user: User, meal_type: str) -> List[Dict]:
-        """Find matches using comprehensive diet recommendations dataset."""
-        matches = []
+    def find_matching_meals_batch(
+        self,
+        users: Sequence[User],
+        meal_type: str,
+        top_k: int = 10,
+        memory_limit: Optional[int] = None
+    ) -> List[List[Dict]]:
+        """
+        find_matching_meals for many users at once (one result list per user).
+        The comprehensive dataset is scored as a users x rows matrix, in chunks
+        that keep the working set under `memory_limit` bytes
+        (BATCH_SCORING_MEMORY_MB by default), merging each chunk's top-k.
+        """
+        if not len(self) or not users:
+            return [[] for _ in users]
+        if self.dataset_type != "comprehensive":
+            return [self._find_matches_simple(user, meal_type) for user in users]
+        if memory_limit is None:
+            memory_limit = settings.batch_scoring_memory_mb * 2**20
         
-        # Calculate user attributes
-        user_bmi = self._calculate_bmi(user)
+        data = self.comprehensive
+        size = len(data)
+        
+        cells = max(1, memory_limit // BATCH_BYTES_PER_CELL)
+        row_chunk = min(size, cells)
+        # Each user chunk also holds per-user tables over the row classes and ages
+        table_cells = len(data.class_rows) + len(data.age_values)
+        user_chunk = max(1, min(cells // row_chunk, cells // table_cells))
+        
+        results = []
+        for u0 in range(0, len(users), user_chunk):
+            u1 = min(u0 + user_chunk, len(users))
+            class_points, age_points, bmis = self._user_tables(users[u0:u1])
+            # Best keys so far per user; a key encodes (score, earliest row) so
+            # ties resolve like the single-user stable sort
+            best = np.full((u1 - u0, 0), -1, dtype=np.int64)
+            for r0 in range(0, size, row_chunk):
+                r1 = min(r0 + row_chunk, size)
+                score = class_points[:, data.row_class[r0:r1]]
+                score += age_points[:, data.age_code[r0:r1]]
+                bmi_diff = np.abs(bmis[:, None] - data.known_bmi[r0:r1])
+                # 10/5/2 points within BMI_STEPS, as three cumulative thresholds
+                for step, points in zip(BMI_STEPS, (5, 3, 2)):
+                    score += (bmi_diff <= step) * np.int16(points)
+                keys = np.where(score > 0, score * np.int64(size) + (size - 1 - np.arange(r0, r1)), -1)
+                best = _top_keys(np.concatenate([best, keys], axis=1), top_k)
+            
+            for offset, user_keys in enumerate(best):
+                user = users[u0 + offset]
+                user_keys = np.sort(user_keys[user_keys >= 0])[::-1]
+                preferred_cuisine = self._get_preferred_cuisine(user)
+                results.append([
+                    self._match_entry(size - 1 - key % size, key // size, meal_type, preferred_cuisine)
+                    for key in user_keys.tolist()
+                ])
+        return results
+    
+    def _user_tables(self, users: Sequence[User]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per-user tables for batch scoring: categorical points per row class (with
+        allergies folded in as a disqualifying penalty), age points per distinct
+        age, and BMIs. Built per user chunk so their size stays within the cap.
+        """
+        data = self.comprehensive
+        class_points = np.zeros((len(users), len(data.class_rows)), dtype=np.int16)
+        user_points = [self._category_points(user) for user in users]
+        for column in CATEGORY_SCORES:
+            points = np.stack([user[column] for user in user_points]).astype(np.int16)
+            class_points += points[:, getattr(data, column).codes[data.class_rows]]
+        allergic = np.stack([self._allergen_categories(user) for user in users])[:, data.allergies.codes[data.class_rows]]
+        class_points[allergic] = ALLERGEN_PENALTY
+        ages = np.array([float(user.age) if user.age else math.nan for user in users])
+        age_points = _proximity_points(
+            np.abs(ages[:, None] - data.age_values), data.age_values != 0, AGE_STEPS
+        ).astype(np.int16)
+        bmis = np.array([self._calculate_bmi(user) or math.nan for user in users])
+        return class_points, age_points, bmis
+    
+    def _category_points(self, user: User) -> Dict[str, np.ndarray]:
+        """Points the user gives each distinct value of every scored categorical column."""
+        data = self.comprehensive
         disease_type = self._normalize_disease_type(user.health_goal)
         activity = self._normalize_activity(user.activity_level)
         dietary_restrictions = self._get_dietary_restrictions(user)
-        allergies = self._get_allergies(user)
         preferred_cuisine = self._get_preferred_cuisine(user)
         
-        # Score and rank matches
-        scored_matches = []
+        # Dietary restrictions matching
+        def restriction_points(entry_restrictions: str) -> int:
+            if entry_restrictions == dietary_restrictions:
+                return 8
+            if dietary_restrictions != "None" and entry_restrictions != "None":
+                # Partial match
+                if set(dietary_restrictions.split(",")).intersection(entry_restrictions.split(",")):
+                    return 5
+            return 0
         
-        for entry in self.dataset:
-            score = 0
-            
-            # Age matching (within 10 years gets points)
-            entry_age = self._safe_int(entry.get("Age", ""))
-            if user.age and entry_age:
-                age_diff = abs(user.age - entry_age)
-                if age_diff <= 5:
-                    score += 10
-                elif age_diff <= 10:
-                    score += 5
-                elif age_diff <= 15:
-                    score += 2
-            
-            # BMI matching (within 2 points gets points)
-            entry_bmi = self._safe_float(entry.get("BMI", ""))
-            if user_bmi and entry_bmi:
-                bmi_diff = abs(user_bmi - entry_bmi)
-                if bmi_diff <= 1:
-                    score += 10
-                elif bmi_diff <= 2:
-                    score += 5
-                elif bmi_diff <= 3:
-                    score += 2
-            
+        # Gender matching (optional, but can help)
+        gender = user.gender.lower() if user.gender else None
+        
+        return {
             # Disease type matching (exact match gets high score)
-            entry_disease = entry.get("Disease_Type", "")
-            if entry_disease == disease_type:
-                score += 15
-            elif disease_type == "None" and entry_disease == "None":
-                score += 10
-            
+            "disease": data.disease.points(lambda entry_disease: 15 if entry_disease == disease_type else 0),
             # Activity level matching
-            entry_activity = entry.get("Physical_Activity_Level", "")
-            if entry_activity == activity:
-                score += 10
-            elif entry_activity.lower() == activity.lower():
-                score += 8
-            
-            # Dietary restrictions matching
-            entry_restrictions = entry.get("Dietary_Restrictions", "")
-            if entry_restrictions == dietary_restrictions:
-                score += 8
-            elif dietary_restrictions != "None" and entry_restrictions != "None":
-                # Partial match
-                user_restrictions = set(dietary_restrictions.split(","))
-                entry_restrictions_set = set(entry_restrictions.split(","))
-                if user_restrictions.intersection(entry_restrictions_set):
-                    score += 5
-            
-            # Allergies matching (avoid entries with user's allergies)
-            entry_allergies = entry.get("Allergies", "")
-            if allergies != "None" and entry_allergies != "None":
-                user_allergy_list = [a.strip().lower() for a in allergies.split(",")]
-                entry_allergy_list = [a.strip().lower() for a in entry_allergies.split(",")]
-                if any(allergy in entry_allergy_list for allergy in user_allergy_list):
-                    score = -100  # Strong penalty - don't recommend
-            
+            "activity": data.activity.points(
+                lambda entry_activity: 10 if entry_activity == activity
+                else 8 if entry_activity.lower() == activity.lower() else 0
+            ),
+            "restrictions": data.restrictions.points(restriction_points),
             # Preferred cuisine matching
-            entry_cuisine = entry.get("Preferred_Cuisine", "")
-            if entry_cuisine.lower() == preferred_cuisine.lower():
-                score += 5
-            
-            # Gender matching (optional, but can help)
-            entry_gender = entry.get("Gender", "")
-            if user.gender and entry_gender:
-                if user.gender.lower() == entry_gender.lower():
-                    score += 3
-            
-            if score > 0:
-                # Get daily caloric intake from dataset
-                daily_calories = self._safe_float(entry.get("Daily_Caloric_Intake", ""))
-                if not daily_calories:
-                    daily_calories = 2000  # Default
-                
-                # Calculate meal calories based on meal type
-                meal_calorie_ratios = {
-                    "breakfast": 0.25,
-                    "lunch": 0.35,
-                    "dinner": 0.30,
-                    "snack": 0.10,
-                }
-                meal_calories = daily_calories * meal_calorie_ratios.get(meal_type, 0.25)
-                
-                # Get diet recommendation
-                diet_recommendation = entry.get("Diet_Recommendation", "Balanced")
-                
-                scored_matches.append({
-                    "score": score,
-                    "name": self._generate_meal_name(meal_type, diet_recommendation, entry_cuisine or preferred_cuisine, entry_disease),
-                    "calories": round(meal_calories),
-                    "daily_calories": round(daily_calories),
-                    "diet_recommendation": diet_recommendation,
-                    "disease_type": entry_disease,
-                    "activity": entry_activity,
-                    "restrictions": entry_restrictions,
-                    "cuisine": entry_cuisine or preferred_cuisine,
-                    "tags": self._generate_tags(diet_recommendation, entry_disease, entry_restrictions),
-                })
-        
-        # Sort by score and return top matches
-        scored_matches.sort(key=lambda x: x["score"], reverse=True)
-        return scored_matches[:10]  # Return top 10 matches
+            "cuisine": data.cuisine.points(lambda entry_cuisine: 5 if entry_cuisine.lower() == preferred_cuisine.lower() else 0),
+            "gender": data.gender.points(
+                lambda entry_gender: 3 if gender and entry_gender and entry_gender.lower() == gender else 0
+            ),
+        }
     
-    def _find_matches_simple(self, user: User, meal_type: str) -> List[Dict]:
-        """Fallback to simple dataset matching (original method)."""
-        # Get user attributes
-        age_group = self._get_age_group(user.age)
-        goal = self._normalize_goal(user.health_goal)
-        bmi_range = self._get_bmi_range(user)
-        activity = self._normalize_activity(user.activity_level)
+    def _allergen_categories(self, user: User) -> np.ndarray:
+        """Which distinct Allergies values contain one of the user's allergies."""
+        matcher = PreferenceMatcher.for_user(user)
+        return np.array([matcher.has_allergen(terms) for terms in self.comprehensive.allergen_sets], dtype=bool)
+    
+    def _find_matches_comprehensive(self, user: User, meal_type: str) -> List[Dict]:
+        """
+        Find matches using comprehensive diet recommendations dataset.
+        Large datasets are scored in row shards on the scoring thread pool
+        (NumPy releases the GIL in its kernels) and the shards' top 10 merged.
+        """
+        data = self.comprehensive
+        size = len(data)
+        
+        # Calculate user attributes
+        user_bmi = self._calculate_bmi(user)
+        preferred_cuisine = self._get_preferred_cuisine(user)
+        category_points = self._category_points(user)
+        # Allergies matching (never recommend entries with the user's allergies)
+        allergic = self._allergen_categories(user) if PreferenceMatcher.for_user(user).allergies else None
+        
+        def score_shard(bounds: Tuple[int, int]) -> np.ndarray:
+            return self._score_shard(bounds, user.age, user_bmi, category_points, allergic, top_k=10)
+        
+        shards = _shard_bounds(size)
+        if len(shards) == 1:
+            keys = score_shard(shards[0])
+        else:
+            keys = np.concatenate(list(_scoring_pool().map(score_shard, shards)))
+        
+        # Top 10 by score; a key encodes (score, earliest row) so ties keep dataset order
+        keys = np.sort(keys)[::-1][:10]
+        return [self._match_entry(size - 1 - key % size, key // size, meal_type, preferred_cuisine) for key in keys.tolist()]
+    
+    def _score_shard(
+        self,
+        bounds: Tuple[int, int],
+        age: Optional[int],
+        bmi: Optional[float],
+        category_points: Dict[str, np.ndarray],
+        allergic: Optional[np.ndarray],
+        top_k: int,
+    ) -> np.ndarray:
+        """Keys (score * size + size - 1 - row) of the top_k eligible rows in [start, stop), unordered."""
+        data = self.comprehensive
+        start, stop = bounds
+        size = len(data)
         
-        # Find matching entries
-        matches = []
-        for entry in self.dataset:
-            if (entry.get("Age_Group") == age_group and
-                entry.get("Goal") == goal and
-                entry.get("BMI_Range") == bmi_range and
-                entry.get("Activity_Level") == activity):
-                
-                # Extract meal based on meal_type
-                meal_name = None
-                if meal_type == "breakfast":
-                    meal_name = entry.get("Breakfast", "")
-                elif meal_type == "lunch":
-                    meal_name = entry.get("Lunch", "")
-                elif meal_type in ["dinner", "snack"]:
-                    meal_name = entry.get("Lunch", "") or entry.get("Breakfast", "")
-                
-                if meal_name:
-                    matches.append({
-                        "name": meal_name,
-                        "calories": int(entry.get("Calories", 500)),
-                        "tags": entry.get("Tags", "").split(", ") if entry.get("Tags") else [],
-                    })
-        
-        return matches
+        # Score every entry at once; comparisons with NaN (missing values) are False
+        score = np.zeros(stop - start, dtype=np.int64)
+        
+        if age:
+            ages = data.age[start:stop]
+            score += _proximity_points(np.abs(age - ages), ages != 0, AGE_STEPS)
+        
+        if bmi:
+            bmis = data.bmi[start:stop]
+            score += _proximity_points(np.abs(bmi - bmis), bmis != 0, BMI_STEPS)
+        
+        # Disease, activity, restrictions, cuisine and gender matching
+        for column, points in category_points.items():
+            score += points[getattr(data, column).codes[start:stop]]
+        
+        eligible = score > 0
+        if allergic is not None:
+            eligible &= ~allergic[data.allergies.codes[start:stop]]
+        
+        keys = np.where(eligible, score * size + (size - 1 - np.arange(start, stop)), -1)
+        if keys.size > top_k:
+            keys = keys[np.argpartition(keys, keys.size - top_k)[-top_k:]]
+        return keys[keys >= 0]
+    
+    def _match_entry(self, row: int, score: int, meal_type: str, preferred_cuisine: str) -> Dict:
+        """Result entry for one scored row of the comprehensive dataset."""
+        data = self.comprehensive
+        # Get daily caloric intake from dataset
+        daily_calories = float(data.daily_calories[row])
+        if not daily_calories or math.isnan(daily_calories):
+            daily_calories = 2000  # Default
+        
+        # Calculate meal calories based on meal type
+        meal_calories = daily_calories * MEAL_CALORIE_RATIOS.get(meal_type, 0.25)
+        
+        profile = self.profiles[data.profile[row]]
+        if profile.names is not None:
+            name = profile.names.get(meal_type) or self._generate_meal_name(
+                meal_type, profile.diet_recommendation, profile.cuisine, profile.disease_type
+            )
+        else:
+            name = self._generate_meal_name(meal_type, profile.diet_recommendation, preferred_cuisine, profile.disease_type)
+        
+        return {
+            "score": int(score),
+            "name": name,
+            "calories": round(meal_calories),
+            "daily_calories": round(daily_calories),
+            "diet_recommendation": profile.diet_recommendation,
+            "disease_type": profile.disease_type,
+            "activity": data.activity[row],
+            "restrictions": profile.restrictions,
+            "cuisine": profile.cuisine or preferred_cuisine,
+            "tags": profile.tags,
+            "macro_ratios": profile.macro_ratios,
+        }
+    
+    def _find_matches_simple(self, user: User, meal_type: str) -> List[Dict]:
+        """Fallback to simple dataset matching: exact lookup of the user's profile key."""
+        key = (
+            self._get_age_group(user.age),
+            self._normalize_goal(user.health_goal),
+            self._get_bmi_range(user),
+            SIMPLE_ACTIVITY_LEVELS[self._normalize_activity(user.activity_level)],
+        )
+        return self.simple.matches(key, meal_type)
     
     def _get_age_group(self, age: Optional[int]) -> str:
         """Determine age group from user age (for simple dataset)."""
@@ -373,36 +843,8 @@ class MealPlanDatasetLoader:
     
     def _generate_meal_name(self, meal_type: str, diet_recommendation: str, cuisine: str, disease_type: str = None) -> str:
         """Generate meal name based on meal type, diet recommendation, and cuisine."""
-        # Base meal names by cuisine and meal type
-        cuisine_meals = {
-            "Indian": {
-                "breakfast": ["Poha", "Upma", "Dosa", "Idli", "Paratha", "Poha with vegetables", "Vegetable upma"],
-                "lunch": ["Dal rice", "Vegetable curry with roti", "Rajma rice", "Chana masala", "Palak paneer", "Mixed vegetable curry"],
-                "dinner": ["Dal tadka with rice", "Vegetable biryani", "Paneer curry", "Lentil soup", "Vegetable pulao"],
-                "snack": ["Fruit", "Nuts", "Yogurt", "Roasted chickpeas", "Vegetable salad"]
-            },
-            "Chinese": {
-                "breakfast": ["Steamed buns", "Congee", "Scrambled eggs", "Vegetable soup", "Rice porridge"],
-                "lunch": ["Stir-fried vegetables", "Tofu curry", "Vegetable noodles", "Steamed rice with vegetables", "Hot and sour soup"],
-                "dinner": ["Vegetable fried rice", "Steamed vegetables", "Tofu stir-fry", "Mixed vegetable curry", "Clear soup"],
-                "snack": ["Fruit", "Steamed dumplings", "Vegetable spring rolls", "Nuts"]
-            },
-            "Mexican": {
-                "breakfast": ["Scrambled eggs", "Avocado toast", "Breakfast burrito", "Fruit bowl", "Oatmeal"],
-                "lunch": ["Bean burrito", "Vegetable fajitas", "Rice and beans", "Guacamole with vegetables", "Vegetable quesadilla"],
-                "dinner": ["Vegetable tacos", "Bean soup", "Rice bowl", "Vegetable enchiladas", "Grilled vegetables"],
-                "snack": ["Fruit", "Nuts", "Vegetable sticks", "Hummus"]
-            },
-            "Italian": {
-                "breakfast": ["Oatmeal", "Fruit bowl", "Yogurt", "Whole grain toast", "Scrambled eggs"],
-                "lunch": ["Pasta with vegetables", "Minestrone soup", "Caprese salad", "Risotto", "Vegetable pizza"],
-                "dinner": ["Pasta primavera", "Vegetable lasagna", "Grilled vegetables", "Risotto", "Vegetable soup"],
-                "snack": ["Fruit", "Nuts", "Olives", "Cheese"]
-            }
-        }
-        
         # Get base meal options
-        meal_options = cuisine_meals.get(cuisine, {}).get(meal_type, [f"{cuisine} {meal_type}"])
+        meal_options = CUISINE_MEALS.get(cuisine, {}).get(meal_type, [f"{cuisine} {meal_type}"])
         
         # Select meal based on diet recommendation
         if diet_recommendation == "Low_Carb":
@@ -0,0 +1,212 @@
+"""
+Registry of recommendation datasets served side by side.
+
+Besides the default dataset (see get_dataset_loader), deployments can register
+regional or clinical variants by name in the DATASETS setting. Each one is
+loaded into its own MealPlanDatasetLoader (with its own index) on first use,
+dropped again after DATASET_IDLE_SECONDS unused, and the least recently used
+ones are dropped first when loading another would exceed
+DATASET_MEMORY_BUDGET_MB. A dataset is chosen per request by name, or by the
+request's locale or the user's preferred cuisine through the configured maps.
+File versions are read when a dataset is first versioned or (re)loaded, never
+per request; a replaced file is picked up when its dataset is next loaded
+after eviction, or on restart.
+"""
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from app.config import settings
+from app.data.dataset_loader import (
+    MealPlanDatasetLoader, dataset_version, detect_dataset_type, file_version, get_dataset_loader,
+)
+from app.models.user import User
+
+DEFAULT_DATASET = "default"
+
+
+class UnknownDataset(ValueError):
+    """Raised when a request names a dataset that is not registered."""
+
+
+class _Entry:
+    __slots__ = ("path", "dataset_type", "loader", "version", "size", "last_used", "lock")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.dataset_type: Optional[str] = None
+        self.loader: Optional[MealPlanDatasetLoader] = None
+        self.version: Optional[str] = None
+        self.size = 0
+        self.last_used = 0.0
+        self.lock = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def _locale_tags(accept_language: str) -> Tuple[str, ...]:
+    """Language tags of an Accept-Language header, most preferred first, each followed by its primary subtag."""
+    weighted = []
+    for position, part in enumerate(accept_language.split(",")):
+        tag, _, params = part.strip().partition(";")
+        tag = tag.strip().lower()
+        if not tag or tag == "*":
+            continue
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                pass
+        weighted.append((-quality, position, tag))
+    tags = []
+    for _, _, tag in sorted(weighted):
+        tags.append(tag)
+        tags.append(tag.split("-")[0])
+    return tuple(tags)
+
+
+class DatasetRegistry:
+    """Named datasets, lazily loaded and evicted; "default" is the process-wide dataset and is never evicted."""
+
+    def __init__(
+        self,
+        datasets: Dict[str, str],
+        by_locale: Optional[Dict[str, str]] = None,
+        by_cuisine: Optional[Dict[str, str]] = None,
+        idle_seconds: float = 900,
+        memory_budget: int = 512 * 1024 * 1024,
+    ):
+        self._entries = {name: _Entry(Path(path)) for name, path in datasets.items() if name != DEFAULT_DATASET}
+        self.by_locale = {locale.lower(): name for locale, name in (by_locale or {}).items()}
+        self.by_cuisine = {cuisine.lower(): name for cuisine, name in (by_cuisine or {}).items()}
+        for name in list(self.by_locale.values()) + list(self.by_cuisine.values()):
+            if name != DEFAULT_DATASET and name not in self._entries:
+                raise UnknownDataset(f"Dataset map refers to unregistered dataset '{name}'")
+        self.idle_seconds = idle_seconds
+        self.memory_budget = memory_budget
+        self._lock = threading.Lock()
+
+    def names(self) -> Tuple[str, ...]:
+        return (DEFAULT_DATASET,) + tuple(self._entries)
+
+    def select(self, user: Optional[User] = None, requested: Optional[str] = None, accept_language: Optional[str] = None) -> str:
+        """
+        Dataset name for a request: the explicitly requested one, else the first
+        mapped locale in Accept-Language, else the user's first mapped food
+        preference (cuisine), else the default.
+        """
+        if requested:
+            if requested != DEFAULT_DATASET and requested not in self._entries:
+                raise UnknownDataset(f"Unknown dataset '{requested}'")
+            return requested
+        if accept_language and self.by_locale:
+            for tag in _locale_tags(accept_language):
+                if tag in self.by_locale:
+                    return self.by_locale[tag]
+        if user is not None and self.by_cuisine and user.food_preferences:
+            preferences = [user.food_preferences] if isinstance(user.food_preferences, str) else user.food_preferences
+            for preference in preferences:
+                name = self.by_cuisine.get(str(preference).lower())
+                if name:
+                    return name
+        return DEFAULT_DATASET
+
+    def get(self, name: str = DEFAULT_DATASET) -> MealPlanDatasetLoader:
+        """The loader for a dataset, loading it on first use (or first use after eviction)."""
+        if name == DEFAULT_DATASET:
+            return get_dataset_loader()
+        entry = self._entries.get(name)
+        if entry is None:
+            raise UnknownDataset(f"Unknown dataset '{name}'")
+        now = time.monotonic()
+        self._evict_idle(now, keep=name)
+
+        loader = entry.loader
+        if loader is None:
+            with entry.lock:
+                loader = entry.loader
+                if loader is None:
+                    loader = self._load(name, entry)
+        entry.last_used = now
+        return loader
+
+    def version(self, name: str = DEFAULT_DATASET) -> str:
+        """
+        Version string of a dataset, without loading it (used for ETags and
+        stored recommendations). Read from the file once, then cached until the
+        dataset is next loaded.
+        """
+        if name == DEFAULT_DATASET:
+            return dataset_version()
+        entry = self._entries.get(name)
+        if entry is None:
+            raise UnknownDataset(f"Unknown dataset '{name}'")
+        version = entry.version
+        if version is None:
+            with entry.lock:
+                if entry.version is None:
+                    self._read_version(entry)
+                version = entry.version
+        return f"{name}:{version}"
+
+    def resolve(
+        self, user: Optional[User] = None, requested: Optional[str] = None, accept_language: Optional[str] = None
+    ) -> Tuple[str, MealPlanDatasetLoader]:
+        """select() and get() in one call: the chosen dataset's name and loader."""
+        name = self.select(user, requested, accept_language)
+        return name, self.get(name)
+
+    def loaded(self) -> Dict[str, int]:
+        """Approximate memory of each loaded additional dataset, by name."""
+        return {name: entry.size for name, entry in self._entries.items() if entry.loader is not None}
+
+    @staticmethod
+    def _read_version(entry: _Entry):
+        if entry.path.exists():
+            entry.dataset_type = detect_dataset_type(entry.path)
+        entry.version = file_version(entry.path, entry.dataset_type)
+
+    def _load(self, name: str, entry: _Entry) -> MealPlanDatasetLoader:
+        self._read_version(entry)
+        loader = MealPlanDatasetLoader(entry.path, entry.dataset_type or "comprehensive")
+        with self._lock:
+            entry.loader, entry.size = loader, loader.memory_bytes()
+            entry.last_used = time.monotonic()
+            self._evict_over_budget(keep=name)
+        return loader
+
+    def _evict_idle(self, now: float, keep: str):
+        for name, entry in self._entries.items():
+            if name != keep and entry.loader is not None and now - entry.last_used > self.idle_seconds:
+                with self._lock:
+                    if entry.loader is not None and now - entry.last_used > self.idle_seconds:
+                        self._drop(name, entry, "idle")
+
+    def _evict_over_budget(self, keep: str):
+        # Requests still holding an evicted loader keep using it until they finish
+        loaded = sorted(
+            ((entry.last_used, name, entry) for name, entry in self._entries.items()
+             if entry.loader is not None and name != keep),
+            key=lambda item: item[0],
+        )
+        total = sum(entry.size for entry in self._entries.values() if entry.loader is not None)
+        for _, name, entry in loaded:
+            if total <= self.memory_budget:
+                break
+            total -= entry.size
+            self._drop(name, entry, "over memory budget")
+
+    def _drop(self, name: str, entry: _Entry, reason: str):
+        # The version stays cached, so ETags and stored rows keep matching until the next load
+        entry.loader, entry.size = None, 0
+        print(f"Evicted dataset '{name}' ({reason})")
+
+
+dataset_registry = DatasetRegistry(
+    settings.datasets,
+    by_locale=settings.dataset_by_locale,
+    by_cuisine=settings.dataset_by_cuisine,
+    idle_seconds=settings.dataset_idle_seconds,
+    memory_budget=settings.dataset_memory_budget_mb * 1024 * 1024,
+)
@@ -0,0 +1,134 @@
+"""
+Allergy and dietary-preference matching for foods and dataset rows.
+
+A PreferenceMatcher is built once per distinct (allergies, preferences)
+profile and reused for every candidate. Known allergen groups and dietary
+preferences are checked against tags precomputed per food name; free-form
+allergy terms are matched against the name with one compiled regex.
+"""
+import re
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional, Tuple, Union
+
+# Ingredient and allergen tags, implied by words appearing in a food name
+INGREDIENT_KEYWORDS = {
+    "meat": ("chicken", "beef", "turkey", "salmon", "meat"),
+    "animal product": ("egg", "yogurt", "milk", "cheese", "butter"),
+    "dairy": ("yogurt", "milk", "cheese", "cream"),
+    "egg": ("egg",),
+    "fish": ("salmon", "tuna", "cod"),
+    "tree nuts": ("almond", "walnut", "cashew", "pecan", "mixed nuts"),
+    "peanuts": ("peanut",),
+    "gluten": ("toast", "pasta", "wrap", "bread", "noodle"),
+    "soy": ("tofu", "soy"),
+    "sesame": ("sesame", "hummus", "tahini"),
+}
+
+# Tags a food must not carry for each dietary preference
+PREFERENCE_EXCLUSIONS = {
+    "vegetarian": frozenset({"meat"}),
+    "vegan": frozenset({"meat", "animal product"}),
+}
+
+# Other spellings of allergies, mapped to their tag
+ALLERGY_ALIASES = {
+    "milk": "dairy",
+    "lactose": "dairy",
+    "eggs": "egg",
+    "nuts": "tree nuts",
+    "tree nut": "tree nuts",
+    "peanut": "peanuts",
+    "wheat": "gluten",
+    "seafood": "fish",
+}
+
+# Words that start with an ingredient keyword or allergy term without containing it
+FALSE_FRIENDS = ("eggplant", "butternut")
+
+# Keywords must start a word ("eggs" matches "egg", "veggie" does not)
+_TAG_PATTERNS = {
+    tag: re.compile(r"\b(?:" + "|".join(re.escape(word) for word in words) + ")")
+    for tag, words in INGREDIENT_KEYWORDS.items()
+}
+
+
+_FALSE_FRIEND_PATTERN = re.compile(r"\b(?:" + "|".join(FALSE_FRIENDS) + r")s?\b")
+
+
+def _strip_false_friends(name: str, keep: FrozenSet[str] = frozenset()) -> str:
+    """Lower-cased food name without FALSE_FRIENDS words, except those in `keep` (e.g. an "eggplant" allergy)."""
+    return _FALSE_FRIEND_PATTERN.sub(lambda match: match.group() if match.group().rstrip("s") in keep else " ", name.lower())
+
+
+def _normalize(term: str) -> str:
+    return " ".join(term.replace("_", " ").lower().split())
+
+
+def allergen_terms(allergies: Union[str, Iterable[str], None]) -> FrozenSet[str]:
+    """Normalized allergy terms, with their aliased tags, from a comma-separated string or a list."""
+    if not allergies:
+        return frozenset()
+    items = [allergies] if isinstance(allergies, str) else allergies
+    terms = set()
+    for item in items:
+        for term in str(item).split(","):
+            term = _normalize(term)
+            if term and term != "none":
+                terms.add(term)
+                terms.add(ALLERGY_ALIASES.get(term, term))
+    return frozenset(terms)
+
+
+@lru_cache(maxsize=4096)
+def food_tags(food_name: str) -> FrozenSet[str]:
+    """Ingredient and allergen tags implied by a food's name (computed once per name)."""
+    name = _strip_false_friends(food_name)
+    return frozenset(tag for tag, pattern in _TAG_PATTERNS.items() if pattern.search(name))
+
+
+class PreferenceMatcher:
+    """Decides whether foods or dataset rows are excluded for one allergy/preference profile."""
+
+    __slots__ = ("allergies", "excluded_tags", "_pattern")
+
+    def __init__(self, allergies: Iterable[str] = (), preferences: Iterable[str] = ()):
+        self.allergies = allergen_terms(list(allergies))
+        excluded = {term for term in self.allergies if term in INGREDIENT_KEYWORDS}
+        for preference in preferences:
+            excluded |= PREFERENCE_EXCLUSIONS.get(_normalize(preference), frozenset())
+        self.excluded_tags = frozenset(excluded)
+        # Allergy terms also match words of the food name (e.g. "banana"); like
+        # the keywords they must start a word, so "egg" does not match "veggie"
+        words = sorted(self.allergies, key=len, reverse=True)
+        self._pattern: Optional[re.Pattern] = (
+            re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + ")") if words else None
+        )
+
+    @classmethod
+    def for_user(cls, user) -> "PreferenceMatcher":
+        return _matcher_for(_as_tuple(user.allergies), _as_tuple(user.food_preferences))
+
+    def excludes(self, food_name: str) -> bool:
+        """True if the food contains one of the allergens or conflicts with a dietary preference."""
+        if not self.excluded_tags.isdisjoint(food_tags(food_name)):
+            return True
+        if self._pattern is None:
+            return False
+        return self._pattern.search(_strip_false_friends(food_name, self.allergies)) is not None
+
+    def has_allergen(self, terms: FrozenSet[str]) -> bool:
+        """True if any of a dataset row's allergen terms (from allergen_terms) is one of the user's."""
+        return not self.allergies.isdisjoint(terms)
+
+
+def _as_tuple(value) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(str(item) for item in value)
+
+
+@lru_cache(maxsize=1024)
+def _matcher_for(allergies: Tuple[str, ...], preferences: Tuple[str, ...]) -> PreferenceMatcher:
+    return PreferenceMatcher(allergies, preferences)
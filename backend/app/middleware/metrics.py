@@ -0,0 +1,65 @@
+"""
+Request metrics: latency per route template and status, plus the number of
+database statements (and their total time) each request executed.
+Routes are labelled by their template (e.g. /api/v1/meal-plans/jobs/{job_id})
+so label cardinality stays bounded; unmatched paths share one label.
+"""
+import time
+from typing import Dict
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app import metrics
+
+UNMATCHED_ROUTE = "unmatched"
+
+_route_paths: Dict[object, str] = {}
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled a request (call after routing)."""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    path = _route_paths.get(endpoint)
+    if path is None:
+        # The router records the matched endpoint in the scope; map it back
+        # to its path template once and remember it
+        path = UNMATCHED_ROUTE
+        for route in getattr(scope.get("app"), "routes", ()):
+            if getattr(route, "endpoint", None) is endpoint:
+                path = route.path
+                break
+        _route_paths[endpoint] = path
+    return path
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.current_request.reset(token)
+            route = route_template(scope)
+            metrics.HTTP_REQUEST_DURATION.observe(
+                elapsed, method=scope["method"], route=route, status=status_code
+            )
+            metrics.DB_QUERIES_PER_REQUEST.observe(stats.queries, route=route)
+            metrics.DB_TIME_PER_REQUEST.observe(stats.query_seconds, route=route)
@@ -0,0 +1,78 @@
+"""
+Runs individual requests under cProfile when they present the profiling token.
+Only one request is profiled at a time (cProfile sees everything on the event
+loop thread, so overlapping profiles would mix); a request that arrives while
+another is being profiled is served normally with `X-Profile-Status: busy`.
+Work offloaded to the threadpool (sync endpoints/dependencies) is not in the
+call tree, but its SQL statements are still captured.
+"""
+import cProfile
+import threading
+import time
+import uuid
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app import metrics, profiling
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if scope["path"].startswith(profiling.REPORT_PATH_PREFIX) or not profiling.is_authorized(
+            headers.get(profiling.TOKEN_HEADER)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if not self._lock.acquire(blocking=False):
+            async def send_busy(message: Message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("X-Profile-Status", "busy")
+                await send(message)
+
+            await self.app(scope, receive, send_busy)
+            return
+
+        try:
+            await self._profile(scope, receive, send, headers)
+        finally:
+            self._lock.release()
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send, headers: Headers):
+        profile_id = headers.get("x-request-id") or uuid.uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        # MetricsMiddleware (outermost) owns the request stats; ask it to keep statements
+        stats = metrics.current_request.get()
+        if stats is None:
+            stats = metrics.RequestStats()
+            metrics.current_request.set(stats)
+        stats.statements = []
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            report = profiling.build_report(
+                profile_id, profiler, stats.statements, scope["method"], scope["path"], status_code, elapsed
+            )
+            profiling.profile_store.set(profile_id, report)
+            print(f"Stored profile {profile_id} for {scope['method']} {scope['path']} ({elapsed * 1000:.1f} ms)")
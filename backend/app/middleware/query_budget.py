@@ -0,0 +1,41 @@
+"""
+Development aid: logs requests that execute more SQL statements than their
+route's budget in app/query_budget.py, together with the statements. Installed
+only when QUERY_BUDGET_WARNINGS is enabled, since it keeps every statement of
+every request in memory until the response is sent.
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app import metrics
+from app.middleware.metrics import route_template
+from app.query_budget import QueryRecorder, budget_for
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # MetricsMiddleware (outermost) owns the request stats; ask it to keep statements
+        stats = metrics.current_request.get()
+        if stats is None:
+            stats = metrics.RequestStats()
+            metrics.current_request.set(stats)
+        if stats.statements is None:
+            stats.statements = []
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = route_template(scope)
+            budget = budget_for(scope["method"], route)
+            if budget is not None and stats.queries > budget:
+                recorder = QueryRecorder()
+                recorder.statements = stats.statements
+                print(
+                    f"Query budget exceeded: {scope['method']} {route} executed "
+                    f"{stats.queries} SQL statements (budget {budget}):\n{recorder.format()}"
+                )
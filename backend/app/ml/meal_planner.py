@@ -0,0 +1,128 @@
+"""
+Whole-plan meal selection.
+
+Chooses one meal per slot (breakfast, lunch, dinner, snack) for every day of a
+plan in one pass, minimising how far each day's calories and macros fall from
+the plan's daily targets while keeping meals varied across days.
+"""
+import time
+from typing import Dict, List, Sequence
+import numpy as np
+from app import metrics
+from app.schemas.meal import MealResponse
+
+MACROS = ("calories", "protein", "carbohydrates", "fat")
+# Relative weight of each macro's squared relative deviation from its daily target
+MACRO_WEIGHTS = np.array([2.0, 1.0, 1.0, 1.0])
+# Weight of each slot's deviation from its share of the daily calories, so the
+# optimizer does not balance a tiny breakfast with an oversized dinner
+SLOT_SHARE_WEIGHT = 0.25
+
+
+def _macro_vector(meal: MealResponse) -> List[float]:
+    nutrition = meal.nutrition
+    return [(getattr(nutrition, macro) or 0.0) if nutrition else 0.0 for macro in MACROS]
+
+
+class MealPlanner:
+    """
+    Greedy-with-repair planner over every combination of one candidate per slot.
+
+    The cost of each combination is computed once with NumPy broadcasting.
+    Each day then takes the cheapest combination allowed by the variety rule:
+    a meal appears in a slot at most once in any `variety_window` consecutive
+    days (fewer when the slot has fewer candidates). A repair pass re-chooses
+    each day with the rest of the plan fixed, until no day improves.
+    """
+
+    def __init__(self, variety_window: int = 3, repair_passes: int = 3):
+        self.variety_window = variety_window
+        self.repair_passes = repair_passes
+
+    def plan(
+        self,
+        candidates: Dict[str, List[MealResponse]],
+        daily_targets: Dict[str, float],
+        days: int,
+        slot_shares: Dict[str, float],
+    ) -> List[Dict[str, MealResponse]]:
+        """
+        Return, for each day, the chosen meal per slot.
+        Slots without candidates are left out of every day.
+        """
+        slots = [slot for slot, meals in candidates.items() if meals]
+        if not slots or days <= 0:
+            return [{} for _ in range(max(days, 0))]
+
+        start = time.perf_counter()
+        costs, combos = self._combination_costs(
+            [candidates[slot] for slot in slots], daily_targets, [slot_shares.get(slot, 0.0) for slot in slots]
+        )
+        windows = [min(self.variety_window, len(candidates[slot])) for slot in slots]
+
+        # chosen[d] is the index into `costs` picked for day d
+        chosen = np.full(days, -1, dtype=np.int64)
+        for day in range(days):
+            chosen[day] = self._best_for_day(day, chosen, costs, combos, windows)
+
+        for _ in range(self.repair_passes):
+            improved = False
+            for day in range(days):
+                current = chosen[day]
+                chosen[day] = -1
+                best = self._best_for_day(day, chosen, costs, combos, windows)
+                if costs[best] < costs[current]:
+                    chosen[day] = best
+                    improved = True
+                else:
+                    chosen[day] = current
+            if not improved:
+                break
+
+        metrics.MEAL_PLAN_OPTIMIZATION_DURATION.observe(time.perf_counter() - start)
+        return [
+            {slot: candidates[slot][combos[s][combo]] for s, slot in enumerate(slots)}
+            for combo in chosen.tolist()
+        ]
+
+    def _combination_costs(
+        self,
+        pools: List[List[MealResponse]],
+        daily_targets: Dict[str, float],
+        shares: Sequence[float],
+    ):
+        """Cost of every combination of one meal per slot, and each combination's meal index per slot."""
+        target = np.array([float(daily_targets.get(macro) or 0.0) for macro in MACROS])
+        scale = np.where(target > 0, target, 1.0)
+        vectors = [np.array([_macro_vector(meal) for meal in pool]) for pool in pools]
+        shape = tuple(len(pool) for pool in pools)
+
+        totals = np.zeros(shape + (len(MACROS),))
+        share_penalty = np.zeros(shape)
+        for s, (vector, share) in enumerate(zip(vectors, shares)):
+            # Broadcast this slot's candidates along its own axis
+            axis_shape = [1] * len(shape)
+            axis_shape[s] = shape[s]
+            totals = totals + vector.reshape(axis_shape + [len(MACROS)])
+            if share > 0 and target[0] > 0:
+                slot_target = target[0] * share
+                deviation = ((vector[:, 0] - slot_target) / slot_target) ** 2
+                share_penalty = share_penalty + SLOT_SHARE_WEIGHT * deviation.reshape(axis_shape)
+
+        costs = (((totals - target) / scale) ** 2 * np.where(target > 0, MACRO_WEIGHTS, 0.0)).sum(axis=-1)
+        costs = (costs + share_penalty).ravel()
+        combos = np.unravel_index(np.arange(costs.size), shape)
+        return costs, combos
+
+    def _best_for_day(self, day, chosen, costs, combos, windows) -> int:
+        """Cheapest combination for `day` that respects the variety rule against the other chosen days."""
+        feasible = np.ones(costs.size, dtype=bool)
+        for s, window in enumerate(windows):
+            nearby = chosen[max(day - window + 1, 0):day + window]
+            nearby = nearby[nearby >= 0]
+            if nearby.size:
+                feasible &= ~np.isin(combos[s], combos[s][nearby])
+        if not feasible.any():
+            # Only possible while repairing a day squeezed between different neighbours
+            return int(np.argmin(costs))
+        return int(np.argmin(np.where(feasible, costs, np.inf)))
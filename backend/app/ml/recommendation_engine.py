@@ -1,9 +1,12 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
 from datetime import datetime
+import time
 import uuid
+from app import metrics
 from app.models.user import User
 from app.schemas.meal import MealResponse, FoodItemResponse, NutritionInfoSchema
-from app.data.dataset_loader import MealPlanDatasetLoader
+from app.data.dataset_loader import MealPlanDatasetLoader, estimate_macro_ratios, get_dataset_loader
+from app.data.preference_matcher import PreferenceMatcher
 import random
 
 class RecommendationEngine:
@@ -12,9 +15,9 @@ class RecommendationEngine:
     Uses dataset-based recommendations with fallback to default food database.
     """
     
-    def __init__(self):
+    def __init__(self, dataset_loader: Optional[MealPlanDatasetLoader] = None):
         """Initialize recommendation engine with dataset loader."""
-        self.dataset_loader = MealPlanDatasetLoader()
+        self.dataset_loader = dataset_loader if dataset_loader is not None else get_dataset_loader()
     
     # Sample food database (fallback if dataset doesn't have matches)
     FOOD_DATABASE = {
@@ -48,6 +51,19 @@ class RecommendationEngine:
         ],
     }
 
+    # Response nutrition of each catalog food, built once and shared by every response
+    CATALOG_NUTRITION = {
+        (meal_type, food["name"]): NutritionInfoSchema(
+            calories=food["calories"],
+            protein=food["protein"],
+            carbohydrates=food["carbs"],
+            fat=food["fat"],
+            fiber=5.0,
+        )
+        for meal_type, foods in FOOD_DATABASE.items()
+        for food in foods
+    }
+
     def recommend_meals(
         self,
         user: User,
@@ -58,91 +74,60 @@ class RecommendationEngine:
         Generate meal recommendations based on user profile and goals.
         First tries dataset-based recommendations, then falls back to default database.
         """
-        recommendations = []
-        
+        start = time.perf_counter()
         # Try to get recommendations from dataset first
         dataset_meals = self.dataset_loader.find_matching_meals(user, meal_type)
+        recommendations = self._select_recommendations(user, meal_type, target_calories, dataset_meals)
+        metrics.RECOMMENDATION_SCORING_DURATION.observe(time.perf_counter() - start, meal_type=meal_type)
+        return recommendations
+    
+    def recommend_meals_batch(
+        self,
+        users: Sequence[User],
+        meal_type: str,
+        target_calories: Sequence[float]
+    ) -> List[List[MealResponse]]:
+        """
+        recommend_meals for many users at once, for offline jobs.
+        Dataset matching for the whole cohort is one batched matrix operation.
+        """
+        matches = self.dataset_loader.find_matching_meals_batch(users, meal_type)
+        return [
+            self._select_recommendations(user, meal_type, target, dataset_meals)
+            for user, target, dataset_meals in zip(users, target_calories, matches)
+        ]
+    
+    def _select_recommendations(
+        self,
+        user: User,
+        meal_type: str,
+        target_calories: float,
+        dataset_meals: List[Dict]
+    ) -> List[MealResponse]:
+        """Up to 5 recommendations from a user's dataset matches, topped up from the catalog."""
+        recommendations = []
         
         if dataset_meals:
             # Use dataset meals
             calorie_tolerance = target_calories * 0.3  # 30% tolerance for dataset
+            matcher = PreferenceMatcher.for_user(user)
             
             for meal_data in dataset_meals:
                 meal_calories = meal_data.get("calories", target_calories)
                 
-                # Check if calories are within tolerance
-                if abs(meal_calories - target_calories) <= calorie_tolerance:
-                    # Estimate nutrition values based on calories, tags, and diet recommendation
-                    nutrition = self._estimate_nutrition_from_meal(
-                        meal_data["name"],
-                        meal_calories,
-                        meal_data.get("tags", []),
-                        meal_data.get("diet_recommendation")
-                    )
-                    
-                    meal = MealResponse(
-                        id=uuid.uuid4(),
-                        name=meal_data["name"],
-                        description=f"Personalized {meal_type} based on your age, BMI, goal, and activity level",
-                        meal_type=meal_type,
-                        date=datetime.now(),
-                        foods=[
-                            FoodItemResponse(
-                                id=uuid.uuid4(),
-                                name=meal_data["name"],
-                                quantity=100.0,
-                                unit="g",
-                                nutrition=nutrition
-                            )
-                        ],
-                        nutrition=nutrition
-                    )
-                    recommendations.append(meal)
+                # Check if calories are within tolerance (and the meal suits the user)
+                if abs(meal_calories - target_calories) <= calorie_tolerance and not matcher.excludes(meal_data["name"]):
+                    recommendations.append(self._dataset_meal(meal_data, meal_type, target_calories))
         
         # If no dataset matches or need more recommendations, use fallback database
         if len(recommendations) < 3:
-            available_foods = self._filter_foods_by_preferences(
-                self.FOOD_DATABASE.get(meal_type, []),
-                user
-            )
-            
-            if not available_foods:
-                available_foods = self.FOOD_DATABASE.get(meal_type, [])
+            available_foods = self._available_foods(meal_type, user)
             
             calorie_tolerance = target_calories * 0.2  # 20% tolerance
             
             for food in available_foods:
                 if abs(food["calories"] - target_calories) <= calorie_tolerance:
-                    meal = MealResponse(
-                        id=uuid.uuid4(),
-                        name=food["name"],
-                        description=f"Recommended {meal_type} based on your profile",
-                        meal_type=meal_type,
-                        date=datetime.now(),
-                        foods=[
-                            FoodItemResponse(
-                                id=uuid.uuid4(),
-                                name=food["name"],
-                                quantity=100.0,
-                                unit="g",
-                                nutrition=NutritionInfoSchema(
-                                    calories=food["calories"],
-                                    protein=food["protein"],
-                                    carbohydrates=food["carbs"],
-                                    fat=food["fat"],
-                                    fiber=5.0,
-                                )
-                            )
-                        ],
-                        nutrition=NutritionInfoSchema(
-                            calories=food["calories"],
-                            protein=food["protein"],
-                            carbohydrates=food["carbs"],
-                            fat=food["fat"],
-                            fiber=5.0,
-                        )
-                    )
-                    recommendations.append(meal)
+                    recommendations.append(self._catalog_meal(food, meal_type))
             
             # If still no matches, get closest matches
             if not recommendations:
@@ -150,39 +135,95 @@ class RecommendationEngine:
                 top_foods = available_foods[:3]
                 
                 for food in top_foods:
-                    meal = MealResponse(
-                        id=uuid.uuid4(),
-                        name=food["name"],
-                        description=f"Recommended {meal_type} based on your profile",
-                        meal_type=meal_type,
-                        date=datetime.now(),
-                        foods=[
-                            FoodItemResponse(
-                                id=uuid.uuid4(),
-                                name=food["name"],
-                                quantity=100.0,
-                                unit="g",
-                                nutrition=NutritionInfoSchema(
-                                    calories=food["calories"],
-                                    protein=food["protein"],
-                                    carbohydrates=food["carbs"],
-                                    fat=food["fat"],
-                                    fiber=5.0,
-                                )
-                            )
-                        ],
-                        nutrition=NutritionInfoSchema(
-                            calories=food["calories"],
-                            protein=food["protein"],
-                            carbohydrates=food["carbs"],
-                            fat=food["fat"],
-                            fiber=5.0,
-                        )
-                    )
-                    recommendations.append(meal)
+                    recommendations.append(self._catalog_meal(food, meal_type))
         
         return recommendations[:5]  # Return top 5 recommendations
     
+    def candidate_meals(
+        self,
+        user: User,
+        meal_type: str,
+        target_calories: float,
+        limit: int = 12
+    ) -> List[MealResponse]:
+        """
+        Wider pool of distinct meals for one slot, used by the meal planner.
+        Includes dataset matches within 50% of the target and every catalog
+        food that suits the user's preferences, so the planner can trade
+        calories and macros between slots and vary meals across days.
+        """
+        start = time.perf_counter()
+        candidates = []
+        names = set()
+        
+        matcher = PreferenceMatcher.for_user(user)
+        for meal_data in self.dataset_loader.find_matching_meals(user, meal_type):
+            meal_calories = meal_data.get("calories", target_calories)
+            if meal_data["name"] in names or matcher.excludes(meal_data["name"]):
+                continue
+            if abs(meal_calories - target_calories) <= target_calories * 0.5:
+                names.add(meal_data["name"])
+                candidates.append(self._dataset_meal(meal_data, meal_type, target_calories))
+        
+        for food in self._available_foods(meal_type, user):
+            if food["name"] not in names:
+                names.add(food["name"])
+                candidates.append(self._catalog_meal(food, meal_type))
+        
+        metrics.RECOMMENDATION_SCORING_DURATION.observe(time.perf_counter() - start, meal_type=meal_type)
+        return candidates[:limit]
+    
+    def _available_foods(self, meal_type: str, user: User) -> List[Dict]:
+        """Catalog foods for a meal type that suit the user (none if every food is excluded)."""
+        return self._filter_foods_by_preferences(self.FOOD_DATABASE.get(meal_type, []), user)
+    
+    def _dataset_meal(self, meal_data: Dict, meal_type: str, target_calories: float) -> MealResponse:
+        """Build a recommendation from a dataset match."""
+        meal_calories = meal_data.get("calories", target_calories)
+        macro_ratios = meal_data.get("macro_ratios")
+        if macro_ratios is None:
+            # Estimate nutrition values based on calories, tags, and diet recommendation
+            macro_ratios = estimate_macro_ratios(meal_data.get("diet_recommendation"), meal_data.get("tags", []))
+        
+        return self._stamp_meal(
+            meal_data["name"],
+            f"Personalized {meal_type} based on your age, BMI, goal, and activity level",
+            meal_type,
+            self._nutrition_from_ratios(meal_calories, macro_ratios),
+        )
+    
+    def _catalog_meal(self, food: Dict, meal_type: str) -> MealResponse:
+        """Build a recommendation from a FOOD_DATABASE entry."""
+        return self._stamp_meal(
+            food["name"],
+            f"Recommended {meal_type} based on your profile",
+            meal_type,
+            self.CATALOG_NUTRITION[(meal_type, food["name"])],
+        )
+    
+    def _stamp_meal(self, name: str, description: str, meal_type: str, nutrition: NutritionInfoSchema) -> MealResponse:
+        """
+        Single-food meal response with fresh ids. Every field is built here, so
+        validation is skipped; `nutrition` may be shared and must not be modified.
+        """
+        return MealResponse.model_construct(
+            id=uuid.uuid4(),
+            name=name,
+            description=description,
+            meal_type=meal_type,
+            date=datetime.now(),
+            foods=[
+                FoodItemResponse.model_construct(
+                    id=uuid.uuid4(),
+                    name=name,
+                    quantity=100.0,
+                    unit="g",
+                    nutrition=nutrition
+                )
+            ],
+            nutrition=nutrition
+        )
+    
     def _estimate_nutrition_from_meal(
         self,
         meal_name: str,
@@ -194,85 +235,23 @@ class RecommendationEngine:
         Estimate nutrition values from meal name, calories, and tags.
         Uses heuristics based on tags, diet recommendation, and meal type.
         """
-        # Default ratios
-        protein_ratio = 0.25
-        carb_ratio = 0.45
-        fat_ratio = 0.30
-        
-        # Adjust based on diet recommendation first
-        if diet_recommendation:
-            if diet_recommendation == "Low_Carb":
-                protein_ratio = 0.40
-                carb_ratio = 0.20
-                fat_ratio = 0.40
-            elif diet_recommendation == "Low_Sodium":
-                protein_ratio = 0.30
-                carb_ratio = 0.45
-                fat_ratio = 0.25
-            elif diet_recommendation == "Balanced":
-                protein_ratio = 0.25
-                carb_ratio = 0.45
-                fat_ratio = 0.30
-        
-        # Adjust based on tags
-        tags_lower = [tag.lower() for tag in tags]
-        
-        if "high-protein" in tags_lower or "protein" in tags_lower:
-            protein_ratio = 0.35
-            carb_ratio = 0.35
-            fat_ratio = 0.30
-        elif "low-carb" in tags_lower or "low_carb" in tags_lower:
-            protein_ratio = 0.40
-            carb_ratio = 0.20
-            fat_ratio = 0.40
-        elif "low-fat" in tags_lower:
-            protein_ratio = 0.30
-            carb_ratio = 0.55
-            fat_ratio = 0.15
-        elif "high-calorie" in tags_lower:
-            protein_ratio = 0.25
-            carb_ratio = 0.50
-            fat_ratio = 0.25
-        
+        return self._nutrition_from_ratios(calories, estimate_macro_ratios(diet_recommendation, tags))
+
+    def _nutrition_from_ratios(self, calories: float, macro_ratios) -> NutritionInfoSchema:
+        """Nutrition for a meal from its calories and precomputed macro ratios."""
+        protein_ratio, carb_ratio, fat_ratio, fiber = macro_ratios
         # Calculate macros (4 cal/g for protein and carbs, 9 cal/g for fat)
-        protein = (calories * protein_ratio) / 4
-        carbs = (calories * carb_ratio) / 4
-        fat = (calories * fat_ratio) / 9
-        
-        # Estimate fiber (typically 5-15g per meal)
-        fiber = 8.0 if "fiber-rich" in tags_lower or "fiber" in tags_lower else 5.0
-        
-        return NutritionInfoSchema(
-            calories=calories,
-            protein=round(protein, 1),
-            carbohydrates=round(carbs, 1),
-            fat=round(fat, 1),
+        return NutritionInfoSchema.model_construct(
+            calories=float(calories),
+            protein=round((calories * protein_ratio) / 4, 1),
+            carbohydrates=round((calories * carb_ratio) / 4, 1),
+            fat=round((calories * fat_ratio) / 9, 1),
             fiber=fiber
         )
 
     def _filter_foods_by_preferences(self, foods: List[Dict], user: User) -> List[Dict]:
         """Filter foods based on user preferences, allergies, and dietary restrictions"""
-        filtered = []
-        
-        for food in foods:
-            # Check allergies (simplified - in production, check ingredient lists)
-            if user.allergies:
-                food_lower = food["name"].lower()
-                for allergy in user.allergies:
-                    if allergy.lower() in food_lower:
-                        continue  # Skip this food
-            
-            # Check food preferences
-            if user.food_preferences:
-                food_lower = food["name"].lower()
-                if "vegetarian" in user.food_preferences:
-                    if any(meat in food_lower for meat in ["chicken", "beef", "turkey", "salmon", "meat"]):
-                        continue
-                if "vegan" in user.food_preferences:
-                    if any(item in food_lower for item in ["egg", "yogurt", "milk", "cheese", "butter"]):
-                        continue
-            
-            filtered.append(food)
-        
-        return filtered
-
+        matcher = PreferenceMatcher.for_user(user)
+        if not matcher.allergies and not matcher.excluded_tags:
+            return list(foods)
+        return [food for food in foods if not matcher.excludes(food["name"])]
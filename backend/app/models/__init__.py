@@ -1,6 +1,9 @@
 from .user import User
 from .meal import Meal, FoodItem, NutritionInfo
 from .meal_plan import MealPlan
+from .daily_nutrition import DailyNutrition
+from .user_recommendation import UserRecommendation
+from .background_job import BackgroundJob
 
-__all__ = ["User", "Meal", "FoodItem", "NutritionInfo", "MealPlan"]
+__all__ = ["User", "Meal", "FoodItem", "NutritionInfo", "MealPlan", "DailyNutrition", "UserRecommendation", "BackgroundJob"]
 
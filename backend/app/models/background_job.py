@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, JSON
+from app.database import Base
+
+class BackgroundJob(Base):
+    """
+    State of a background job when JOB_STORE is "database" (see job_queue), so
+    any worker process can answer status polls for jobs another one runs.
+    """
+    __tablename__ = "background_jobs"
+
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    owner = Column(String, index=True)
+    dedupe_key = Column(String, index=True)
+    status = Column(String, nullable=False)
+    result = Column(JSON)
+    error = Column(String)
+    created_at = Column(DateTime, nullable=False)  # UTC, like Job
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
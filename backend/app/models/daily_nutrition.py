@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+from app.config import settings
+
+# Use String for SQLite, UUID for PostgreSQL
+USE_SQLITE = settings.use_sqlite
+
+class DailyNutrition(Base):
+    """Per-user, per-day nutrition totals, maintained incrementally as meals are logged."""
+    __tablename__ = "daily_nutrition"
+
+    if USE_SQLITE:
+        user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    else:
+        user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    calories = Column(Float, nullable=False, default=0.0)
+    protein = Column(Float, nullable=False, default=0.0)
+    carbohydrates = Column(Float, nullable=False, default=0.0)
+    fat = Column(Float, nullable=False, default=0.0)
+    fiber = Column(Float, nullable=False, default=0.0)
+    sugar = Column(Float, nullable=False, default=0.0)
+    sodium = Column(Float, nullable=False, default=0.0)
+    meal_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
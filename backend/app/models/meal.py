@@ -1,16 +1,17 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
-import os
 from app.database import Base
+from app.config import settings
 
 # Use String for SQLite, UUID for PostgreSQL
-USE_SQLITE = os.getenv("DATABASE_URL", "").startswith("sqlite")
+USE_SQLITE = settings.use_sqlite
 
 class Meal(Base):
     __tablename__ = "meals"
+    __table_args__ = (UniqueConstraint("user_id", "client_id", name="uq_meals_user_client_id"),)
 
     if USE_SQLITE:
         id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -23,7 +24,10 @@ class Meal(Base):
     meal_type = Column(String, nullable=False)  # breakfast, lunch, dinner, snack
     date = Column(DateTime(timezone=True), nullable=False)
     nutrition_info = Column(JSON)  # Store nutrition data as JSON
+    client_id = Column(String)  # Set by offline clients (bulk sync) so replays are idempotent
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set on insert and on every change (the meal-plans ETag depends on it)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
     user = relationship("User", backref="meals")
     food_items = relationship("FoodItem", back_populates="meal", cascade="all, delete-orphan")
@@ -3,11 +3,11 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
-import os
 from app.database import Base
+from app.config import settings
 
 # Use String for SQLite, UUID for PostgreSQL
-USE_SQLITE = os.getenv("DATABASE_URL", "").startswith("sqlite")
+USE_SQLITE = settings.use_sqlite
 
 class MealPlan(Base):
     __tablename__ = "meal_plans"
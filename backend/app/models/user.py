@@ -2,11 +2,11 @@ from sqlalchemy import Column, String, Integer, Float, DateTime, ARRAY, Boolean,
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
-import os
 from app.database import Base
+from app.config import settings
 
 # Use String for SQLite, UUID for PostgreSQL
-USE_SQLITE = os.getenv("DATABASE_URL", "").startswith("sqlite")
+USE_SQLITE = settings.use_sqlite
 
 class User(Base):
     __tablename__ = "users"
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+from app.config import settings
+
+# Use String for SQLite, UUID for PostgreSQL
+USE_SQLITE = settings.use_sqlite
+
+class UserRecommendation(Base):
+    """
+    Precomputed recommendations per user, meal type and dataset (see
+    dataset_registry). A row is current while its dataset_version and
+    profile_hash match the dataset file and the user.
+    """
+    __tablename__ = "user_recommendations"
+
+    if USE_SQLITE:
+        user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    else:
+        user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    meal_type = Column(String, primary_key=True)
+    dataset = Column(String, primary_key=True, default="default", server_default="default")
+    dataset_version = Column(String, nullable=False)
+    profile_hash = Column(String, nullable=False)
+    recommendations = Column(JSON, nullable=False)  # Serialized List[MealResponse]
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,103 @@
+"""
+On-demand request profiling.
+
+A request carrying `X-Profile-Token: <PROFILING_TOKEN>` runs under cProfile
+with SQL capture enabled; the report (top functions, call tree and statements)
+is stored in memory under the request id returned in `X-Profile-Id` and can be
+fetched from /api/v1/debug/profiles/{profile_id}. Nothing is installed unless
+PROFILING_TOKEN is set.
+"""
+import cProfile
+import hmac
+import pstats
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.cache import TTLCache
+
+TOKEN_HEADER = "x-profile-token"
+REPORT_PATH_PREFIX = "/api/v1/debug/"  # Fetching a report is never itself profiled
+TOP_FUNCTIONS = 30
+TREE_MAX_DEPTH = 12
+TREE_MIN_FRACTION = 0.01  # Call tree branches below 1% of the total are pruned
+
+profile_store = TTLCache(max_size=settings.profile_max_reports, ttl_seconds=settings.profile_report_ttl_seconds)
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    return bool(settings.profiling_token) and token is not None and hmac.compare_digest(
+        token.encode(), settings.profiling_token.encode()
+    )
+
+
+def _label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # Built-in
+    return f"{name} ({filename}:{line})"
+
+
+def _top_functions(stats: Dict) -> List[Dict]:
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+    return [
+        {
+            "function": _label(func),
+            "calls": nc,
+            "primitive_calls": cc,
+            "own_seconds": round(tt, 6),
+            "cumulative_seconds": round(ct, 6),
+        }
+        for func, (cc, nc, tt, ct, _) in rows
+    ]
+
+
+def _call_tree(stats: Dict, total: float) -> List[Dict]:
+    # pstats records callers per function; invert it to walk callees
+    callees: Dict[Tuple, List[Tuple[Tuple, float, int]]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3], edge[1]))
+    threshold = total * TREE_MIN_FRACTION
+
+    def build(func, cumulative, calls, depth, path):
+        node = {"function": _label(func), "calls": calls, "cumulative_seconds": round(cumulative, 6)}
+        if depth < TREE_MAX_DEPTH:
+            children = sorted(callees.get(func, ()), key=lambda child: child[1], reverse=True)
+            node["children"] = [
+                build(child, child_cumulative, child_calls, depth + 1, path | {child})
+                for child, child_cumulative, child_calls in children
+                if child_cumulative >= threshold and child not in path
+            ]
+        return node
+
+    roots = [func for func, entry in stats.items() if not entry[4]]
+    roots.sort(key=lambda func: stats[func][3], reverse=True)
+    return [build(func, stats[func][3], stats[func][1], 0, {func}) for func in roots if stats[func][3] >= threshold]
+
+
+def build_report(
+    profile_id: str,
+    profiler: cProfile.Profile,
+    statements: List[Tuple[str, float]],
+    method: str,
+    path: str,
+    status_code: int,
+    elapsed: float,
+) -> Dict:
+    stats = pstats.Stats(profiler).stats
+    total = max((entry[3] for entry in stats.values()), default=0.0)
+    return {
+        "profile_id": profile_id,
+        "method": method,
+        "path": path,
+        "status": status_code,
+        "created_at": datetime.utcnow().isoformat(),
+        "elapsed_seconds": round(elapsed, 6),
+        "sql": {
+            "count": len(statements),
+            "total_seconds": round(sum(seconds for _, seconds in statements), 6),
+            "statements": [{"statement": statement, "seconds": round(seconds, 6)} for statement, seconds in statements],
+        },
+        "top_functions": _top_functions(stats),
+        "call_tree": _call_tree(stats, total),
+    }
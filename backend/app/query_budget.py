@@ -0,0 +1,94 @@
+"""
+SQL statement budgets per endpoint, to catch N+1 regressions.
+
+`QUERY_BUDGETS` declares the most statements each route may issue with cold
+auth caches, independent of how much data the user has. `count_queries()`
+and `assert_max_queries()` are test helpers built on SQLAlchemy engine
+events, and QueryBudgetMiddleware logs requests that go over budget when
+QUERY_BUDGET_WARNINGS is enabled (development only).
+
+Example:
+    with assert_max_queries(budget_for("GET", "/api/v1/meal-plans")):
+        client.get("/api/v1/meal-plans", headers=auth_headers)
+"""
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# (method, route template) -> maximum SQL statements per request.
+# Meal-plan generation is deliberately absent: it commits once per generated
+# day so that days can be streamed, which makes its count scale with length.
+QUERY_BUDGETS = {
+    ("POST", "/api/v1/auth/register"): 3,
+    ("POST", "/api/v1/auth/login"): 3,  # includes upgrading a stale password hash
+    ("GET", "/api/v1/auth/me"): 1,
+    ("GET", "/api/v1/users/profile"): 1,
+    ("PUT", "/api/v1/users/profile"): 4,
+    ("GET", "/api/v1/recommendations"): 3,  # user, stored row, upsert on a miss
+    ("GET", "/api/v1/meal-plans"): 6,
+    ("POST", "/api/v1/meal-plans"): 3,
+    ("POST", "/api/v1/meal-plans/meals"): 8,
+    ("POST", "/api/v1/meal-plans/meals/batch"): 9,  # independent of the number of meals
+    ("GET", "/api/v1/meal-plans/jobs/{job_id}"): 2,  # user, job row with JOB_STORE=database
+    ("POST", "/api/v1/nutrition/analyze"): 1,
+    ("GET", "/api/v1/nutrition/daily"): 3,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by assert_max_queries when a block issues too many statements."""
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.statements: List[Tuple[str, float]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def format(self) -> str:
+        return "\n".join(
+            f"  {index}. ({seconds * 1000:.2f} ms) {statement}"
+            for index, (statement, seconds) in enumerate(self.statements, 1)
+        )
+
+
+def budget_for(method: str, route: str) -> Optional[int]:
+    return QUERY_BUDGETS.get((method.upper(), route))
+
+
+@contextmanager
+def count_queries(engine: Optional[Engine] = None):
+    """Record every statement executed on `engine` (default: the app engine) inside the block."""
+    if engine is None:
+        from app.database import engine
+    recorder = QueryRecorder()
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("budget_start", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        recorder.statements.append((statement, time.perf_counter() - conn.info["budget_start"].pop()))
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    try:
+        yield recorder
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+        event.remove(engine, "after_cursor_execute", after)
+
+
+@contextmanager
+def assert_max_queries(budget: int, engine: Optional[Engine] = None):
+    """Fail with the offending statements if the block issues more than `budget` statements."""
+    with count_queries(engine) as recorder:
+        yield recorder
+    if recorder.count > budget:
+        raise QueryBudgetExceeded(
+            f"{recorder.count} SQL statements executed, budget is {budget}:\n{recorder.format()}"
+        )
+
@@ -1,6 +1,6 @@
 from .user import UserCreate, UserUpdate, UserResponse, Token
-from .meal import MealCreate, MealResponse, FoodItemCreate, FoodItemResponse, NutritionInfoSchema
-from .meal_plan import MealPlanCreate, MealPlanResponse
+from .meal import MealCreate, MealResponse, FoodItemCreate, FoodItemResponse, NutritionInfoSchema, DailyNutritionResponse
+from .meal_plan import MealPlanCreate, MealPlanResponse, MealPlanJobResponse
 
 __all__ = [
     "UserCreate",
@@ -12,7 +12,9 @@ __all__ = [
     "FoodItemCreate",
     "FoodItemResponse",
     "NutritionInfoSchema",
+    "DailyNutritionResponse",
     "MealPlanCreate",
     "MealPlanResponse",
+    "MealPlanJobResponse",
 ]
 
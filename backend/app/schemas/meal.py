@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
 import uuid
 
 class NutritionInfoSchema(BaseModel):
@@ -12,6 +12,20 @@ class NutritionInfoSchema(BaseModel):
     sugar: Optional[float] = None
     sodium: Optional[float] = None
 
+    @classmethod
+    def from_db(cls, data: Optional[dict]) -> Optional["NutritionInfoSchema"]:
+        """
+        Build from a nutrition JSON blob we stored ourselves, skipping validation.
+        Required values missing from legacy rows (or stored as null) are 0.0.
+        """
+        if not data:
+            return None
+        values = {key: data[key] for key in cls.model_fields if key in data}
+        for key, field in cls.model_fields.items():
+            if field.is_required() and values.get(key) is None:
+                values[key] = 0.0
+        return cls.model_construct(**values)
+
 class FoodItemCreate(BaseModel):
     name: str
     quantity: float
@@ -36,6 +50,12 @@ class MealCreate(BaseModel):
     foods: List[FoodItemCreate]
     nutrition: Optional[NutritionInfoSchema] = None
 
+class MealBatchItem(MealCreate):
+    client_id: str = Field(..., min_length=1, max_length=64)  # Client-generated, unique per user
+
+class MealBatchCreate(BaseModel):
+    meals: List[MealBatchItem] = Field(..., max_length=500)
+
 class MealResponse(BaseModel):
     id: uuid.UUID
     name: str
@@ -48,3 +68,19 @@ class MealResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class MealBatchResult(BaseModel):
+    client_id: str
+    status: str  # "created", or "existing" when the client_id was already logged
+    meal: MealResponse
+
+
+class MealBatchResponse(BaseModel):
+    results: List[MealBatchResult]
+
+
+class DailyNutritionResponse(BaseModel):
+    day: date
+    totals: NutritionInfoSchema
+    target: Optional[NutritionInfoSchema] = None  # daily_nutrition_target of the covering meal plan
+    meal_count: int
@@ -2,8 +2,8 @@ from pydantic import BaseModel
 from typing import Optional, Union
 from datetime import datetime
 import uuid
-import os
 from .meal import MealResponse, NutritionInfoSchema
+from app.config import settings
 
 class MealPlanCreate(BaseModel):
     start_date: datetime
@@ -11,7 +11,7 @@ class MealPlanCreate(BaseModel):
     goal: Optional[str] = None
 
 # Support both UUID (PostgreSQL) and String (SQLite) for id
-USE_SQLITE = os.getenv("DATABASE_URL", "").startswith("sqlite")
+USE_SQLITE = settings.use_sqlite
 
 if USE_SQLITE:
     class MealPlanResponse(BaseModel):
@@ -40,3 +40,12 @@ else:
         class Config:
             from_attributes = True
 
+
+class MealPlanJobResponse(BaseModel):
+    job_id: str
+    status: str  # queued, running, succeeded, failed
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[MealPlanResponse] = None
+    error: Optional[str] = None
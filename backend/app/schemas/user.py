@@ -2,7 +2,7 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional, List, Union
 from datetime import datetime
 import uuid
-import os
+from app.config import settings
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -37,7 +37,7 @@ class UserUpdate(BaseModel):
     target_weight: Optional[float] = None
 
 # Support both UUID (PostgreSQL) and String (SQLite) for id
-USE_SQLITE = os.getenv("DATABASE_URL", "").startswith("sqlite")
+USE_SQLITE = settings.use_sqlite
 
 if USE_SQLITE:
     class UserResponse(UserBase):
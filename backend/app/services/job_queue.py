@@ -0,0 +1,283 @@
+"""
+Bounded in-process background job runner.
+Jobs are dispatched by name to registered handlers so that the queue only
+carries plain data; any object with `put_nowait(job)` / `get()` (raising
+`queue.Full` when saturated) can be plugged in instead of the default queue.
+
+Jobs run in the process that accepted them. Their state (status, result) is
+kept in a job store: in memory by default, or in the `background_jobs` table
+with JOB_STORE=database, so that with several worker processes a status poll
+can be answered by any of them. Jobs still queued or running when their
+process exits are lost either way.
+"""
+import json
+import queue
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from app.config import settings
+from app.services.cache import TTLCache
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when no more jobs can be accepted."""
+
+
+class Job:
+    def __init__(self, kind: str, payload: Dict[str, Any], owner: Optional[str] = None, dedupe_key: Optional[str] = None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.payload = payload
+        self.owner = owner
+        self.dedupe_key = dedupe_key
+        self.status = JOB_QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class MemoryJobStore:
+    """Job state of this process only; finished jobs expire after the result TTL."""
+
+    def __init__(self, result_ttl_seconds: float):
+        self._jobs = TTLCache(max_size=max(1000, settings.job_queue_size * 10), ttl_seconds=result_ttl_seconds)
+        self._active: Dict[str, Job] = {}  # dedupe_key -> queued/running job
+
+    def add(self, job: Job):
+        self._jobs.set(job.id, job)
+        if job.dedupe_key:
+            self._active[job.dedupe_key] = job
+
+    def update(self, job: Job):
+        # Refresh the retention window from the latest change (completion)
+        self._jobs.set(job.id, job)
+        if job.done and job.dedupe_key and self._active.get(job.dedupe_key) is job:
+            del self._active[job.dedupe_key]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def active(self, dedupe_key: str) -> Optional[Job]:
+        job = self._active.get(dedupe_key)
+        return job if job is not None and not job.done else None
+
+
+class DatabaseJobStore:
+    """
+    Job state in the `background_jobs` table, shared by every worker process.
+    Results are stored as JSON; finished jobs are deleted after the result TTL.
+    """
+
+    def __init__(self, result_ttl_seconds: float):
+        self.result_ttl = timedelta(seconds=result_ttl_seconds)
+
+    @staticmethod
+    def _session():
+        from app.database import SessionLocal
+        return SessionLocal()
+
+    def add(self, job: Job):
+        from app.models.background_job import BackgroundJob
+
+        db = self._session()
+        try:
+            db.add(BackgroundJob(
+                id=job.id, kind=job.kind, owner=job.owner, dedupe_key=job.dedupe_key,
+                status=job.status, created_at=job.created_at,
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _encode(result: Any) -> Any:
+        # As the jobs endpoint would render it (results are often built with model_construct)
+        from app.api.responses import json_dumps
+        return json.loads(json_dumps(result))
+
+    def update(self, job: Job):
+        from app.models.background_job import BackgroundJob
+
+        db = self._session()
+        try:
+            db.query(BackgroundJob).filter(BackgroundJob.id == job.id).update({
+                "status": job.status,
+                "result": self._encode(job.result),
+                "error": job.error,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+            }, synchronize_session=False)
+            if job.done:
+                db.query(BackgroundJob).filter(
+                    BackgroundJob.finished_at < datetime.utcnow() - self.result_ttl
+                ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        from app.models.background_job import BackgroundJob
+
+        db = self._session()
+        try:
+            row = db.get(BackgroundJob, job_id)
+        finally:
+            db.close()
+        if row is None or (row.finished_at is not None and row.finished_at < datetime.utcnow() - self.result_ttl):
+            return None
+        return self._job(row)
+
+    def active(self, dedupe_key: str) -> Optional[Job]:
+        from app.models.background_job import BackgroundJob
+
+        db = self._session()
+        try:
+            # Jobs lost with their process stay unfinished; only recent ones are reused
+            row = db.query(BackgroundJob).filter(
+                BackgroundJob.dedupe_key == dedupe_key,
+                BackgroundJob.finished_at.is_(None),
+                BackgroundJob.created_at >= datetime.utcnow() - self.result_ttl,
+            ).order_by(BackgroundJob.created_at.desc()).first()
+        finally:
+            db.close()
+        return None if row is None else self._job(row)
+
+    @staticmethod
+    def _job(row) -> Job:
+        job = Job(row.kind, {}, owner=row.owner, dedupe_key=row.dedupe_key)
+        job.id, job.status, job.result, job.error = row.id, row.status, row.result, row.error
+        job.created_at, job.started_at, job.finished_at = row.created_at, row.started_at, row.finished_at
+        return job
+
+
+JOB_STORES = {"memory": MemoryJobStore, "database": DatabaseJobStore}
+
+
+class JobRunner:
+    """Runs registered job handlers on a fixed number of worker threads."""
+
+    def __init__(
+        self,
+        workers: int = settings.job_workers,
+        job_queue=None,
+        result_ttl_seconds: float = settings.job_result_ttl_seconds,
+        store=None,
+    ):
+        self.workers = max(1, workers)
+        self.queue = job_queue if job_queue is not None else queue.Queue(maxsize=settings.job_queue_size)
+        self.result_ttl_seconds = result_ttl_seconds
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._store = store
+        self._threads = []
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        """The job store, chosen from JOB_STORE on first use (gunicorn.conf.py may set it after import)."""
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = JOB_STORES[settings.job_store or "memory"](self.result_ttl_seconds)
+        return self._store
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any]):
+        """Register the handler for a job kind. It runs on a worker thread."""
+        self._handlers[kind] = handler
+
+    def _ensure_workers(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind: str, payload: Dict[str, Any], owner: Optional[str] = None, dedupe_key: Optional[str] = None) -> Job:
+        """
+        Enqueue a job and return it immediately.
+        A job with the same dedupe_key that has not finished yet is returned
+        instead of enqueueing a duplicate (e.g. for client retries).
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+
+        store = self.store
+        with self._lock:
+            if dedupe_key:
+                existing = store.active(dedupe_key)
+                if existing is not None:
+                    return existing
+
+            job = Job(kind, payload, owner=owner, dedupe_key=dedupe_key)
+            # Stored before it is queued, so a worker thread's updates always find it
+            store.add(job)
+            try:
+                self.queue.put_nowait(job)
+            except queue.Full:
+                job.status, job.error, job.finished_at = JOB_FAILED, "Job queue is full", datetime.utcnow()
+                store.update(job)
+                raise JobQueueFull("Job queue is full")
+
+        self._ensure_workers()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def _save(self, job: Job):
+        try:
+            self.store.update(job)
+        except Exception as e:
+            # A store outage must not kill the worker thread
+            print(f"Job {job.id} ({job.kind}): could not store state: {e}")
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            job.status = JOB_RUNNING
+            job.started_at = datetime.utcnow()
+            self._save(job)
+            try:
+                job.result = self._handlers[job.kind](job.payload)
+                job.status = JOB_SUCCEEDED
+            except Exception as e:
+                print(f"Job {job.id} ({job.kind}) failed: {e}")
+                traceback.print_exc()
+                job.error = str(e)
+                job.status = JOB_FAILED
+            finally:
+                job.finished_at = datetime.utcnow()
+                with self._lock:
+                    self._save(job)
+                if hasattr(self.queue, "task_done"):
+                    self.queue.task_done()
+
+
+job_runner = JobRunner()
@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.data.dataset_loader import MealPlanDatasetLoader
+from app.models.user import User
+from app.models.meal_plan import MealPlan
+from app.models.meal import Meal, FoodItem
+from app.ml.meal_planner import MealPlanner
+from app.schemas.meal import MealResponse
+from app.services.recommendation_service import RecommendationService
+from app.services import nutrition_rollup
+
+# Adjust calories based on goal
+CALORIE_ADJUSTMENTS = {
+    "weight_loss": 0.85,  # 15% deficit
+    "muscle_gain": 1.15,  # 15% surplus
+    "maintenance": 1.0,
+    "diabetes_management": 0.95,  # Slight deficit
+}
+
+# Meal calorie distribution
+MEAL_CALORIE_DISTRIBUTION = {
+    "breakfast": 0.25,
+    "lunch": 0.35,
+    "dinner": 0.30,
+    "snack": 0.10,
+}
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+
+
+class MealPlanService:
+    """Generates complete meal plans; shared by the inline and background job endpoints."""
+
+    def __init__(self, dataset_loader: Optional[MealPlanDatasetLoader] = None):
+        self.recommendation_service = RecommendationService(dataset_loader)
+        self.planner = MealPlanner()
+
+    def calculate_daily_targets(self, user: User, goal: str) -> dict:
+        """Calculate the user's daily calorie and macronutrient targets for a goal."""
+        tdee = user.calculate_tdee() or 2000  # Default to 2000 if not calculated
+        daily_calories = tdee * CALORIE_ADJUSTMENTS.get(goal, 1.0)
+
+        # Calculate macronutrient targets (based on goal)
+        if goal == "muscle_gain":
+            protein_ratio = 0.30  # 30% protein
+            carb_ratio = 0.40     # 40% carbs
+            fat_ratio = 0.30      # 30% fat
+        elif goal == "weight_loss":
+            protein_ratio = 0.35  # Higher protein for satiety
+            carb_ratio = 0.35
+            fat_ratio = 0.30
+        else:  # maintenance or diabetes_management
+            protein_ratio = 0.25
+            carb_ratio = 0.45
+            fat_ratio = 0.30
+
+        return {
+            "calories": daily_calories,
+            "protein": (daily_calories * protein_ratio) / 4,  # 4 cal per gram
+            "carbohydrates": (daily_calories * carb_ratio) / 4,
+            "fat": (daily_calories * fat_ratio) / 9,  # 9 cal per gram
+            "fiber": 25.0,  # Recommended daily fiber
+        }
+
+    def create_plan(
+        self,
+        db: Session,
+        user: User,
+        start_date: datetime,
+        end_date: datetime,
+        goal: Optional[str] = None,
+    ) -> MealPlan:
+        """Create and commit an empty meal plan with the user's daily targets."""
+        goal = goal or user.health_goal or "maintenance"
+
+        db_meal_plan = MealPlan(
+            user_id=user.id,
+            start_date=start_date,
+            end_date=end_date,
+            goal=goal,
+            daily_nutrition_target=self.calculate_daily_targets(user, goal),
+        )
+
+        db.add(db_meal_plan)
+        db.commit()
+        db.refresh(db_meal_plan)
+        return db_meal_plan
+
+    def plan_meals(self, user: User, plan: MealPlan) -> List[Dict[str, MealResponse]]:
+        """
+        Choose the meals for every day of a plan in one optimization pass.
+        Returns one {meal_type: meal} mapping per day.
+        """
+        targets = plan.daily_nutrition_target or self.calculate_daily_targets(user, plan.goal)
+        engine = self.recommendation_service.ml_engine
+        candidates = {
+            meal_type: engine.candidate_meals(
+                user=user,
+                meal_type=meal_type,
+                target_calories=targets["calories"] * MEAL_CALORIE_DISTRIBUTION[meal_type],
+            )
+            for meal_type in MEAL_TYPES
+        }
+        days = (plan.end_date - plan.start_date).days + 1
+        return self.planner.plan(candidates, targets, days, MEAL_CALORIE_DISTRIBUTION)
+
+    async def iter_days(
+        self,
+        db: Session,
+        user: User,
+        plan: MealPlan,
+    ) -> AsyncIterator[Tuple[datetime, List[Meal]]]:
+        """
+        Add the planned meals day by day.
+        Each day's meals are committed as one batch before being yielded.
+        """
+        current_date = plan.start_date
+
+        for day_plan in self.plan_meals(user, plan):
+            day_meals = []
+            day_totals = []
+            for meal_type in MEAL_TYPES:
+                recommended_meal = day_plan.get(meal_type)
+                if recommended_meal:
+                    day_meals.append(self._add_meal(db, user, recommended_meal, meal_type, current_date))
+                    day_totals.append((current_date, nutrition_rollup.meal_totals(
+                        recommended_meal.nutrition.model_dump() if recommended_meal.nutrition else None,
+                        [food.nutrition.model_dump() if food.nutrition else None for food in recommended_meal.foods],
+                    )))
+
+            # Keep the daily rollup in the same transaction as the meals
+            nutrition_rollup.add_meals(db, user.id, day_totals)
+            db.commit()
+
+            # Refresh the day's meals to get server defaults
+            for meal in day_meals:
+                db.refresh(meal)
+
+            yield current_date, day_meals
+
+            # Move to next day
+            current_date += timedelta(days=1)
+
+    def _add_meal(self, db: Session, user: User, recommended_meal, meal_type: str, date: datetime) -> Meal:
+        """Add a recommended meal and its food items to the session."""
+        meal_nutrition = recommended_meal.nutrition
+        db_meal = Meal(
+            user_id=user.id,
+            name=recommended_meal.name,
+            description=recommended_meal.description or f"Generated {meal_type}",
+            meal_type=meal_type,
+            date=date,
+            nutrition_info=meal_nutrition.model_dump() if meal_nutrition else None,
+        )
+
+        db.add(db_meal)
+        db.flush()  # Get meal ID
+
+        # Create food items
+        for food_item in recommended_meal.foods:
+            food_nutrition = food_item.nutrition
+            db_food_item = FoodItem(
+                meal_id=db_meal.id,
+                name=food_item.name,
+                quantity=food_item.quantity,
+                unit=food_item.unit,
+                nutrition_info=food_nutrition.model_dump() if food_nutrition else None,
+            )
+            db.add(db_food_item)
+
+        return db_meal
+
+    async def generate(
+        self,
+        db: Session,
+        user: User,
+        start_date: datetime,
+        end_date: datetime,
+        goal: Optional[str] = None,
+    ) -> Tuple[MealPlan, List[Meal]]:
+        """
+        Create a meal plan with meals for each day and commit it.
+        Returns the plan and the created meals.
+        """
+        plan = self.create_plan(db, user, start_date, end_date, goal)
+
+        created_meals = []
+        async for _, day_meals in self.iter_days(db, user, plan):
+            created_meals.extend(day_meals)
+
+        return plan, created_meals
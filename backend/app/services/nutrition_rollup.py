@@ -0,0 +1,114 @@
+"""
+Incrementally maintained per-day nutrition totals (the `daily_nutrition` table).
+Meal writers call `add_meals` in the same transaction as the meal inserts;
+`rebuild` recomputes the table from meal history for backfills.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session, selectinload
+from app.models.daily_nutrition import DailyNutrition, USE_SQLITE
+from app.models.meal import Meal
+
+if USE_SQLITE:
+    from sqlalchemy.dialects.sqlite import insert
+else:
+    from sqlalchemy.dialects.postgresql import insert
+
+NUTRIENTS = ["calories", "protein", "carbohydrates", "fat", "fiber", "sugar", "sodium"]
+
+
+def meal_totals(meal_nutrition: Optional[Dict], food_nutritions: Iterable[Optional[Dict]] = ()) -> Dict[str, float]:
+    """
+    Nutrition totals for one meal: the meal's own nutrition if present,
+    otherwise the sum of its food items.
+    """
+    sources = [meal_nutrition] if meal_nutrition else [n for n in food_nutritions if n]
+    totals = dict.fromkeys(NUTRIENTS, 0.0)
+    for nutrition in sources:
+        for key in NUTRIENTS:
+            totals[key] += nutrition.get(key) or 0.0
+    return totals
+
+
+def _meal_day(meal_date: datetime) -> date:
+    return meal_date.date() if isinstance(meal_date, datetime) else meal_date
+
+
+def add_meals(db: Session, user_id, meals: Iterable[Tuple[datetime, Dict[str, float]]]):
+    """
+    Add meals, given as (meal date, totals from meal_totals), to the user's daily rollups.
+    Issues one atomic multi-row upsert covering every affected day; the caller commits.
+    """
+    per_day: Dict[date, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(NUTRIENTS + ["meal_count"], 0.0))
+    for meal_date, totals in meals:
+        day_totals = per_day[_meal_day(meal_date)]
+        for key in NUTRIENTS:
+            day_totals[key] += totals.get(key) or 0.0
+        day_totals["meal_count"] += 1
+
+    if not per_day:
+        return
+    rows = []
+    for day, totals in per_day.items():
+        totals["meal_count"] = int(totals["meal_count"])
+        rows.append(dict(user_id=user_id, day=day, **totals))
+    stmt = insert(DailyNutrition).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyNutrition.user_id, DailyNutrition.day],
+        set_={
+            key: getattr(DailyNutrition, key) + getattr(stmt.excluded, key)
+            for key in NUTRIENTS + ["meal_count"]
+        },
+    )
+    db.execute(stmt)
+
+
+def get_range(db: Session, user_id, start: date, end: date) -> List[DailyNutrition]:
+    """Rollup rows for a user between two days (inclusive), ordered by day."""
+    return (
+        db.query(DailyNutrition)
+        .filter(
+            DailyNutrition.user_id == user_id,
+            DailyNutrition.day >= start,
+            DailyNutrition.day <= end,
+        )
+        .order_by(DailyNutrition.day)
+        .all()
+    )
+
+
+def rebuild(db: Session, user_id=None, batch_size: int = 1000) -> int:
+    """
+    Recompute rollups from meal history, for one user or everyone.
+    Returns the number of rollup rows written. Commits.
+    """
+    delete_query = db.query(DailyNutrition)
+    meal_query = db.query(Meal)
+    if user_id is not None:
+        delete_query = delete_query.filter(DailyNutrition.user_id == user_id)
+        meal_query = meal_query.filter(Meal.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+
+    # Meals arrive grouped by user, so each user's rollups are written as soon as
+    # their meals are read and only one user's history is held at a time
+    meal_query = meal_query.options(selectinload(Meal.food_items)).order_by(Meal.user_id)
+    rows = 0
+    current_user_id, meals = None, []
+    for meal in meal_query.yield_per(batch_size):
+        if meal.user_id != current_user_id and meals:
+            add_meals(db, current_user_id, meals)
+            rows += len({_meal_day(meal_date) for meal_date, _ in meals})
+            meals = []
+        current_user_id = meal.user_id
+        totals = meal_totals(
+            meal.nutrition_info,
+            [] if meal.nutrition_info else [f.nutrition_info for f in meal.food_items],
+        )
+        meals.append((meal.date, totals))
+    if meals:
+        add_meals(db, current_user_id, meals)
+        rows += len({_meal_day(meal_date) for meal_date, _ in meals})
+
+    db.commit()
+    return rows
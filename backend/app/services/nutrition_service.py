@@ -1,47 +1,58 @@
-import httpx
-import os
-from dotenv import load_dotenv
+import time
 from typing import Optional, Dict
-
-load_dotenv()
+from app import metrics
+from app.config import settings
 
 class NutritionService:
     def __init__(self):
-        self.nutritionix_app_id = os.getenv("NUTRITIONIX_APP_ID")
-        self.nutritionix_api_key = os.getenv("NUTRITIONIX_API_KEY")
-        self.nutritionix_base_url = os.getenv("NUTRITIONIX_BASE_URL", "https://trackapi.nutritionix.com/v2")
+        self.nutritionix_app_id = settings.nutritionix_app_id
+        self.nutritionix_api_key = settings.nutritionix_api_key
+        self.nutritionix_base_url = settings.nutritionix_base_url
         
-        self.edamam_app_id = os.getenv("EDAMAM_APP_ID")
-        self.edamam_api_key = os.getenv("EDAMAM_API_KEY")
-        self.edamam_base_url = os.getenv("EDAMAM_BASE_URL", "https://api.edamam.com/api")
+        self.edamam_app_id = settings.edamam_app_id
+        self.edamam_api_key = settings.edamam_api_key
+        self.edamam_base_url = settings.edamam_base_url
         
-        self.usda_api_key = os.getenv("USDA_API_KEY")
-        self.usda_base_url = os.getenv("USDA_BASE_URL", "https://api.nal.usda.gov/fdc/v1")
+        self.usda_api_key = settings.usda_api_key
+        self.usda_base_url = settings.usda_base_url
 
     async def get_nutrition_info(self, food_name: str, quantity: float = 100.0) -> Optional[Dict]:
         """
         Get nutrition information for a food item.
         Tries Nutritionix first, then Edamam, then USDA as fallback.
         """
-        # Try Nutritionix first
-        nutrition = await self._get_nutritionix_info(food_name, quantity)
-        if nutrition:
-            return nutrition
-        
-        # Try Edamam
-        nutrition = await self._get_edamam_info(food_name, quantity)
-        if nutrition:
+        providers = (
+            ("nutritionix", self.nutritionix_app_id and self.nutritionix_api_key, self._get_nutritionix_info),
+            ("edamam", self.edamam_app_id and self.edamam_api_key, self._get_edamam_info),
+            ("usda", self.usda_api_key, self._get_usda_info),
+        )
+        for provider, configured, fetch in providers:
+            if not configured:
+                continue
+            nutrition = await self._call_provider(provider, fetch, food_name, quantity)
+            if nutrition:
+                return nutrition
+        return None
+
+    async def _call_provider(self, provider: str, fetch, food_name: str, quantity: float) -> Optional[Dict]:
+        """Call one provider, recording its latency and outcome (success/miss/error)."""
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            nutrition = await fetch(food_name, quantity)
+            outcome = "success" if nutrition else "miss"
             return nutrition
-        
-        # Try USDA as last resort
-        nutrition = await self._get_usda_info(food_name, quantity)
-        return nutrition
+        except Exception:
+            return None
+        finally:
+            metrics.NUTRITION_PROVIDER_DURATION.observe(
+                time.perf_counter() - start, provider=provider, outcome=outcome
+            )
 
     async def _get_nutritionix_info(self, food_name: str, quantity: float) -> Optional[Dict]:
         """Get nutrition info from Nutritionix API"""
-        if not self.nutritionix_app_id or not self.nutritionix_api_key:
-            return None
-        
+        import httpx  # Deferred: only needed once an external API is configured
+
         try:
             async with httpx.AsyncClient() as client:
                 response = await client.post(
@@ -72,14 +83,14 @@ class NutritionService:
                         }
         except Exception as e:
             print(f"Nutritionix API error: {e}")
+            raise
         
         return None
 
     async def _get_edamam_info(self, food_name: str, quantity: float) -> Optional[Dict]:
         """Get nutrition info from Edamam API"""
-        if not self.edamam_app_id or not self.edamam_api_key:
-            return None
-        
+        import httpx
+
         try:
             async with httpx.AsyncClient() as client:
                 response = await client.get(
@@ -108,14 +119,14 @@ class NutritionService:
                         }
         except Exception as e:
             print(f"Edamam API error: {e}")
+            raise
         
         return None
 
     async def _get_usda_info(self, food_name: str, quantity: float) -> Optional[Dict]:
         """Get nutrition info from USDA FoodData Central API"""
-        if not self.usda_api_key:
-            return None
-        
+        import httpx
+
         try:
             async with httpx.AsyncClient() as client:
                 # Search for food
@@ -159,6 +170,7 @@ class NutritionService:
                             }
         except Exception as e:
             print(f"USDA API error: {e}")
+            raise
         
         return None
 
@@ -1,14 +1,15 @@
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 from app.models.user import User
 from app.schemas.meal import MealResponse
 from app.services.nutrition_service import NutritionService
+from app.data.dataset_loader import MealPlanDatasetLoader
 from app.ml.recommendation_engine import RecommendationEngine
 
 class RecommendationService:
-    def __init__(self):
+    def __init__(self, dataset_loader: Optional[MealPlanDatasetLoader] = None):
         self.nutrition_service = NutritionService()
-        self.ml_engine = RecommendationEngine()
+        self.ml_engine = RecommendationEngine(dataset_loader)
 
     async def generate_recommendations(
         self,
@@ -19,28 +20,31 @@ class RecommendationService:
         """
         Generate personalized meal recommendations using ML.
         """
-        # Get user's TDEE and nutrition targets
-        tdee = user.calculate_tdee()
-        if not tdee:
-            # Default values if user profile is incomplete
-            tdee = 2000
-        
-        # Calculate meal-specific calorie targets
-        meal_calorie_targets = {
-            "breakfast": tdee * 0.25,
-            "lunch": tdee * 0.35,
-            "dinner": tdee * 0.30,
-            "snack": tdee * 0.10,
-        }
-        
-        target_calories = meal_calorie_targets.get(meal_type, tdee * 0.25)
-        
         # Use ML engine to generate recommendations
         recommendations = self.ml_engine.recommend_meals(
             user=user,
             meal_type=meal_type,
-            target_calories=target_calories
+            target_calories=meal_target_calories(user, meal_type)
         )
         
         return recommendations
 
+
+def meal_target_calories(user: User, meal_type: str) -> float:
+    """Calorie target for one meal: the meal type's share of the user's TDEE."""
+    # Get user's TDEE and nutrition targets
+    tdee = user.calculate_tdee()
+    if not tdee:
+        # Default values if user profile is incomplete
+        tdee = 2000
+    
+    # Calculate meal-specific calorie targets
+    meal_calorie_targets = {
+        "breakfast": tdee * 0.25,
+        "lunch": tdee * 0.35,
+        "dinner": tdee * 0.30,
+        "snack": tdee * 0.10,
+    }
+    
+    return meal_calorie_targets.get(meal_type, tdee * 0.25)
+
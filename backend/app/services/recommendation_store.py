@@ -0,0 +1,171 @@
+"""
+Materialized recommendations (the `user_recommendations` table).
+`materialize` precomputes every active user's recommendations per meal type
+(run nightly via `python manage.py materialize-recommendations`) from the
+dataset each user is matched to by default (see dataset_registry). Rows are
+kept per dataset, so requests routed elsewhere (by locale or ?dataset=) get
+their own rows. The recommendations endpoint reads them with `get` and
+recomputes inline, then `save`s, only when the stored row is missing or stale.
+A row is stale once the dataset file or any profile field that affects
+recommendations changes.
+"""
+import hashlib
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+from app.data.dataset_loader import MEAL_CALORIE_RATIOS, dataset_version
+from app.data.dataset_registry import DEFAULT_DATASET, dataset_registry
+from app.ml.recommendation_engine import RecommendationEngine
+from app.models.user import User
+from app.models.user_recommendation import UserRecommendation, USE_SQLITE
+from app.schemas.meal import FoodItemResponse, MealResponse
+from app.services.recommendation_service import meal_target_calories
+
+if USE_SQLITE:
+    from sqlalchemy.dialects.sqlite import insert
+else:
+    from sqlalchemy.dialects.postgresql import insert
+
+# Meal types that are stored; recommendations for any other value are computed inline
+MEAL_TYPES = tuple(MEAL_CALORIE_RATIOS)
+
+# User columns read by the recommendation engine (matching and calorie targets)
+PROFILE_FIELDS = (
+    "age", "gender", "height", "weight", "activity_level",
+    "health_goal", "food_preferences", "allergies",
+)
+
+
+def profile_hash(user: User) -> str:
+    """Digest of the profile fields that affect a user's recommendations."""
+    values = tuple(getattr(user, field) for field in PROFILE_FIELDS)
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _unstamped(meal: MealResponse) -> Dict:
+    """JSON payload of a recommendation without its per-response ids and date."""
+    payload = meal.model_dump(mode="json", exclude={"id", "date"})
+    for food in payload["foods"]:
+        del food["id"]
+    return payload
+
+
+def stamp(payload: List[Dict]) -> List[Dict]:
+    """Stored recommendations with fresh ids and the current date, as recommend_meals returns them."""
+    now = datetime.now().isoformat()
+    stamped = []
+    for meal in payload:
+        foods = [
+            {field: food.get(field) for field in FoodItemResponse.model_fields} | {"id": str(uuid.uuid4())}
+            for food in meal["foods"]
+        ]
+        fresh = {"id": str(uuid.uuid4()), "date": now, "foods": foods}
+        stamped.append({field: fresh[field] if field in fresh else meal.get(field) for field in MealResponse.model_fields})
+    return stamped
+
+
+def get(
+    db: Session,
+    user: User,
+    meal_type: str,
+    version: Optional[str] = None,
+    dataset: str = DEFAULT_DATASET,
+) -> Optional[List[Dict]]:
+    """A user's stored recommendations for a meal type and dataset (stamped), or None if missing or stale."""
+    if meal_type not in MEAL_TYPES:
+        return None
+    row = db.get(UserRecommendation, (user.id, meal_type, dataset))
+    if row is None:
+        return None
+    if row.dataset_version != (version or dataset_version()) or row.profile_hash != profile_hash(user):
+        return None
+    return stamp(row.recommendations)
+
+
+def save(
+    db: Session,
+    user: User,
+    meal_type: str,
+    recommendations: Sequence[MealResponse],
+    version: Optional[str] = None,
+    dataset: str = DEFAULT_DATASET,
+) -> List[Dict]:
+    """
+    Store (insert or replace) a user's recommendations for a meal type and dataset, without
+    ids and dates. Returns the stored payload, stamped; the caller commits.
+    """
+    payload = [_unstamped(meal) for meal in recommendations]
+    if meal_type not in MEAL_TYPES:
+        return stamp(payload)
+    values = {
+        "dataset_version": version or dataset_version(),
+        "profile_hash": profile_hash(user),
+        "recommendations": payload,
+    }
+    stmt = insert(UserRecommendation).values(user_id=user.id, meal_type=meal_type, dataset=dataset, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserRecommendation.user_id, UserRecommendation.meal_type, UserRecommendation.dataset],
+        set_=values,
+    )
+    db.execute(stmt)
+    return stamp(payload)
+
+
+def materialize(db: Session, batch_size: int = 500, force: bool = False) -> int:
+    """
+    Precompute recommendations for every active user and meal type, scoring
+    each page of users as one batch per dataset. Rows that are still current
+    are kept unless `force` is set. Commits once per page; returns the rows written.
+    """
+    written = 0
+    last_id = None
+
+    while True:
+        # Keyset pagination keeps each page query cheap on large user tables
+        query = db.query(User).filter(User.is_active.isnot(False)).order_by(User.id)
+        if last_id is not None:
+            query = query.filter(User.id > last_id)
+        users = query.limit(batch_size).all()
+        if not users:
+            break
+        last_id = users[-1].id
+
+        by_dataset = defaultdict(list)
+        for user in users:
+            by_dataset[dataset_registry.select(user)].append(user)
+        versions = {name: dataset_registry.version(name) for name in by_dataset}
+
+        current = set()
+        if not force:
+            expected = {
+                (user.id, name): (versions[name], profile_hash(user)) for name, group in by_dataset.items() for user in group
+            }
+            rows = (
+                db.query(
+                    UserRecommendation.user_id, UserRecommendation.meal_type, UserRecommendation.dataset,
+                    UserRecommendation.dataset_version, UserRecommendation.profile_hash,
+                )
+                .filter(UserRecommendation.user_id.in_([user.id for user in users]))
+                .all()
+            )
+            current = {
+                (user_id, meal_type) for user_id, meal_type, dataset, version, digest in rows
+                if expected.get((user_id, dataset)) == (version, digest)
+            }
+
+        for name, group in by_dataset.items():
+            engine = RecommendationEngine(dataset_registry.get(name))
+            for meal_type in MEAL_TYPES:
+                stale = [user for user in group if (user.id, meal_type) not in current]
+                if not stale:
+                    continue
+                targets = [meal_target_calories(user, meal_type) for user in stale]
+                for user, recommendations in zip(stale, engine.recommend_meals_batch(stale, meal_type, targets)):
+                    save(db, user, meal_type, recommendations, versions[name], name)
+                written += len(stale)
+
+        db.commit()
+        db.expunge_all()  # Keep memory flat across pages
+    return written
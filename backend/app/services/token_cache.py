@@ -0,0 +1,89 @@
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from sqlalchemy import event, inspect
+from app.models.user import User
+from app.config import settings
+from app.services.cache import TTLCache
+
+# Entries never outlive the token itself; this only caps unusually long-lived tokens
+TOKEN_CACHE_MAX_TTL_SECONDS = settings.token_cache_max_ttl_seconds or settings.access_token_expire_minutes * 60
+
+
+class TokenCache:
+    """
+    LRU cache of already-verified bearer tokens.
+    Maps a SHA-256 digest of the token to its subject so repeated requests with
+    the same token skip JWT signature verification and claims parsing.
+    """
+
+    def __init__(self, max_size: int = settings.token_cache_max_size, max_ttl_seconds: float = TOKEN_CACHE_MAX_TTL_SECONDS):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=max_ttl_seconds, name="token")
+        self.max_ttl_seconds = max_ttl_seconds
+        # Revoking a user gives it a new generation (unique across users, so never
+        # reused); entries from older generations are ignored. A generation is
+        # forgotten once every entry cached before it has expired, oldest first.
+        self._generations: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()  # subject -> (generation, forget at)
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _generation(self, subject: str) -> int:
+        item = self._generations.get(subject)
+        return 0 if item is None else item[0]
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[str]:
+        """Return the subject of a previously verified, unexpired token."""
+        digest = self._digest(token)
+        entry = self._cache.get(digest)
+        if entry is None:
+            return None
+        subject, expires_at, generation = entry
+        if expires_at <= time.time() or generation != self._generation(subject):
+            self._cache.delete(digest)
+            return None
+        return subject
+
+    def put(self, token: str, subject: str, expires_at: Optional[float]):
+        """Remember a verified token until its `exp` claim."""
+        if expires_at is None:
+            return
+        started = time.monotonic()
+        generation = self._generation(subject)
+        # Expire within max_ttl of reading the generation, so the entry is gone
+        # before a concurrent revocation of that generation is forgotten
+        ttl = min(expires_at - time.time(), self.max_ttl_seconds - (time.monotonic() - started))
+        if ttl <= 0:
+            return
+        self._cache.set(self._digest(token), (subject, expires_at, generation), ttl_seconds=ttl)
+
+    def revoke_user(self, subject):
+        """Drop every cached token for a user; they are fully verified again next time."""
+        subject = str(subject)
+        now = time.monotonic()  # The clock TTLCache expires entries by
+        with self._lock:
+            self._generations[subject] = (next(self._counter), now + self.max_ttl_seconds)
+            self._generations.move_to_end(subject)
+            while self._generations and next(iter(self._generations.values()))[1] <= now:
+                self._generations.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
+
+
+token_cache = TokenCache()
+
+
+@event.listens_for(User, "after_update")
+def _revoke_cached_tokens(mapper, connection, target):
+    # Deactivation and password changes revoke the user's cached tokens
+    state = inspect(target)
+    if (state.attrs.is_active.history.has_changes()
+            or state.attrs.hashed_password.history.has_changes()):
+        token_cache.revoke_user(target.id)
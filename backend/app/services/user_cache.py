@@ -0,0 +1,66 @@
+"""
+Per-process cache of authenticated users (see UserCache).
+
+Updates and deletes through the ORM invalidate the entry only in the process
+that made them. Other worker processes (several under gunicorn) keep serving
+their cached snapshot, including `is_active`, for up to USER_CACHE_TTL_SECONDS.
+A deactivated user can therefore keep using the API through those workers
+until the TTL runs out; lower the TTL, or set it to 0, if that window matters.
+"""
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.models.user import User
+from app.config import settings
+from app.services.cache import TTLCache
+
+_USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+class UserCache:
+    """
+    Per-process cache of authenticated user snapshots, keyed by token subject.
+    A hit re-attaches a User to the request session without querying the database.
+    """
+
+    def __init__(self, max_size: int = settings.user_cache_max_size, ttl_seconds: float = settings.user_cache_ttl_seconds):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds, name="user")
+
+    def get(self, subject: str, db: Session) -> Optional[User]:
+        """Return a session-bound User built from the cached snapshot, or None."""
+        snapshot = self._cache.get(subject)
+        if snapshot is None:
+            return None
+        user = User(**{
+            key: list(value) if isinstance(value, list) else value
+            for key, value in snapshot.items()
+        })
+        # Mark the instance as loaded from the database so that updates are
+        # flushed as UPDATEs and no attribute triggers a lazy load
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    def put(self, subject: str, user: User):
+        snapshot: Dict = {}
+        for key in _USER_COLUMNS:
+            value = getattr(user, key)
+            snapshot[key] = list(value) if isinstance(value, list) else value
+        self._cache.set(subject, snapshot)
+
+    def invalidate(self, subject):
+        self._cache.delete(str(subject))
+
+    def clear(self):
+        self._cache.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    # Any ORM write to a user (profile edits, deactivation, password upgrades)
+    # drops the cached snapshot in this process
+    user_cache.invalidate(target.id)
@@ -0,0 +1,185 @@
+"""
+Static serving for the web dashboard.
+
+The asset map (paths, sizes, validators, precompressed variants) is resolved
+once at startup, so a hit never touches the filesystem metadata. Small files
+are kept in memory. Responses carry ETag/Last-Modified, honour conditional
+and single-range requests, prefer precompressed `.br`/`.gz` siblings when the
+client accepts them, and fingerprinted files (e.g. `app.3f9c2b1a.js`) are
+marked immutable.
+"""
+import hashlib
+import mimetypes
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from fastapi import Request, Response, status
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.middleware.compression import choose_encoding
+
+SERVED_EXTENSIONS = {
+    ".html", ".css", ".js", ".json", ".svg", ".png", ".jpg", ".jpeg", ".gif",
+    ".webp", ".ico", ".woff", ".woff2", ".ttf", ".txt", ".map",
+}
+# name.<hash>.ext or name-<hash>.ext with at least 8 hex characters
+FINGERPRINT_RE = re.compile(r"[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+MEMORY_LIMIT = settings.static_memory_limit
+CHUNK_SIZE = 64 * 1024
+
+
+class _Variant:
+    """One stored representation of an asset (identity, gzip or brotli)."""
+
+    def __init__(self, path: Path, encoding: Optional[str]):
+        stat = path.stat()
+        self.path = path
+        self.encoding = encoding
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.content = path.read_bytes() if stat.st_size <= MEMORY_LIMIT else None
+        tag = hashlib.blake2b(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode(), digest_size=12).hexdigest()
+        self.etag = f'"{tag}"'
+
+    def read(self, start: int, end: int) -> Iterator[bytes]:
+        """Yield bytes [start, end] (inclusive)."""
+        if self.content is not None:
+            yield self.content[start:end + 1]
+            return
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class _Asset:
+    def __init__(self, path: Path):
+        self.media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        # Starlette adds the charset for text/* itself
+        if self.media_type in ("application/javascript", "application/json"):
+            self.media_type += "; charset=utf-8"
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if FINGERPRINT_RE.search(path.name) else REVALIDATE_CACHE_CONTROL
+        self.variants: Dict[Optional[str], _Variant] = {None: _Variant(path, None)}
+        for suffix, encoding in ((".br", "br"), (".gz", "gzip")):
+            compressed = path.with_name(path.name + suffix)
+            if compressed.is_file():
+                self.variants[encoding] = _Variant(compressed, encoding)
+        self.last_modified = formatdate(self.variants[None].mtime, usegmt=True)
+        self.encodings = [encoding for encoding in ("br", "gzip") if encoding in self.variants]
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `bytes=` range. Returns (start, end) inclusive, raises
+    ValueError when unsatisfiable, and None for anything we do not handle
+    (multiple ranges, other units), which falls back to a full response.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+class StaticAssets:
+    """Serves the files under a directory from a map resolved at construction."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.assets: Dict[str, _Asset] = {}
+        for path in sorted(directory.rglob("*")):
+            if not path.is_file() or path.suffix.lower() not in SERVED_EXTENSIONS:
+                continue
+            self.assets[path.relative_to(directory).as_posix()] = _Asset(path)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.assets
+
+    def _not_modified(self, request: Request, variant: _Variant) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or variant.etag in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(variant.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def response(self, request: Request, name: str) -> Response:
+        asset = self.assets.get(name)
+        if asset is None:
+            return Response(status_code=status.HTTP_404_NOT_FOUND)
+
+        encoding = None
+        if asset.encodings:
+            encoding = choose_encoding(request.headers.get("accept-encoding", ""), asset.encodings)
+        variant = asset.variants[encoding]
+
+        headers = {
+            "ETag": variant.etag,
+            "Last-Modified": asset.last_modified,
+            "Cache-Control": asset.cache_control,
+            "Accept-Ranges": "bytes",
+        }
+        if asset.encodings:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        if self._not_modified(request, variant):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        start, end = 0, variant.size - 1
+        status_code = status.HTTP_200_OK
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and variant.size and (not if_range or if_range in (variant.etag, asset.last_modified)):
+            try:
+                byte_range = _parse_range(range_header, variant.size)
+            except ValueError:
+                headers["Content-Range"] = f"bytes */{variant.size}"
+                return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+            if byte_range is not None:
+                start, end = byte_range
+                status_code = status.HTTP_206_PARTIAL_CONTENT
+                headers["Content-Range"] = f"bytes {start}-{end}/{variant.size}"
+
+        headers["Content-Length"] = str(max(0, end - start + 1))
+        if request.method == "HEAD":
+            return Response(status_code=status_code, headers=headers, media_type=asset.media_type)
+        if variant.content is not None:
+            return Response(
+                content=variant.content[start:end + 1],
+                status_code=status_code,
+                headers=headers,
+                media_type=asset.media_type,
+            )
+        return StreamingResponse(
+            variant.read(start, end),
+            status_code=status_code,
+            headers=headers,
+            media_type=asset.media_type,
+        )
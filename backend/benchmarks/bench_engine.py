@@ -0,0 +1,166 @@
+"""
+Benchmark: recommendation engine at dataset scale.
+
+For each dataset size, generates (or reuses) a synthetic comprehensive dataset
+and measures:
+  - MealPlanDatasetLoader load time, plus retained and peak memory
+  - find_matching_meals latency percentiles over varied user profiles, also
+    with the dataset split into one shard per scoring thread (--scoring-workers)
+  - RecommendationEngine.recommend_meals end-to-end latency percentiles
+  - find_matching_meals_batch throughput for a cohort of users
+
+Usage (from backend/):
+    python benchmarks/bench_engine.py [--rows 1000 100000 1000000] [--queries 20]
+        [--batch-users 500] [--scoring-workers 4] [--data-dir benchmarks/.data]
+        [--output results.json]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.config import settings
+from app.data.dataset_loader import MealPlanDatasetLoader, scoring_workers
+from app.ml.recommendation_engine import RecommendationEngine
+from benchmarks.synthetic import dataset_path, make_users
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+MEAL_CALORIE_RATIOS = {"breakfast": 0.25, "lunch": 0.35, "dinner": 0.30, "snack": 0.10}
+
+
+def percentiles(samples) -> dict:
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p90_ms": round(pick(0.90) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _quiet(func, *args, **kwargs):
+    # The loader prints a line per load; keep the JSON output clean
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def measure_load(path: Path, measure_memory: bool) -> dict:
+    gc.collect()
+    start = time.perf_counter()
+    loader = _quiet(MealPlanDatasetLoader, path)
+    seconds = time.perf_counter() - start
+    result = {"seconds": round(seconds, 4), "entries": len(loader)}
+    del loader
+
+    if measure_memory:
+        # Separate, traced load: tracemalloc slows allocation down considerably
+        gc.collect()
+        tracemalloc.start()
+        loader = _quiet(MealPlanDatasetLoader, path)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["retained_mb"] = round(retained / 2**20, 2)
+        result["peak_mb"] = round(peak / 2**20, 2)
+        del loader
+    return result
+
+
+def measure_queries(func, users, queries: int) -> dict:
+    samples = []
+    for i in range(queries):
+        user = users[i % len(users)]
+        meal_type = MEAL_TYPES[i % len(MEAL_TYPES)]
+        start = time.perf_counter()
+        func(user, meal_type)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def run_size(rows: int, args, users) -> dict:
+    path = dataset_path(args.data_dir, rows, seed=args.seed)
+    result = {"rows": rows, "file_mb": round(path.stat().st_size / 2**20, 2)}
+    result["load"] = measure_load(path, measure_memory=not args.no_memory)
+
+    loader = _quiet(MealPlanDatasetLoader, path)
+    engine = RecommendationEngine(dataset_loader=loader)
+
+    # One warm-up query so lazy initialisation is not counted
+    loader.find_matching_meals(users[0], "lunch")
+
+    # Single shard first, then sharded regardless of PARALLEL_SCORING_MIN_ROWS
+    min_rows, workers = settings.parallel_scoring_min_rows, settings.scoring_workers
+    settings.parallel_scoring_min_rows = len(loader) + 1
+    result["find_matching_meals"] = measure_queries(loader.find_matching_meals, users, args.queries)
+    settings.parallel_scoring_min_rows, settings.scoring_workers = 0, args.scoring_workers
+    result["find_matching_meals_sharded"] = dict(
+        measure_queries(loader.find_matching_meals, users, args.queries), workers=scoring_workers()
+    )
+    settings.parallel_scoring_min_rows, settings.scoring_workers = min_rows, workers
+
+    def recommend(user, meal_type):
+        target = (user.calculate_tdee() or 2000) * MEAL_CALORIE_RATIOS[meal_type]
+        return engine.recommend_meals(user=user, meal_type=meal_type, target_calories=target)
+
+    result["recommend_meals"] = measure_queries(recommend, users, args.queries)
+    result["batch"] = measure_batch(loader, args.batch_users, args.seed)
+    return result
+
+
+def measure_batch(loader: MealPlanDatasetLoader, count: int, seed: int) -> dict:
+    cohort = make_users(count, seed=seed)
+    start = time.perf_counter()
+    loader.find_matching_meals_batch(cohort, "lunch")
+    seconds = time.perf_counter() - start
+    return {"users": count, "seconds": round(seconds, 4), "users_per_second": round(count / seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=20, help="Timed queries per measurement")
+    parser.add_argument("--users", type=int, default=50, help="Distinct synthetic user profiles")
+    parser.add_argument("--batch-users", type=int, default=500, help="Cohort size for the batch measurement")
+    parser.add_argument("--scoring-workers", type=int, help="Shards for the sharded measurement (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=Path(__file__).parent / ".data")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced memory measurement")
+    parser.add_argument("--output", type=Path, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    users = make_users(args.users)
+    report = {
+        "benchmark": "recommendation_engine",
+        "started_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "queries": args.queries,
+        "results": [run_size(rows, args, users) for rows in args.rows],
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: CPU per serialized meal for meal-plan responses.
+
+Compares the previous path (validated pydantic models, re-validated against
+response_model and rendered with the stdlib encoder) with the fast path
+(model_construct + FastJSONResponse/orjson).
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py [--meals 120] [--repeat 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.meal_plans import _meal_plan_to_response
+from app.api.responses import FastJSONResponse, orjson
+from app.models.meal import Meal, FoodItem
+from app.models.meal_plan import MealPlan
+from app.schemas.meal import MealResponse, FoodItemResponse, NutritionInfoSchema
+from app.schemas.meal_plan import MealPlanResponse
+
+_loop = asyncio.new_event_loop()
+
+
+def _nutrition(calories: float) -> dict:
+    return {
+        "calories": calories,
+        "protein": calories * 0.25 / 4,
+        "carbohydrates": calories * 0.45 / 4,
+        "fat": calories * 0.30 / 9,
+        "fiber": 5.0,
+        "sugar": None,
+        "sodium": None,
+    }
+
+
+def build_plan(meal_count: int):
+    """Build an in-memory plan with `meal_count` meals of 3 food items each."""
+    start = datetime(2026, 1, 1)
+    plan = MealPlan(
+        id=str(uuid.uuid4()),
+        user_id=str(uuid.uuid4()),
+        start_date=start,
+        end_date=start + timedelta(days=meal_count // 4),
+        goal="maintenance",
+        daily_nutrition_target=_nutrition(2000.0),
+        created_at=start,
+    )
+    meals = []
+    for i in range(meal_count):
+        meal = Meal(
+            id=str(uuid.uuid4()),
+            name=f"Meal {i}",
+            description="Generated meal",
+            meal_type="lunch",
+            date=start + timedelta(days=i // 4),
+            nutrition_info=_nutrition(500.0),
+        )
+        meal.food_items = [
+            FoodItem(id=str(uuid.uuid4()), name=f"Food {i}.{j}", quantity=100.0, unit="g", nutrition_info=_nutrition(150.0))
+            for j in range(3)
+        ]
+        meals.append(meal)
+    return plan, meals
+
+
+def _validated_meal_response(meal: Meal) -> MealResponse:
+    # The previous _meal_to_response implementation
+    foods = []
+    for food_item in meal.food_items:
+        nutrition = None
+        if food_item.nutrition_info:
+            nutrition = NutritionInfoSchema(**food_item.nutrition_info)
+        foods.append(FoodItemResponse(
+            id=food_item.id,
+            name=food_item.name,
+            quantity=food_item.quantity,
+            unit=food_item.unit,
+            nutrition=nutrition,
+        ))
+    meal_nutrition = None
+    if meal.nutrition_info:
+        meal_nutrition = NutritionInfoSchema(**meal.nutrition_info)
+    return MealResponse(
+        id=meal.id,
+        name=meal.name,
+        description=meal.description,
+        meal_type=meal.meal_type,
+        date=meal.date,
+        foods=foods,
+        nutrition=meal_nutrition,
+    )
+
+
+def baseline(plan: MealPlan, meals, field) -> bytes:
+    response = MealPlanResponse(
+        id=plan.id,
+        user_id=plan.user_id,
+        start_date=plan.start_date,
+        end_date=plan.end_date,
+        meals=[_validated_meal_response(m) for m in meals],
+        daily_nutrition=NutritionInfoSchema(**plan.daily_nutrition_target),
+        goal=plan.goal,
+        created_at=plan.created_at,
+    )
+    # What FastAPI does with a returned model: validate against response_model,
+    # serialize to JSON-compatible data, then render with the stdlib encoder
+    content = _loop.run_until_complete(serialize_response(field=field, response_content=response))
+    return JSONResponse(content).body
+
+
+def fast_path(plan: MealPlan, meals) -> bytes:
+    return FastJSONResponse(_meal_plan_to_response(plan, meals)).body
+
+
+def _measure(func, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        func()
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--meals", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    plan, meals = build_plan(args.meals)
+    field = create_response_field(name="response", type_=MealPlanResponse)
+
+    # Both paths must produce the same document
+    assert json.loads(baseline(plan, meals, field)) == json.loads(fast_path(plan, meals))
+
+    baseline_cpu = _measure(lambda: baseline(plan, meals, field), args.repeat)
+    fast_cpu = _measure(lambda: fast_path(plan, meals), args.repeat)
+    serialized = args.meals * args.repeat
+
+    result = {
+        "benchmark": "meal_plan_serialization",
+        "meals_per_plan": args.meals,
+        "repeat": args.repeat,
+        "orjson": orjson is not None,
+        "baseline_us_per_meal": round(baseline_cpu / serialized * 1e6, 2),
+        "fast_path_us_per_meal": round(fast_cpu / serialized * 1e6, 2),
+        "speedup": round(baseline_cpu / fast_cpu, 2) if fast_cpu else None,
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: application startup time.
+
+Measures, in fresh interpreters, how long `import main` takes and how long a
+uvicorn process needs before /health first answers 200.
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py [--repeat 5] [--port 8765]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env(database_url: str) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = database_url
+    return env
+
+
+def measure_import(env: dict) -> float:
+    """Seconds spent importing `main` in a fresh interpreter."""
+    code = "import time; s = time.perf_counter(); import main; print(time.perf_counter() - s)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_response(env: dict, port: int, timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn until GET /health returns 200."""
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"{url} did not answer within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _summary(samples) -> dict:
+    return {
+        "min_ms": round(min(samples) * 1000, 1),
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", help="Database to start against (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        # Warm the bytecode cache so the first sample is not an outlier
+        measure_import(env)
+        imports = [measure_import(env) for _ in range(args.repeat)]
+        first_responses = [measure_first_response(env, args.port) for _ in range(args.repeat)]
+
+    result = {
+        "benchmark": "startup",
+        "repeat": args.repeat,
+        "import_main": _summary(imports),
+        "time_to_first_200": _summary(first_responses),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Local stand-in for the external nutrition APIs used by NutritionService.
+
+Serves the Nutritionix, Edamam and USDA endpoints under /nutritionix/v2,
+/edamam/api and /usda/fdc/v1 with configurable latency and error rate, so
+load tests run without network access. Point the API at it with:
+
+    NUTRITIONIX_BASE_URL=http://127.0.0.1:9100/nutritionix/v2
+    EDAMAM_BASE_URL=http://127.0.0.1:9100/edamam/api
+    USDA_BASE_URL=http://127.0.0.1:9100/usda/fdc/v1
+    (plus any non-empty *_APP_ID / *_API_KEY values)
+
+Usage (from backend/):
+    python benchmarks/fake_nutrition_provider.py [--port 9100] [--latency-ms 50]
+        [--jitter-ms 20] [--error-rate 0.05]
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def _nutrients(food_name: str) -> dict:
+    # Stable per-food values so repeated lookups agree
+    digest = hashlib.sha256(food_name.lower().encode()).digest()
+    calories = 50 + digest[0] * 2
+    return {
+        "calories": float(calories),
+        "protein": round(digest[1] / 8, 1),
+        "carbohydrates": round(digest[2] / 4, 1),
+        "fat": round(digest[3] / 12, 1),
+        "fiber": round(digest[4] / 40, 1),
+        "sugar": round(digest[5] / 20, 1),
+        "sodium": float(digest[6] * 3),
+    }
+
+
+def _food_name(query: str) -> str:
+    # Queries look like "150.0g chicken breast"
+    first, _, rest = query.partition(" ")
+    return rest if first.endswith("g") and rest else query
+
+
+def create_app(latency_ms: float = 50.0, jitter_ms: float = 20.0, error_rate: float = 0.0, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="Fake nutrition provider")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "errors": 0}
+
+    async def simulate():
+        """Sleep for the configured latency; return an error response for a fraction of calls."""
+        stats["requests"] += 1
+        delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": "simulated failure"}, status_code=503)
+        return None
+
+    @app.post("/nutritionix/v2/natural/nutrients")
+    async def nutritionix(request: Request):
+        error = await simulate()
+        if error:
+            return error
+        body = await request.json()
+        n = _nutrients(_food_name(body.get("query", "")))
+        return {"foods": [{
+            "nf_calories": n["calories"],
+            "nf_protein": n["protein"],
+            "nf_total_carbohydrate": n["carbohydrates"],
+            "nf_total_fat": n["fat"],
+            "nf_dietary_fiber": n["fiber"],
+            "nf_sugars": n["sugar"],
+            "nf_sodium": n["sodium"],
+        }]}
+
+    @app.get("/edamam/api/food-database/v2/parser")
+    async def edamam(ingr: str = ""):
+        error = await simulate()
+        if error:
+            return error
+        n = _nutrients(_food_name(ingr))
+        return {"parsed": [{"food": {"nutrients": {
+            "ENERC_KCAL": {"quantity": n["calories"]},
+            "PROCNT": {"quantity": n["protein"]},
+            "CHOCDF": {"quantity": n["carbohydrates"]},
+            "FAT": {"quantity": n["fat"]},
+            "FIBTG": {"quantity": n["fiber"]},
+            "SUGAR": {"quantity": n["sugar"]},
+            "NA": {"quantity": n["sodium"]},
+        }}}]}
+
+    @app.get("/usda/fdc/v1/foods/search")
+    async def usda_search(query: str = ""):
+        error = await simulate()
+        if error:
+            return error
+        return {"foods": [{"fdcId": query or "unknown"}]}
+
+    @app.get("/usda/fdc/v1/food/{food_id}")
+    async def usda_food(food_id: str):
+        error = await simulate()
+        if error:
+            return error
+        n = _nutrients(food_id)
+        names = {
+            "Energy": n["calories"],
+            "Protein": n["protein"],
+            "Carbohydrate, by difference": n["carbohydrates"],
+            "Total lipid (fat)": n["fat"],
+            "Fiber, total dietary": n["fiber"],
+            "Sugars, total including NLEA": n["sugar"],
+            "Sodium, Na": n["sodium"],
+        }
+        return {"foodNutrients": [{"nutrient": {"name": name}, "amount": amount} for name, amount in names.items()]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+End-to-end load test.
+
+Starts the fake nutrition provider and the API (uvicorn, against a temporary
+SQLite database unless --database-url is given), registers a pool of users,
+then drives a weighted mix of register/login/profile/recommendations/
+generate/analyze requests at a fixed concurrency for a fixed duration.
+Reports throughput and latency percentiles per endpoint as JSON. No network
+access is needed.
+
+Usage (from backend/):
+    python benchmarks/loadtest.py [--duration 30] [--concurrency 16] [--workers 1]
+        [--users 20] [--provider-latency-ms 50] [--provider-error-rate 0.05]
+        [--database-url postgresql://...] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# (name, weight) — relative frequency of each scenario step
+DEFAULT_MIX = {
+    "register": 2,
+    "login": 5,
+    "profile": 25,
+    "recommendations": 35,
+    "generate": 5,
+    "analyze": 15,
+    "daily_nutrition": 13,
+}
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+GOALS = ["weight_loss", "muscle_gain", "maintenance"]
+ACTIVITIES = ["sedentary", "lightly_active", "moderately_active", "very_active"]
+FOODS = ["chicken breast", "brown rice", "broccoli", "salmon", "oatmeal", "banana", "lentils", "greek yogurt"]
+PASSWORD = "loadtest-password"
+
+
+def percentiles(samples) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    return {
+        "p50_ms": round(pick(0.50) * 1000, 2),
+        "p90_ms": round(pick(0.90) * 1000, 2),
+        "p99_ms": round(pick(0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+    }
+
+
+def _profile(rng: random.Random) -> dict:
+    return {
+        "age": rng.randint(18, 75),
+        "gender": rng.choice(["male", "female"]),
+        "height": float(rng.randint(150, 200)),
+        "weight": round(rng.uniform(50, 110), 1),
+        "activity_level": rng.choice(ACTIVITIES),
+        "health_goal": rng.choice(GOALS),
+        "allergies": rng.choice([[], ["peanuts"], ["gluten"]]),
+    }
+
+
+class Stats:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.statuses = {}
+
+    def record(self, name: str, seconds: float, status: int):
+        ok = 200 <= status < 400
+        if ok:
+            self.samples.setdefault(name, []).append(seconds)
+        else:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        statuses = self.statuses.setdefault(name, {})
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name in sorted(set(self.samples) | set(self.errors)):
+            ok = len(self.samples.get(name, []))
+            errors = self.errors.get(name, 0)
+            endpoints[name] = {
+                "requests": ok + errors,
+                "errors": errors,
+                "throughput_rps": round((ok + errors) / elapsed, 2),
+                "statuses": self.statuses.get(name, {}),
+                **percentiles(self.samples.get(name, [])),
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        all_samples = [s for samples in self.samples.values() for s in samples]
+        return {
+            "total": {
+                "requests": total,
+                "errors": sum(e["errors"] for e in endpoints.values()),
+                "throughput_rps": round(total / elapsed, 2),
+                **percentiles(all_samples),
+            },
+            "endpoints": endpoints,
+        }
+
+
+class Scenario:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, seed: int):
+        self.client = client
+        self.stats = stats
+        self.rng = random.Random(seed)
+        self.accounts = []  # (email, token)
+
+    async def _request(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 599
+        self.stats.record(name, time.perf_counter() - start, status)
+        return response
+
+    def _auth(self):
+        _, token = self.rng.choice(self.accounts)
+        return {"Authorization": f"Bearer {token}"}
+
+    async def register(self):
+        email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+        response = await self._request(
+            "register", "POST", "/api/v1/auth/register",
+            json={"email": email, "password": PASSWORD, **_profile(self.rng)},
+        )
+        if response is not None and response.status_code == 201:
+            self.accounts.append((email, response.json()["access_token"]))
+
+    async def login(self):
+        email, _ = self.rng.choice(self.accounts)
+        await self._request("login", "POST", "/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+
+    async def profile(self):
+        await self._request("profile", "GET", "/api/v1/users/profile", headers=self._auth())
+
+    async def recommendations(self):
+        await self._request(
+            "recommendations", "GET", "/api/v1/recommendations",
+            params={"meal_type": self.rng.choice(MEAL_TYPES)}, headers=self._auth(),
+        )
+
+    async def generate(self):
+        start = datetime(2026, 1, 1) + timedelta(days=self.rng.randint(0, 300))
+        await self._request(
+            "generate", "POST", "/api/v1/meal-plans/generate",
+            params={
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=self.rng.randint(1, 3))).isoformat(),
+            },
+            headers=self._auth(),
+        )
+
+    async def analyze(self):
+        foods = [
+            {"name": name, "quantity": float(self.rng.choice([50, 100, 150, 200]))}
+            for name in self.rng.sample(FOODS, self.rng.randint(1, 4))
+        ]
+        await self._request("analyze", "POST", "/api/v1/nutrition/analyze", json={"foods": foods}, headers=self._auth())
+
+    async def daily_nutrition(self):
+        end = date(2026, 1, 1) + timedelta(days=self.rng.randint(0, 300))
+        await self._request(
+            "daily_nutrition", "GET", "/api/v1/nutrition/daily",
+            params={"start_date": (end - timedelta(days=6)).isoformat(), "end_date": end.isoformat()},
+            headers=self._auth(),
+        )
+
+
+async def run_load(base_url: str, args) -> dict:
+    stats = Stats()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        seeder = Scenario(client, Stats(), args.seed)
+        await asyncio.gather(*(seeder.register() for _ in range(args.users)))
+        if not seeder.accounts:
+            raise RuntimeError("Could not register any load-test users")
+
+        names = list(DEFAULT_MIX)
+        weights = [DEFAULT_MIX[name] for name in names]
+        deadline = time.perf_counter() + args.duration
+
+        async def worker(index: int):
+            scenario = Scenario(client, stats, args.seed + index + 1)
+            scenario.accounts = seeder.accounts  # Shared pool; register() grows it
+            while time.perf_counter() < deadline:
+                step = scenario.rng.choices(names, weights)[0]
+                await getattr(scenario, step)()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    return stats.report(elapsed) | {"elapsed_seconds": round(elapsed, 2)}
+
+
+def _wait_for(url: str, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{proc.args} exited with code {proc.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f"{url} did not become ready within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of sustained load")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent simulated clients")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--users", type=int, default=20, help="Users registered before the run")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--provider-port", type=int, default=9100)
+    parser.add_argument("--provider-latency-ms", type=float, default=50.0)
+    parser.add_argument("--provider-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--provider-error-rate", type=float, default=0.05)
+    parser.add_argument("--database-url", help="Database to run against (default: a temporary SQLite file)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request client timeout")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        provider_url = f"http://127.0.0.1:{args.provider_port}"
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(tmp, 'loadtest.db')}",
+            "NUTRITIONIX_APP_ID": "loadtest",
+            "NUTRITIONIX_API_KEY": "loadtest",
+            "NUTRITIONIX_BASE_URL": f"{provider_url}/nutritionix/v2",
+            "EDAMAM_APP_ID": "loadtest",
+            "EDAMAM_API_KEY": "loadtest",
+            "EDAMAM_BASE_URL": f"{provider_url}/edamam/api",
+            "USDA_API_KEY": "loadtest",
+            "USDA_BASE_URL": f"{provider_url}/usda/fdc/v1",
+        })
+
+        processes = []
+        try:
+            processes.append(subprocess.Popen(
+                [sys.executable, str(Path(__file__).parent / "fake_nutrition_provider.py"),
+                 "--port", str(args.provider_port),
+                 "--latency-ms", str(args.provider_latency_ms),
+                 "--jitter-ms", str(args.provider_jitter_ms),
+                 "--error-rate", str(args.provider_error_rate),
+                 "--seed", str(args.seed)],
+                cwd=BACKEND_DIR, env=env,
+            ))
+            _wait_for(f"{provider_url}/stats", processes[-1])
+
+            # Create the schema once up front so workers do not race on it
+            subprocess.run([sys.executable, "manage.py", "init-db"], cwd=BACKEND_DIR, env=env, check=True,
+                           stdout=subprocess.DEVNULL)
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.port),
+                 "--workers", str(args.workers), "--log-level", "warning"],
+                cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+            ))
+            base_url = f"http://127.0.0.1:{args.port}"
+            _wait_for(f"{base_url}/health", processes[-1])
+
+            results = asyncio.run(run_load(base_url, args))
+            provider_stats = httpx.get(f"{provider_url}/stats").json()
+        finally:
+            for proc in reversed(processes):
+                proc.terminate()
+                proc.wait()
+
+    report = {
+        "benchmark": "loadtest",
+        "started_at": datetime.utcnow().isoformat(),
+        "config": {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "users": args.users,
+            "provider_latency_ms": args.provider_latency_ms,
+            "provider_error_rate": args.provider_error_rate,
+            "database": "custom" if args.database_url else "sqlite",
+            "mix": DEFAULT_MIX,
+        },
+        "provider": provider_stats,
+        **results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
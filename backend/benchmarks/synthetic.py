@@ -0,0 +1,112 @@
+"""
+Deterministic synthetic data for benchmarks.
+
+`write_dataset` produces CSVs with the same columns and value domains as
+ml/diet_recommendations_dataset.csv; `make_users` builds detached User
+objects with varied profiles. The same seed always yields the same data, so
+generated files can be cached between runs.
+"""
+import csv
+import os
+import random
+from pathlib import Path
+from typing import List
+
+from app.models.user import User
+
+COLUMNS = [
+    "Patient_ID", "Age", "Gender", "Weight_kg", "Height_cm", "BMI", "Disease_Type", "Severity",
+    "Physical_Activity_Level", "Daily_Caloric_Intake", "Cholesterol_mg/dL", "Blood_Pressure_mmHg",
+    "Glucose_mg/dL", "Dietary_Restrictions", "Allergies", "Preferred_Cuisine", "Weekly_Exercise_Hours",
+    "Adherence_to_Diet_Plan", "Dietary_Nutrient_Imbalance_Score", "Diet_Recommendation",
+]
+GENDERS = ["Male", "Female"]
+DISEASES = ["Hypertension", "Diabetes", "Obesity", "None"]
+SEVERITIES = ["Mild", "Moderate", "Severe"]
+ACTIVITIES = ["Sedentary", "Moderate", "Active"]
+RESTRICTIONS = ["Low_Sodium", "Low_Sugar", "None"]
+ALLERGIES = ["Gluten", "Peanuts", "None"]
+CUISINES = ["Mexican", "Indian", "Chinese", "Italian"]
+DIETS_BY_DISEASE = {
+    "Hypertension": "Low_Sodium",
+    "Diabetes": "Low_Carb",
+    "Obesity": "Balanced",
+    "None": "Balanced",
+}
+
+USER_GOALS = ["weight_loss", "muscle_gain", "maintenance", "diabetes", "hypertension", None]
+USER_ACTIVITIES = ["sedentary", "lightly_active", "moderately_active", "very_active", "extremely_active", None]
+USER_ALLERGIES = [[], ["peanuts"], ["gluten"], ["peanuts", "gluten"], ["shellfish"]]
+USER_PREFERENCES = [[], ["indian"], ["chinese"], ["mexican", "vegetarian"], ["italian"], ["vegan"]]
+
+
+def _row(rng: random.Random, index: int) -> list:
+    height = rng.randint(150, 200)
+    weight = round(rng.uniform(45, 120), 1)
+    disease = rng.choice(DISEASES)
+    return [
+        f"P{index:07d}",
+        rng.randint(18, 79),
+        rng.choice(GENDERS),
+        weight,
+        height,
+        round(weight / (height / 100) ** 2, 1),
+        disease,
+        rng.choice(SEVERITIES),
+        rng.choice(ACTIVITIES),
+        rng.randint(1500, 3500),
+        round(rng.uniform(150, 250), 1),
+        rng.randint(110, 180),
+        round(rng.uniform(70, 200), 1),
+        rng.choice(RESTRICTIONS),
+        rng.choice(ALLERGIES),
+        rng.choice(CUISINES),
+        round(rng.uniform(0, 10), 1),
+        round(rng.uniform(50, 100), 1),
+        round(rng.uniform(0, 5), 1),
+        DIETS_BY_DISEASE[disease],
+    ]
+
+
+def write_dataset(path: Path, rows: int, seed: int = 42) -> Path:
+    """Write a synthetic comprehensive dataset with `rows` entries to `path`."""
+    rng = random.Random(seed)
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for index in range(1, rows + 1):
+            writer.writerow(_row(rng, index))
+    os.replace(tmp_path, path)
+    return path
+
+
+def dataset_path(data_dir: Path, rows: int, seed: int = 42) -> Path:
+    """Path of the cached dataset for (rows, seed), generating it on first use."""
+    path = Path(data_dir) / f"diet_recommendations_{rows}_{seed}.csv"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_dataset(path, rows, seed)
+    return path
+
+
+def make_users(count: int, seed: int = 7) -> List[User]:
+    """Build `count` transient users with varied, fully-populated profiles."""
+    rng = random.Random(seed)
+    users = []
+    for index in range(count):
+        users.append(User(
+            id=f"bench-user-{index}",
+            email=f"bench{index}@example.com",
+            age=rng.randint(18, 80),
+            gender=rng.choice(["male", "female"]),
+            height=float(rng.randint(150, 200)),
+            weight=round(rng.uniform(45, 120), 1),
+            activity_level=rng.choice(USER_ACTIVITIES),
+            health_goal=rng.choice(USER_GOALS),
+            allergies=list(rng.choice(USER_ALLERGIES)),
+            food_preferences=list(rng.choice(USER_PREFERENCES)),
+            is_active=True,
+        ))
+    return users
@@ -0,0 +1,43 @@
+"""
+gunicorn configuration for multi-process deployments.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The app and the recommendation dataset are loaded once in the parent process
+and shared copy-on-write by the uvicorn workers. Settings come from the
+environment / .env (see app/config.py): BIND, WEB_CONCURRENCY,
+GRACEFUL_TIMEOUT, MAX_REQUESTS, MAX_REQUESTS_JITTER. With several workers,
+background job state is kept in the database (JOB_STORE) unless set otherwise.
+
+Send SIGHUP for a graceful restart of the workers (they are re-forked from
+the already-loaded parent); restart the parent to pick up new code or a new
+dataset file.
+"""
+import multiprocessing
+
+from app.config import settings
+
+bind = settings.bind
+workers = settings.web_concurrency or multiprocessing.cpu_count()
+if settings.job_store is None and workers > 1:
+    # Job status polls may reach any worker, so job state must be shared
+    settings.job_store = "database"
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+graceful_timeout = settings.graceful_timeout
+max_requests = settings.max_requests
+max_requests_jitter = settings.max_requests_jitter
+
+
+def on_starting(server):
+    from app.database import engine
+    from main import init_db, preload
+
+    if settings.auto_create_tables:
+        # Once here, rather than racing in every worker's lifespan hook
+        init_db()
+        settings.auto_create_tables = False
+    # Connections must not be inherited by forked workers
+    engine.dispose()
+    if settings.preload_dataset:
+        preload()
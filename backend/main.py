@@ -1,19 +1,52 @@
-from fastapi import FastAPI
+import gc
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 from pathlib import Path
-import os
-from app.api import auth, users, meal_plans, nutrition, recommendations
+from app import metrics
+from app.api import auth, users, meal_plans, nutrition, recommendations, debug
+from app.config import settings
+from app.data.dataset_loader import get_dataset_loader
 from app.database import engine, Base
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.query_budget import QueryBudgetMiddleware
+from app.static_assets import StaticAssets
+
+
+def init_db():
+    """Create any missing database tables."""
+    Base.metadata.create_all(bind=engine)
+
+
+def preload():
+    """
+    Load shared read-only state and move it out of the garbage collector's view.
+    Called by gunicorn in the parent process before forking workers, so the
+    pages stay shared copy-on-write instead of being copied by GC passes.
+    """
+    get_dataset_loader()
+    gc.collect()
+    gc.freeze()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Importing this module has no side effects; tables are only created once
+    # the server actually starts, and only when AUTO_CREATE_TABLES is enabled
+    if settings.auto_create_tables:
+        init_db()
+    if settings.preload_dataset:
+        get_dataset_loader()  # Already loaded when gunicorn preloaded it
+    yield
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Nutrition API",
     description="Personalized Nutrition and Diet Management Platform API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -25,57 +58,56 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated gzip/brotli compression for large bodies
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Development aid: log requests that exceed their SQL statement budget
+if settings.query_budget_warnings:
+    app.add_middleware(QueryBudgetMiddleware)
+
+# Opt-in profiling of single requests; not installed unless PROFILING_TOKEN is set
+if settings.profiling_token:
+    app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so recorded latency includes compression
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
 app.include_router(meal_plans.router, prefix="/api/v1/meal-plans", tags=["Meal Plans"])
 app.include_router(nutrition.router, prefix="/api/v1/nutrition", tags=["Nutrition"])
 app.include_router(recommendations.router, prefix="/api/v1/recommendations", tags=["Recommendations"])
+if settings.profiling_token:
+    app.include_router(debug.router, prefix="/api/v1/debug", tags=["Debug"])
 
 # Get the project root directory (parent of backend directory)
 backend_dir = Path(__file__).parent
 project_root = backend_dir.parent
 web_dir = project_root / "web"
 
-# Serve static files (CSS, JS, images) if web directory exists
+# Serve the web dashboard if the web directory exists. The file map is
+# resolved once here; see app/static_assets.py for caching behaviour.
 if web_dir.exists() and web_dir.is_dir():
-    # Mount static files
-    static_dir = web_dir / "css"
-    if static_dir.exists():
-        app.mount("/css", StaticFiles(directory=str(static_dir)), name="css")
-    
-    static_dir = web_dir / "js"
-    if static_dir.exists():
-        app.mount("/js", StaticFiles(directory=str(static_dir)), name="js")
+    web_assets = StaticAssets(web_dir)
     
-    # Serve HTML files
-    @app.get("/")
-    async def root():
-        index_file = web_dir / "index.html"
-        if index_file.exists():
-            return FileResponse(str(index_file))
+    @app.api_route("/", methods=["GET", "HEAD"], include_in_schema=False)
+    async def root(request: Request):
+        if "index.html" in web_assets:
+            return web_assets.response(request, "index.html")
         return {"message": "Nutrition API is running", "version": "1.0.0"}
     
-    @app.get("/register.html")
-    async def register_page():
-        register_file = web_dir / "register.html"
-        if register_file.exists():
-            return FileResponse(str(register_file))
-        return {"error": "Register page not found"}
+    @app.api_route("/{page}.html", methods=["GET", "HEAD"], include_in_schema=False)
+    async def web_page(request: Request, page: str):
+        return web_assets.response(request, f"{page}.html")
     
-    @app.get("/dashboard.html")
-    async def dashboard_page():
-        dashboard_file = web_dir / "dashboard.html"
-        if dashboard_file.exists():
-            return FileResponse(str(dashboard_file))
-        return {"error": "Dashboard page not found"}
+    @app.api_route("/css/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def web_css(request: Request, path: str):
+        return web_assets.response(request, f"css/{path}")
     
-    @app.get("/meal-plans.html")
-    async def meal_plans_page():
-        meal_plans_file = web_dir / "meal-plans.html"
-        if meal_plans_file.exists():
-            return FileResponse(str(meal_plans_file))
-        return {"error": "Meal plans page not found"}
+    @app.api_route("/js/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def web_js(request: Request, path: str):
+        return web_assets.response(request, f"js/{path}")
 else:
     # Fallback if web directory doesn't exist
     @app.get("/")
@@ -86,6 +118,11 @@ else:
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint (per worker process)."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
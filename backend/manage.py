@@ -0,0 +1,97 @@
+"""
+Maintenance commands.
+
+Usage (from backend/):
+    python manage.py init-db
+    python manage.py rebuild-rollups [--user-id ID]
+    python manage.py compress-static [--web-dir PATH]
+    python manage.py materialize-recommendations [--force] [--batch-size N]
+"""
+import argparse
+import sys
+
+
+def init_db(args):
+    from main import init_db as create_tables
+
+    create_tables()
+    print("Database tables created")
+
+
+def rebuild_rollups(args):
+    from app.database import SessionLocal
+    from app.services import nutrition_rollup
+
+    db = SessionLocal()
+    try:
+        rows = nutrition_rollup.rebuild(db, user_id=args.user_id)
+    finally:
+        db.close()
+    print(f"Rebuilt {rows} daily nutrition rows")
+
+
+def compress_static(args):
+    import gzip
+    from pathlib import Path
+    from app.static_assets import SERVED_EXTENSIONS
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    web_dir = Path(args.web_dir) if args.web_dir else Path(__file__).parent.parent / "web"
+    written = 0
+    for path in sorted(web_dir.rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in SERVED_EXTENSIONS:
+            continue
+        data = path.read_bytes()
+        if len(data) < 1024 or path.suffix.lower() in (".png", ".jpg", ".jpeg", ".gif", ".webp", ".woff", ".woff2"):
+            continue  # Too small or already compressed
+        path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        written += 1
+        if brotli is not None:
+            path.with_name(path.name + ".br").write_bytes(brotli.compress(data, quality=11))
+            written += 1
+    print(f"Wrote {written} precompressed files under {web_dir}")
+
+
+def materialize_recommendations(args):
+    from app.database import SessionLocal
+    from app.services import recommendation_store
+
+    db = SessionLocal()
+    try:
+        rows = recommendation_store.materialize(db, batch_size=args.batch_size, force=args.force)
+    finally:
+        db.close()
+    print(f"Materialized {rows} user recommendation rows")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nutrition API maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init = subparsers.add_parser("init-db", help="Create any missing database tables")
+    init.set_defaults(func=init_db)
+
+    rebuild = subparsers.add_parser("rebuild-rollups", help="Recompute the daily_nutrition table from meal history")
+    rebuild.add_argument("--user-id", help="Only rebuild this user's rows")
+    rebuild.set_defaults(func=rebuild_rollups)
+
+    compress = subparsers.add_parser("compress-static", help="Write .gz/.br variants of the web assets")
+    compress.add_argument("--web-dir", help="Directory to compress (default: ../web)")
+    compress.set_defaults(func=compress_static)
+
+    materialize = subparsers.add_parser(
+        "materialize-recommendations", help="Precompute the user_recommendations table (run nightly)"
+    )
+    materialize.add_argument("--force", action="store_true", help="Recompute rows that are still current")
+    materialize.add_argument("--batch-size", type=int, default=500, help="Users scored per batch")
+    materialize.set_defaults(func=materialize_recommendations)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
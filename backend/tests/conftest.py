@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Configure the app for a throwaway SQLite database before anything imports it
+_DB_DIR = tempfile.mkdtemp(prefix="nutrition-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_DB_DIR) / 'test.db'}"
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+os.environ.setdefault("PRELOAD_DATASET", "false")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+import main  # noqa: E402
+from app.services.token_cache import token_cache  # noqa: E402
+from app.services.user_cache import user_cache  # noqa: E402
+
+PASSWORD = "secret123"
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def cold_caches():
+    """Budgets are declared for cold auth caches; clear them before the measured request."""
+    def clear():
+        user_cache.clear()
+        token_cache.clear()
+    return clear
+
+
+_users = 0
+
+
+@pytest.fixture
+def auth_headers(client):
+    """A freshly registered user with a complete profile."""
+    global _users
+    _users += 1
+    response = client.post("/api/v1/auth/register", json={
+        "email": f"user{_users}@example.com",
+        "password": PASSWORD,
+        "age": 30,
+        "gender": "male",
+        "height": 180,
+        "weight": 80,
+        "activity_level": "moderately_active",
+        "health_goal": "weight_loss",
+        "allergies": ["peanuts"],
+    })
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,62 @@
+"""
+Batch (find_matching_meals_batch) and sharded scoring return exactly what
+find_matching_meals returns for each user on its own.
+"""
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.data.dataset_loader import MealPlanDatasetLoader
+from app.models.user import User
+from benchmarks.synthetic import make_users, write_dataset
+
+BUNDLED_DATASET = Path(__file__).resolve().parent.parent / "ml" / "diet_recommendations_dataset.csv"
+MEAL_TYPES = ("breakfast", "snack")
+
+
+def _load(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return MealPlanDatasetLoader(path)
+
+
+@pytest.fixture(scope="module", params=["bundled", "synthetic"])
+def loader(request, tmp_path_factory):
+    if request.param == "bundled":
+        if not BUNDLED_DATASET.exists():
+            pytest.skip("bundled dataset not present")
+        return _load(BUNDLED_DATASET)
+    return _load(write_dataset(tmp_path_factory.mktemp("data") / "synthetic.csv", 3000, seed=3))
+
+
+@pytest.fixture(scope="module")
+def users():
+    # Includes a user with an empty profile
+    return make_users(40, seed=11) + [User(
+        age=None, height=None, weight=None, gender=None, allergies=None,
+        food_preferences=None, health_goal=None, activity_level=None,
+    )]
+
+
+@pytest.fixture
+def single_shard(monkeypatch):
+    monkeypatch.setattr(settings, "scoring_workers", 1)
+
+
+@pytest.mark.parametrize("memory_limit", [None, 64 * 1500, 64 * 7])
+def test_batch_matches_single_queries(loader, users, single_shard, memory_limit):
+    for meal_type in MEAL_TYPES:
+        single = [loader.find_matching_meals(user, meal_type) for user in users]
+        # Small limits force chunking by users and by rows
+        assert loader.find_matching_meals_batch(users, meal_type, memory_limit=memory_limit) == single
+
+
+def test_sharded_scoring_matches_one_shard(loader, users, monkeypatch):
+    monkeypatch.setattr(settings, "scoring_workers", 1)
+    expected = {meal_type: [loader.find_matching_meals(user, meal_type) for user in users] for meal_type in MEAL_TYPES}
+    monkeypatch.setattr(settings, "scoring_workers", 4)
+    monkeypatch.setattr(settings, "parallel_scoring_min_rows", 0)
+    for meal_type in MEAL_TYPES:
+        assert [loader.find_matching_meals(user, meal_type) for user in users] == expected[meal_type]
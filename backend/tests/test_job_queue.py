@@ -0,0 +1,55 @@
+"""
+Background job state in the database store, as shared by worker processes.
+"""
+import threading
+import time
+
+from app.services.job_queue import DatabaseJobStore, JobRunner, JOB_SUCCEEDED
+
+
+def _wait(runner, job_id):
+    for _ in range(100):
+        job = runner.get(job_id)
+        if job is not None and job.done:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_database_store_is_shared_between_runners(client):
+    release = threading.Event()
+    worker = JobRunner(workers=1, store=DatabaseJobStore(60))
+    worker.register("echo", lambda payload: release.wait(5) and {"echo": payload["value"]})
+    other = JobRunner(workers=1, store=DatabaseJobStore(60))  # Another worker process
+
+    job = worker.submit("echo", {"value": 7}, owner="owner-1", dedupe_key="echo:7")
+    seen = other.get(job.id)
+    assert seen is not None and seen.owner == "owner-1" and not seen.done
+    # A retry reaching the other process reuses the unfinished job
+    other.register("echo", lambda payload: None)
+    assert other.submit("echo", {"value": 7}, owner="owner-1", dedupe_key="echo:7").id == job.id
+
+    release.set()
+    finished = _wait(other, job.id)
+    assert finished.status == JOB_SUCCEEDED
+    assert finished.result == {"echo": 7}
+    assert other.get("missing") is None
+
+
+def test_generate_job_polled_through_database_store(client, auth_headers, monkeypatch):
+    from app.api import meal_plans
+
+    runner = JobRunner(workers=1, store=DatabaseJobStore(60))
+    runner.register(meal_plans.GENERATE_MEAL_PLAN_JOB, meal_plans._run_generate_job)
+    monkeypatch.setattr(meal_plans, "job_runner", runner)
+    response = client.post("/api/v1/meal-plans/generate", headers=auth_headers, params={
+        "start_date": "2026-06-01T00:00:00", "end_date": "2026-06-02T00:00:00", "background": "true",
+    })
+    assert response.status_code == 202, response.text
+    job = _wait(JobRunner(store=DatabaseJobStore(60)), response.json()["job_id"])
+    assert job.status == JOB_SUCCEEDED, job.error
+
+    polled = client.get(response.headers["Location"], headers=auth_headers)
+    assert polled.status_code == 200
+    assert polled.json()["status"] == JOB_SUCCEEDED
+    assert len(polled.json()["result"]["meals"]) > 0
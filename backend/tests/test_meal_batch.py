@@ -0,0 +1,67 @@
+"""
+POST /meal-plans/meals/batch with dates as offline clients send them.
+"""
+
+
+def _meal(client_id, date):
+    return {"client_id": client_id, "name": client_id, "meal_type": "lunch", "date": date, "foods": []}
+
+
+def test_mixed_naive_and_offset_dates(client, auth_headers):
+    response = client.post("/api/v1/meal-plans/meals/batch", headers=auth_headers, json={"meals": [
+        _meal("naive", "2026-04-01T12:00:00"),
+        _meal("utc", "2026-04-02T12:00:00Z"),
+        _meal("offset", "2026-04-03T08:00:00+02:00"),
+    ]})
+    assert response.status_code == 200, response.text
+    assert [result["status"] for result in response.json()["results"]] == ["created"] * 3
+
+    response = client.get("/api/v1/meal-plans", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 3  # One day plan per meal
+
+    # Replaying the batch logs nothing twice
+    response = client.post("/api/v1/meal-plans/meals/batch", headers=auth_headers, json={"meals": [
+        _meal("utc", "2026-04-02T12:00:00Z"),
+        _meal("naive", "2026-04-01T12:00:00"),
+    ]})
+    assert response.status_code == 200, response.text
+    assert [result["status"] for result in response.json()["results"]] == ["existing"] * 2
+
+
+def test_offset_dates_use_covering_plan(client, auth_headers):
+    response = client.post("/api/v1/meal-plans", headers=auth_headers, json={
+        "start_date": "2026-07-01T00:00:00Z", "end_date": "2026-07-01T23:59:59Z",
+    })
+    assert response.status_code == 201, response.text
+    response = client.post("/api/v1/meal-plans/meals/batch", headers=auth_headers, json={"meals": [
+        _meal("morning", "2026-07-01T10:00:00+02:00"),
+        _meal("noon", "2026-07-01T12:00:00"),
+    ]})
+    assert response.status_code == 200, response.text
+    plans = client.get("/api/v1/meal-plans", headers=auth_headers).json()
+    assert len(plans) == 1  # No extra day plan was created
+
+
+def test_repeated_conflicts_are_retried(client, auth_headers, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+    from app.api import meal_plans
+
+    log_meals = meal_plans._log_meals
+    conflicts = []
+
+    def conflicting(db, user, batch):
+        # Two concurrent replays insert the same client_ids first
+        if len(conflicts) < 2:
+            conflicts.append(1)
+            raise IntegrityError("INSERT INTO meals", {}, Exception("UNIQUE constraint failed"))
+        return log_meals(db, user, batch)
+
+    monkeypatch.setattr(meal_plans, "_log_meals", conflicting)
+    response = client.post("/api/v1/meal-plans/meals/batch", headers=auth_headers, json={"meals": [
+        _meal("retried-1", "2026-08-01T12:00:00"),
+        _meal("retried-2", "2026-08-02T12:00:00"),
+        _meal("retried-3", "2026-08-03T12:00:00"),
+    ]})
+    assert response.status_code == 200, response.text
+    assert len(conflicts) == 2
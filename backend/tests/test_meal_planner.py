@@ -0,0 +1,73 @@
+"""
+MealPlanner: the variety rule, its fallback for small slots, and the repair pass.
+"""
+import random
+
+import pytest
+
+from app.ml.meal_planner import MealPlanner
+from app.schemas.meal import MealResponse, NutritionInfoSchema
+
+TARGETS = {"calories": 2200, "protein": 110, "carbohydrates": 250, "fat": 75}
+SHARES = {"breakfast": 0.25, "lunch": 0.35, "dinner": 0.30, "snack": 0.10}
+
+
+def _meal(name, rng, calories):
+    return MealResponse.model_construct(name=name, nutrition=NutritionInfoSchema.model_construct(
+        calories=calories * rng.uniform(0.6, 1.4),
+        protein=calories * rng.uniform(0.02, 0.08),
+        carbohydrates=calories * rng.uniform(0.08, 0.15),
+        fat=calories * rng.uniform(0.02, 0.05),
+    ))
+
+
+def _candidates(seed, sizes):
+    rng = random.Random(seed)
+    return {
+        slot: [_meal(f"{slot}-{index}", rng, TARGETS["calories"] * SHARES[slot]) for index in range(size)]
+        for slot, size in sizes.items()
+    }
+
+
+def _plan_cost(planner, plan):
+    """Sum of each day's cost, as the planner scores a combination."""
+    total = 0.0
+    for day in plan:
+        slots = list(day)
+        costs, _ = planner._combination_costs([[day[slot]] for slot in slots], TARGETS, [SHARES[slot] for slot in slots])
+        total += float(costs[0])
+    return total
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_no_repeats_within_variety_window(seed):
+    planner = MealPlanner(variety_window=3)
+    plan = planner.plan(_candidates(seed, dict.fromkeys(SHARES, 6)), TARGETS, 14, SHARES)
+    assert len(plan) == 14
+    for slot in SHARES:
+        names = [day[slot].name for day in plan]
+        for day in range(len(names) - 2):
+            assert len(set(names[day:day + 3])) == 3, (slot, names)
+
+
+def test_window_shrinks_to_the_candidates_of_small_slots():
+    planner = MealPlanner(variety_window=3)
+    plan = planner.plan(_candidates(1, {"breakfast": 2, "lunch": 6, "dinner": 6, "snack": 1}), TARGETS, 10, SHARES)
+    breakfasts = [day["breakfast"].name for day in plan]
+    # Two candidates: never the same breakfast on consecutive days
+    assert all(first != second for first, second in zip(breakfasts, breakfasts[1:])), breakfasts
+    # One candidate: served every day rather than leaving the slot empty
+    assert {day["snack"].name for day in plan} == {"snack-0"}
+
+
+def test_slots_without_candidates_are_left_out():
+    plan = MealPlanner().plan(_candidates(2, {"breakfast": 0, "lunch": 4}), TARGETS, 3, SHARES)
+    assert [set(day) for day in plan] == [{"lunch"}] * 3
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_repair_never_raises_total_cost(seed):
+    candidates = _candidates(seed, {"breakfast": 5, "lunch": 7, "dinner": 6, "snack": 4})
+    greedy = MealPlanner(repair_passes=0).plan(candidates, TARGETS, 10, SHARES)
+    repaired = MealPlanner(repair_passes=3).plan(candidates, TARGETS, 10, SHARES)
+    assert _plan_cost(MealPlanner(), repaired) <= _plan_cost(MealPlanner(), greedy) + 1e-9
@@ -0,0 +1,67 @@
+"""
+GET /meal-plans: meals are loaded per plan range, and the ETag follows meal changes.
+"""
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.database import SessionLocal
+from app.models.meal import Meal
+
+
+def _plan(client, headers, start, end):
+    response = client.post("/api/v1/meal-plans", headers=headers, json={"start_date": start, "end_date": end})
+    assert response.status_code == 201, response.text
+
+
+def _user_id(client, headers):
+    return client.get("/api/v1/auth/me", headers=headers).json()["id"]
+
+
+def test_meals_between_plans_are_not_loaded(client, auth_headers):
+    _plan(client, auth_headers, "2026-09-01T00:00:00", "2026-09-02T23:59:59")
+    _plan(client, auth_headers, "2026-09-20T00:00:00", "2026-09-21T23:59:59")
+    user_id = _user_id(client, auth_headers)
+    db = SessionLocal()
+    try:
+        for day in (1, 10, 11, 12, 20):
+            db.add(Meal(user_id=user_id, name=f"Meal {day}", meal_type="lunch", date=datetime(2026, 9, day, 12)))
+        db.commit()
+    finally:
+        db.close()
+
+    loaded = []
+    listener = lambda target, context: loaded.append(target.name)
+    event.listen(Meal, "load", listener)
+    try:
+        response = client.get("/api/v1/meal-plans", headers=auth_headers)
+    finally:
+        event.remove(Meal, "load", listener)
+    assert response.status_code == 200, response.text
+    assert sorted(meal["name"] for plan in response.json() for meal in plan["meals"]) == ["Meal 1", "Meal 20"]
+    assert sorted(loaded) == ["Meal 1", "Meal 20"]
+
+
+def test_etag_changes_when_a_meal_changes(client, auth_headers):
+    _plan(client, auth_headers, "2026-10-01T00:00:00", "2026-10-01T23:59:59")
+    response = client.post("/api/v1/meal-plans/meals", headers=auth_headers, json={
+        "name": "Soup", "meal_type": "dinner", "date": "2026-10-01T19:00:00", "foods": [],
+    })
+    assert response.status_code == 201, response.text
+    meal_id = response.json()["id"]
+    etag = client.get("/api/v1/meal-plans", headers=auth_headers).headers["etag"]
+
+    time.sleep(1.1)  # SQLite's now() has one-second resolution
+    db = SessionLocal()
+    try:
+        meal = db.get(Meal, meal_id)
+        meal.name = "Stew"
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get("/api/v1/meal-plans", headers=dict(auth_headers, **{"If-None-Match": etag}))
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [meal["name"] for plan in response.json() for meal in plan["meals"]] == ["Stew"]
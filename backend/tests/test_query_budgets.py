@@ -0,0 +1,120 @@
+"""
+Every route in QUERY_BUDGETS stays within its SQL statement budget with cold
+auth caches and enough existing data that an N+1 pattern would show up.
+"""
+import time
+
+import pytest
+
+from app.query_budget import QUERY_BUDGETS, assert_max_queries, budget_for
+from tests.conftest import PASSWORD
+
+NUTRITION = {"calories": 300, "protein": 20, "carbohydrates": 30, "fat": 10, "fiber": 3}
+
+
+def _meal(index, day, client_id=None):
+    meal = {
+        "name": f"Meal {index}",
+        "meal_type": "lunch",
+        "date": f"2026-03-{day:02d}T12:00:00",
+        "foods": [
+            {"name": "rice", "quantity": 100, "nutrition": NUTRITION},
+            {"name": "beans", "quantity": 50, "nutrition": NUTRITION},
+        ],
+        "nutrition": NUTRITION,
+    }
+    if client_id is not None:
+        meal["client_id"] = client_id
+    return meal
+
+
+@pytest.fixture
+def history(client, auth_headers):
+    """Several plans with several meals each, so per-plan or per-meal queries exceed the budgets."""
+    for start, end in ((1, 3), (4, 6), (7, 9)):
+        response = client.post("/api/v1/meal-plans", headers=auth_headers, json={
+            "start_date": f"2026-03-{start:02d}T00:00:00",
+            "end_date": f"2026-03-{end:02d}T23:59:59",
+        })
+        assert response.status_code == 201, response.text
+    response = client.post("/api/v1/meal-plans/meals/batch", headers=auth_headers, json={
+        "meals": [_meal(i, 1 + i % 9, client_id=f"history-{i}") for i in range(18)],
+    })
+    assert response.status_code == 200, response.text
+    return auth_headers
+
+
+def _within_budget(client, cold_caches, method, route, path=None, **kwargs):
+    budget = budget_for(method, route)
+    assert budget is not None, f"{method} {route} has no budget"
+    cold_caches()
+    with assert_max_queries(budget):
+        response = client.request(method, path or route, **kwargs)
+    assert response.status_code < 400, response.text
+    return response
+
+
+def test_every_budget_is_covered():
+    covered = {
+        ("POST", "/api/v1/auth/register"), ("POST", "/api/v1/auth/login"), ("GET", "/api/v1/auth/me"),
+        ("GET", "/api/v1/users/profile"), ("PUT", "/api/v1/users/profile"), ("GET", "/api/v1/recommendations"),
+        ("GET", "/api/v1/meal-plans"), ("POST", "/api/v1/meal-plans"), ("POST", "/api/v1/meal-plans/meals"),
+        ("POST", "/api/v1/meal-plans/meals/batch"), ("GET", "/api/v1/meal-plans/jobs/{job_id}"),
+        ("POST", "/api/v1/nutrition/analyze"), ("GET", "/api/v1/nutrition/daily"),
+    }
+    assert covered == set(QUERY_BUDGETS)
+
+
+def test_register_and_login(client, cold_caches):
+    _within_budget(client, cold_caches, "POST", "/api/v1/auth/register",
+                   json={"email": "budget@example.com", "password": PASSWORD})
+    _within_budget(client, cold_caches, "POST", "/api/v1/auth/login",
+                   json={"email": "budget@example.com", "password": PASSWORD})
+
+
+def test_profile(client, cold_caches, auth_headers):
+    _within_budget(client, cold_caches, "GET", "/api/v1/auth/me", headers=auth_headers)
+    _within_budget(client, cold_caches, "GET", "/api/v1/users/profile", headers=auth_headers)
+    _within_budget(client, cold_caches, "PUT", "/api/v1/users/profile", headers=auth_headers, json={"weight": 78})
+
+
+def test_recommendations(client, cold_caches, auth_headers):
+    route = "/api/v1/recommendations"
+    # Computed and stored, then served from the stored row
+    for _ in range(2):
+        _within_budget(client, cold_caches, "GET", route, headers=auth_headers, params={"meal_type": "lunch"})
+
+
+def test_meal_plans(client, cold_caches, history):
+    _within_budget(client, cold_caches, "GET", "/api/v1/meal-plans", headers=history)
+    _within_budget(client, cold_caches, "POST", "/api/v1/meal-plans", headers=history, json={
+        "start_date": "2026-04-01T00:00:00", "end_date": "2026-04-07T23:59:59",
+    })
+
+
+def test_meal_logging(client, cold_caches, history):
+    _within_budget(client, cold_caches, "POST", "/api/v1/meal-plans/meals", headers=history, json=_meal(0, 20))
+    batch = {"meals": [_meal(i, 10 + i % 8, client_id=f"batch-{i}") for i in range(40)]}
+    _within_budget(client, cold_caches, "POST", "/api/v1/meal-plans/meals/batch", headers=history, json=batch)
+    # Replays of already-logged meals load them with their food items
+    _within_budget(client, cold_caches, "POST", "/api/v1/meal-plans/meals/batch", headers=history, json=batch)
+
+
+def test_generate_job_status(client, cold_caches, auth_headers):
+    response = client.post("/api/v1/meal-plans/generate", headers=auth_headers, params={
+        "start_date": "2026-05-01T00:00:00", "end_date": "2026-05-02T00:00:00", "background": "true",
+    })
+    assert response.status_code == 202, response.text
+    path = response.headers["Location"]
+    # Let the worker finish first so its statements are not counted
+    for _ in range(100):
+        if client.get(path, headers=auth_headers).json()["status"] in ("succeeded", "failed"):
+            break
+        time.sleep(0.05)
+    _within_budget(client, cold_caches, "GET", "/api/v1/meal-plans/jobs/{job_id}", path=path, headers=auth_headers)
+
+
+def test_nutrition(client, cold_caches, history):
+    _within_budget(client, cold_caches, "POST", "/api/v1/nutrition/analyze", headers=history, json={"foods": []})
+    _within_budget(client, cold_caches, "GET", "/api/v1/nutrition/daily", headers=history,
+                   params={"start_date": "2026-03-01", "end_date": "2026-03-31"})
@@ -0,0 +1,20 @@
+"""
+GET /recommendations: conditional requests and stored rows.
+"""
+
+
+def test_etag_is_weak_and_revalidates(client, auth_headers):
+    first = client.get("/api/v1/recommendations", params={"meal_type": "lunch"}, headers=auth_headers)
+    assert first.status_code == 200, first.text
+    etag = first.headers["etag"]
+    # Ids and the date are stamped per response, so the bodies are only equivalent
+    assert etag.startswith('W/"')
+
+    second = client.get("/api/v1/recommendations", params={"meal_type": "lunch"}, headers=auth_headers)
+    assert second.headers["etag"] == etag
+    assert [meal["name"] for meal in second.json()] == [meal["name"] for meal in first.json()]
+
+    cached = client.get(
+        "/api/v1/recommendations", params={"meal_type": "lunch"}, headers=dict(auth_headers, **{"If-None-Match": etag}),
+    )
+    assert cached.status_code == 304
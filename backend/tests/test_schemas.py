@@ -0,0 +1,11 @@
+"""
+Response schemas built from stored rows.
+"""
+from app.schemas.meal import NutritionInfoSchema
+
+
+def test_legacy_nutrition_rows_default_missing_values():
+    nutrition = NutritionInfoSchema.from_db({"calories": 120, "protein": None, "sugar": 4})
+    assert (nutrition.calories, nutrition.protein, nutrition.carbohydrates, nutrition.fat, nutrition.fiber) == (120, 0.0, 0.0, 0.0, 0.0)
+    assert (nutrition.sugar, nutrition.sodium) == (4, None)
+    assert NutritionInfoSchema.from_db({}) is None
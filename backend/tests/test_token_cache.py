@@ -0,0 +1,32 @@
+"""
+TokenCache revocation: revoked tokens are not served, and revocations are
+forgotten once no entry from before them can still be cached.
+"""
+import time
+
+from app.services.token_cache import TokenCache
+
+
+def test_revoked_tokens_are_not_served():
+    cache = TokenCache(max_size=16, max_ttl_seconds=60)
+    cache.put("token-a", "user-1", time.time() + 60)
+    assert cache.get("token-a") == "user-1"
+    cache.revoke_user("user-1")
+    assert cache.get("token-a") is None
+    cache.put("token-b", "user-1", time.time() + 60)
+    assert cache.get("token-b") == "user-1"
+
+
+def test_revocations_are_forgotten_after_max_ttl():
+    cache = TokenCache(max_size=16, max_ttl_seconds=0.05)
+    for user in range(100):
+        cache.put(f"token-{user}", f"user-{user}", time.time() + 60)
+        cache.revoke_user(f"user-{user}")
+    assert len(cache._generations) == 100
+    time.sleep(0.06)
+    cache.revoke_user("user-last")
+    assert list(cache._generations) == ["user-last"]
+    # Entries cached before the forgotten revocations expired with them
+    assert all(cache.get(f"token-{user}") is None for user in range(100))
+    cache.put("token-0", "user-0", time.time() + 60)
+    assert cache.get("token-0") == "user-0"